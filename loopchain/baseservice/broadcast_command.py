@@ -18,3 +18,4 @@ class BroadcastCommand:
     BROADCAST = "broadcast"
     SEND_TO_SINGLE_TARGET = "send_to_single_target"
     CREATE_TX = "create_tx"
+    RELAY = "relay"
@@ -21,6 +21,7 @@ import queue
 import signal
 import threading
 import time
+import uuid
 from concurrent import futures
 from enum import Enum
 from functools import partial
@@ -31,6 +32,7 @@ from grpc._channel import _Rendezvous
 from loopchain import configure as conf, utils as util
 from loopchain.baseservice import StubManager, ObjectManager, CommonThread, BroadcastCommand, \
     TimerService, Timer
+from loopchain.baseservice import relay_tree
 from loopchain.baseservice.module_process import ModuleProcess, ModuleProcessProperties
 from loopchain.baseservice.tx_item_helper import TxItem
 from loopchain.protos import loopchain_pb2_grpc, loopchain_pb2
@@ -63,6 +65,7 @@ class _Broadcaster:
             BroadcastCommand.UPDATE_AUDIENCE: self.__handler_update_audience,
             BroadcastCommand.BROADCAST: self.__handler_broadcast,
             BroadcastCommand.SEND_TO_SINGLE_TARGET: self.__handler_send_to_single_target,
+            BroadcastCommand.RELAY: self.__handler_relay,
         }
 
         self.__broadcast_with_self_target_methods = {
@@ -71,6 +74,12 @@ class _Broadcaster:
             "BroadcastVote"
         }
 
+        # methods of which messages have the relay field to be relayed in a relay tree
+        self.__relay_methods = {
+            "AnnounceUnconfirmedBlock",
+            "AddTxList"
+        }
+
         self.stored_tx = queue.Queue()
 
         self.__timer_service = TimerService()
@@ -228,7 +237,81 @@ class _Broadcaster:
         broadcast_method_kwparam = broadcast_param[2]
         # util.logger.debug("BroadcastThread method name: " + broadcast_method_name)
         # util.logger.debug("BroadcastThread method param: " + str(broadcast_method_param))
-        self.__broadcast_run(broadcast_method_name, broadcast_method_param, **broadcast_method_kwparam)
+        self.__broadcast(broadcast_method_name, broadcast_method_param, **broadcast_method_kwparam)
+
+    def __broadcast(self, method_name, method_param, **kwargs):
+        if conf.RELAY_TREE_FANOUT > 0 and method_name in self.__relay_methods:
+            self.__broadcast_by_relay(method_name, method_param)
+        else:
+            self.__broadcast_run(method_name, method_param, **kwargs)
+
+    def __broadcast_by_relay(self, method_name, method_param):
+        """send the message to the children of this peer in a new relay tree of the broadcast targets"""
+        message_id = uuid.uuid4().hex
+        targets = self.__get_broadcast_targets(method_name)
+        if self.__self_target in targets:
+            targets.remove(self.__self_target)
+            message = self.__relay_message(method_param, message_id, [])
+            self.__call_async_to_target(self.__self_target, method_name, message, True, 0,
+                                        conf.GRPC_TIMEOUT_BROADCAST_RETRY)
+
+        self.__relay(method_name, method_param, message_id, relay_tree.relay_order(targets, message_id))
+
+    def __handler_relay(self, relay_param):
+        """relay a message received in a relay tree to the subtree of this peer.
+        The targets come from the sender, so only targets in the audience are relayed to.
+        """
+        method_name, method_param = relay_param
+        targets = [target for target in method_param.relay.targets
+                   if target in self.__audience and target != self.__self_target]
+        if len(targets) != len(method_param.relay.targets):
+            logging.warning(f"relay of ({method_name}) drops {len(method_param.relay.targets) - len(targets)} "
+                            f"targets which are not in the audience.")
+        self.__relay(method_name, method_param, method_param.relay.message_id, targets)
+
+    def __relay(self, method_name, method_param, message_id: str, targets: list):
+        """send the message to children of this peer in the relay tree of the targets.
+
+        The subtree of a child is sent the message directly only if the call to the child fails. A child which gets
+        the message and does not relay it cuts off its subtree from the message. The relay order differs by messages,
+        so it does not cut off the same reps every time. They get a missed block by block sync.
+        """
+        for child, subtree in relay_tree.split_subtrees(targets, conf.RELAY_TREE_FANOUT):
+            message = self.__relay_message(method_param, message_id, subtree)
+            call_back = partial(self.__relay_done, child, method_name, method_param, message_id, subtree)
+            future = self.__audience[child].call_async(method_name=method_name,
+                                                       message=message,
+                                                       call_back=call_back,
+                                                       timeout=conf.RELAY_TREE_TIMEOUT)
+            if future is None:
+                call_back(None)
+
+    def __relay_done(self, child, method_name, method_param, message_id, subtree, result):
+        """send the message to the subtree of the child directly if the child does not get it to relay"""
+        if isinstance(result, _Rendezvous) and result.code() == grpc.StatusCode.OK:
+            return
+        if isinstance(result, futures.Future) and not result.exception():
+            return
+
+        logging.warning(f"relay of ({method_name}) to ({child}) fails, send it to the subtree({len(subtree)}) "
+                        f"directly. ({result})")
+        message = self.__relay_message(method_param, message_id, [])
+        for target in subtree:
+            # the audience may be updated before the call back.
+            stub_manager = self.__audience.get(target)
+            if stub_manager is not None:
+                stub_manager.call_async(method_name=method_name,
+                                        message=message,
+                                        timeout=conf.GRPC_TIMEOUT_BROADCAST_RETRY)
+
+    @staticmethod
+    def __relay_message(method_param, message_id: str, targets: list):
+        message = type(method_param)()
+        message.CopyFrom(method_param)
+        message.relay.message_id = message_id
+        del message.relay.targets[:]
+        message.relay.targets.extend(targets)
+        return message
 
     def __make_tx_list_message(self):
         tx_list = []
@@ -263,7 +346,7 @@ class _Broadcaster:
 
             # Send multiple tx
             remains, message = self.__make_tx_list_message()
-            self.__broadcast_run("AddTxList", message)
+            self.__broadcast("AddTxList", message)
             if remains:
                 self.__send_tx_in_timer()
 
@@ -399,6 +482,10 @@ class BroadcastScheduler(metaclass=abc.ABCMeta):
         util.logger.debug(f"broadcast method_name({method_name})")
         self.schedule_job(BroadcastCommand.BROADCAST, (method_name, method_param, kwargs))
 
+    def schedule_relay(self, method_name, method_param):
+        """relay a message received in a relay tree to the targets in method_param.relay"""
+        self.schedule_job(BroadcastCommand.RELAY, (method_name, method_param))
+
     def schedule_send_failed_leader_complain(self, method_name, method_param, *, target: str):
         self.schedule_job(BroadcastCommand.SEND_TO_SINGLE_TARGET, (method_name, method_param, target))
 
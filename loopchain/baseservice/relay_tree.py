@@ -0,0 +1,67 @@
+# Copyright 2019 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Relay tree of broadcast messages in which each rep forwards a message to its children"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+
+def relay_order(targets: Sequence[str], message_id: str) -> List[str]:
+    """Targets in the order of the relay tree of the message.
+
+    The order differs by messages, so a rep which fails to relay does not cut off the same subtree every time.
+    """
+    return sorted(targets, key=lambda target: hashlib.sha3_256(f"{message_id}{target}".encode()).digest())
+
+
+def split_subtrees(targets: Sequence[str], fanout: int) -> List[Tuple[str, List[str]]]:
+    """Children of the root in a balanced tree of the targets, and targets in the subtree of each child.
+
+    :param targets: targets of the tree except the root
+    :param fanout: max count of children of a node
+    :return: [(child, targets to be relayed by the child), ...]
+    """
+    subtrees = []
+    size, remains = divmod(len(targets), fanout)
+    start = 0
+    for i in range(min(fanout, len(targets))):
+        end = start + size + (1 if i < remains else 0)
+        subtrees.append((targets[start], list(targets[start + 1:end])))
+        start = end
+    return subtrees
+
+
+class RelayedMessages:
+    """Ids of relayed messages received recently, to drop duplicates of them"""
+
+    def __init__(self, max_size: int):
+        self.__max_size = max_size
+        self.__message_ids = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def add(self, message_id: str) -> bool:
+        """:return: False if the message has been received"""
+        with self.__lock:
+            if message_id in self.__message_ids:
+                return False
+
+            self.__message_ids[message_id] = None
+            if len(self.__message_ids) > self.__max_size:
+                self.__message_ids.popitem(last=False)
+            return True
+
+    def __len__(self):
+        return len(self.__message_ids)
@@ -0,0 +1,173 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Aging transaction pool indexed by item status"""
+
+import threading
+import time
+from collections import OrderedDict, MutableMapping
+
+
+class TxPoolItem:
+    __slots__ = ("value", "timestamp_seconds", "status")
+
+    def __init__(self, value, timestamp_seconds, status):
+        self.value = value
+        self.timestamp_seconds = timestamp_seconds
+        self.status = status
+
+
+class TxPool(MutableMapping):
+    """Drop-in replacement of AgingCache for the transaction queue.
+
+    Items are kept in `d` ordered by age like AgingCache, and also in an ordered bucket per status.
+    Finding the first item in a status, changing the status of an item and aging eviction don't scan
+    items in the other statuses, so they are O(1) regardless of how many items are already added to a block.
+    An item is ordered in its status bucket by the time it entered the status.
+    """
+    DEFAULT_ITEM_STATUS = 1
+
+    def __init__(self, max_age_seconds, items=None, default_item_status=DEFAULT_ITEM_STATUS):
+        self.__default_item_status = default_item_status
+        self._max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+        self.d = OrderedDict()
+        self.__buckets = {}
+        if items:
+            for k, v in items:
+                self[k] = v
+
+    @property
+    def max_age_seconds(self):
+        return self._max_age_seconds
+
+    def __bucket(self, status) -> OrderedDict:
+        try:
+            return self.__buckets[status]
+        except KeyError:
+            bucket = self.__buckets[status] = OrderedDict()
+            return bucket
+
+    def __set_status(self, key, item: TxPoolItem, status):
+        if item.status == status:
+            return
+
+        del self.__buckets[item.status][key]
+        item.status = status
+        self.__bucket(status)[key] = item
+
+    def __remove(self, key) -> TxPoolItem:
+        item = self.d.pop(key)
+        del self.__buckets[item.status][key]
+        return item
+
+    def pop_item(self):
+        with self._lock:
+            key = next(iter(self.d))
+            return self.__remove(key).value
+
+    def pop_item_in_status(self, status=DEFAULT_ITEM_STATUS):
+        with self._lock:
+            bucket = self.__buckets.get(status)
+            if not bucket:
+                return None
+
+            key = next(iter(bucket))
+            return self.__remove(key)
+
+    def get_item_in_status(self, get_status, set_status):
+        with self._lock:
+            bucket = self.__buckets.get(get_status)
+            if not bucket:
+                return None
+
+            key, item = next(iter(bucket.items()))
+            self.__set_status(key, item, set_status)
+            return item.value
+
+    def get_item_status(self, key):
+        return self.d[key].status
+
+    def set_item_status(self, key, status):
+        with self._lock:
+            self.__set_status(key, self.d[key], status)
+
+    def set_item_status_by_time(self, timestamp_seconds, status):
+        with self._lock:
+            for key, item in self.d.items():
+                if item.timestamp_seconds < timestamp_seconds:
+                    self.__set_status(key, item, status)
+                else:
+                    break
+
+    def is_empty_in_status(self, status):
+        return not self.__buckets.get(status)
+
+    def count_in_status(self, status) -> int:
+        return len(self.__buckets.get(status, ()))
+
+    def clear(self):
+        with self._lock:
+            self.d.clear()
+            self.__buckets.clear()
+
+    def pop(self, key, *args):
+        with self._lock:
+            try:
+                return self.__remove(key).value
+            except KeyError:
+                if args:
+                    return args[0]
+                raise
+
+    def __getitem__(self, key):
+        with self._lock:
+            item = self.d[key]
+            self.d.move_to_end(key)
+            self.__buckets[item.status].move_to_end(key)
+            return item.value
+
+    def __setitem__(self, key, value):
+        now_timestamp_seconds = int(time.time())
+
+        with self._lock:
+            if key in self.d:
+                self.__remove(key)
+            else:
+                expired_timestamp_seconds = now_timestamp_seconds - self._max_age_seconds
+                while self.d:
+                    first_key, first_item = next(iter(self.d.items()))
+                    if first_item.timestamp_seconds > expired_timestamp_seconds:
+                        break
+                    self.__remove(first_key)
+
+            item = TxPoolItem(value, now_timestamp_seconds, self.__default_item_status)
+            self.d[key] = item
+            self.__bucket(item.status)[key] = item
+
+    def __delitem__(self, key):
+        with self._lock:
+            self.__remove(key)
+
+    def __contains__(self, key):
+        return key in self.d
+
+    def __iter__(self):
+        return iter(self.d)
+
+    def __len__(self):
+        return len(self.d)
+
+    def __repr__(self):
+        return repr(self.d)
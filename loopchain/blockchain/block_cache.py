@@ -0,0 +1,169 @@
+"""LRU cache of blocks read from or written to the block DB"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from loopchain.blockchain.blocks import Block
+
+__all__ = ("BlockCache", )
+
+
+class _LRUTier:
+    """LRU entries of {block_hash_key: (height, value, size)} bounded by the sum of sizes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict = OrderedDict()
+
+    def get(self, key: bytes):
+        try:
+            height, value, size = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: bytes, height: int, value, size: int):
+        self.remove(key)
+        if size > self.max_bytes:
+            return
+
+        self.entries[key] = (height, value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+
+    def remove(self, key: bytes):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def remove_from_height(self, height: int):
+        for key in [key for key, (entry_height, _, _) in self.entries.items() if entry_height >= height]:
+            self.remove(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def status(self) -> dict:
+        return {
+            "count": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class BlockCache:
+    """Cache of recent blocks keyed by block hash key and height.
+
+    It has two tiers. The block tier keeps deserialized `Block` objects so that a block is decoded once.
+    The serialized tier keeps block data as stored in the DB and is usually larger than the block tier.
+    The memory of a block object is accounted by the size of its serialized form.
+    The dumped tier keeps compressed block payloads for the block sync so that they are served as they are.
+    """
+
+    def __init__(self, max_block_bytes: int, max_serialized_bytes: int, max_dumped_bytes: int = 0):
+        self.__blocks = _LRUTier(max_block_bytes)
+        self.__serialized = _LRUTier(max_serialized_bytes)
+        self.__dumped = _LRUTier(max_dumped_bytes)
+        self.__heights: Dict[int, bytes] = {}
+        self.__lock = threading.Lock()
+
+    def get_block(self, key: bytes) -> Optional[Block]:
+        with self.__lock:
+            return self.__blocks.get(key)
+
+    def get_serialized(self, key: bytes) -> Optional[bytes]:
+        with self.__lock:
+            return self.__serialized.get(key)
+
+    def get_dumped(self, key: bytes) -> Optional[Tuple[int, bytes]]:
+        """get a compressed block payload.
+
+        :return: None or (height, dumped)
+        """
+        with self.__lock:
+            return self.__dumped.get(key)
+
+    def get_key_by_height(self, height: int) -> Optional[bytes]:
+        with self.__lock:
+            key = self.__heights.get(height)
+            if key is not None and (key in self.__blocks.entries or key in self.__serialized.entries):
+                return key
+            return None
+
+    def put(self, key: bytes, height: int, serialized: bytes, block: Block = None, index_height=True):
+        """put block data.
+
+        :param key: block hash key of the block DB
+        :param height: block height
+        :param serialized: block data as stored in the block DB
+        :param block: deserialized block
+        :param index_height: regard the block as the block of the height in the block DB
+        """
+        with self.__lock:
+            size = len(serialized)
+            self.__serialized.put(key, height, serialized, size)
+            if block is not None:
+                self.__blocks.put(key, height, block, size)
+
+            if index_height:
+                self.__index_height(key, height)
+
+    def put_block(self, key: bytes, height: int, block: Block, size: int, index_height=True):
+        """put a block without its serialized data such as a block of which body is not loaded.
+
+        :param size: size of the block data read
+        """
+        with self.__lock:
+            self.__blocks.put(key, height, block, size)
+
+            if index_height:
+                self.__index_height(key, height)
+
+    def put_dumped(self, key: bytes, height: int, dumped: bytes):
+        with self.__lock:
+            self.__dumped.put(key, height, (height, dumped), len(dumped))
+
+    def remove_from_height(self, height: int):
+        with self.__lock:
+            self.__blocks.remove_from_height(height)
+            self.__serialized.remove_from_height(height)
+            self.__dumped.remove_from_height(height)
+            for cached_height in [cached_height for cached_height in self.__heights if cached_height >= height]:
+                del self.__heights[cached_height]
+
+    def clear(self):
+        with self.__lock:
+            self.__blocks.clear()
+            self.__serialized.clear()
+            self.__dumped.clear()
+            self.__heights.clear()
+
+    def status(self) -> dict:
+        with self.__lock:
+            return {
+                "block": self.__blocks.status(),
+                "serialized": self.__serialized.status(),
+                "dumped": self.__dumped.status()
+            }
+
+    def __index_height(self, key: bytes, height: int):
+        self.__heights[height] = key
+        if len(self.__heights) > len(self.__blocks.entries) + len(self.__serialized.entries):
+            self.__prune_heights()
+
+    def __prune_heights(self):
+        self.__heights = {height: key for height, key in self.__heights.items()
+                          if key in self.__blocks.entries or key in self.__serialized.entries}
@@ -1,15 +1,20 @@
 """Block chain class with authorized blocks only"""
 
+import dataclasses
 import json
 import pickle
+import struct
 import threading
+import time
 import zlib
-from collections import Counter
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from enum import Enum
 from functools import lru_cache
+from itertools import chain, islice
 from os import linesep
 from types import MappingProxyType
-from typing import Union, List, cast, Optional, Tuple, Sequence, Mapping
+from typing import Union, List, cast, Optional, Tuple, Sequence, Mapping, NamedTuple, Iterable, Callable, Set, Dict
 
 from pkg_resources import parse_version
 
@@ -18,12 +23,16 @@ from loopchain import utils
 from loopchain.baseservice import ScoreResponse, ObjectManager
 from loopchain.baseservice.aging_cache import AgingCache
 from loopchain.baseservice.lru_cache import lru_cache as valued_only_lru_cache
-from loopchain.blockchain.blocks import Block, BlockBuilder, BlockSerializer, BlockHeader, v0_1a
+from loopchain.blockchain.block_cache import BlockCache
+from loopchain.blockchain.record_format import RecordFormat, record_dumps, record_loads, is_binary_record
+from loopchain.blockchain.blocks import Block, BlockBuilder, BlockSerializer, BlockHeader, BlockBody, LazyBlock, v0_1a
 from loopchain.blockchain.blocks import BlockProver, BlockProverType, BlockVersioner, NextRepsChangeReason
 from loopchain.blockchain.exception import *
+from loopchain.blockchain.logs_bloom_index import LogsBloomIndex, EventLogFilter
 from loopchain.blockchain.score_base import *
 from loopchain.blockchain.transactions import Transaction, TransactionBuilder
 from loopchain.blockchain.transactions import TransactionSerializer, TransactionVersioner
+from loopchain.blockchain.tx_filter import TxBloomFilter
 from loopchain.blockchain.types import Hash32, ExternalAddress, TransactionStatusInQueue
 from loopchain.blockchain.votes import Votes
 from loopchain.blockchain.votes.v0_1a import BlockVotes
@@ -35,7 +44,7 @@ from loopchain.utils.message_queue import StubCollection
 if TYPE_CHECKING:
     from loopchain.peer import BlockManager
 
-__all__ = ("NID", "BlockChain")
+__all__ = ("NID", "BlockChain", "BlockDumped", "BlockCounters", "AddressTx")
 
 
 class NID(Enum):
@@ -49,19 +58,63 @@ class MadeBlockCounter(Counter):
         return linesep.join(f"{k}: {v}" for k, v in self.items())
 
 
+class BlockDumped(NamedTuple):
+    """A block payload of the block sync made from the stored block data without a `Block`."""
+    hash: Hash32
+    height: int
+    version: str
+    dumped: bytes
+
+
+class BlockCounters(NamedTuple):
+    """Counters at a block height which are stored with the block."""
+    total_tx: int  # txs from the first block after the genesis block up to the block
+    made_block_count: int  # consecutive blocks made by the leader of the block up to the block
+
+    def dumps(self) -> bytes:
+        return _BLOCK_COUNTERS_STRUCT.pack(self.total_tx, self.made_block_count)
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'BlockCounters':
+        return cls(*_BLOCK_COUNTERS_STRUCT.unpack(data))
+
+
+_BLOCK_COUNTERS_STRUCT = struct.Struct(">QI")
+
+
+class AddressTx(NamedTuple):
+    """A tx sent from an address in the tx index by address."""
+    height: int
+    tx_index: int
+    tx_hash: Hash32
+
+
 class BlockChain:
     """Block chain with only committed blocks."""
 
     NID_KEY = b'NID_KEY'
     PRECOMMIT_BLOCK_KEY = b'PRECOMMIT_BLOCK'
     TRANSACTION_COUNT_KEY = b'TRANSACTION_COUNT'
+    # BlockCounters by block height
+    BLOCK_COUNTERS_KEY = b'block_counters_key'
     LAST_BLOCK_KEY = b'last_block_key'
     BLOCK_HEIGHT_KEY = b'block_height_key'
+    # Serialized header of a block by block hash. The block record by block hash has the whole block.
+    BLOCK_HEADER_KEY = b'block_header_key'
 
     # Additional information of the block is generated when the add_block phase of the consensus is reached.
     CONFIRM_INFO_KEY = b'confirm_info_key'
     PREPS_KEY = b'preps_key'
+    # Concatenated 32 bytes receipt hashes of a block in tx order, leaves of the receipts merkle tree.
+    RECEIPT_HASHES_KEY = b'receipt_hashes_key'
     INVOKE_RESULT_BLOCK_HEIGHT_KEY = b'invoke_result_block_height_key'
+    # Bloom filter of committed tx hashes saved on close.
+    TX_FILTER_KEY = b'tx_filter_key'
+    # Tx hash by `address | block height | tx index`, iterated newest first by address.
+    TX_BY_ADDRESS_KEY = b'tx_by_address_key'
+    TX_INDEX_BYTES_LEN = 4
+    # key of tx hashes in a compact dumped block of which txs are omitted
+    COMPACT_TX_HASHES_KEY = "txHashes"
 
     def __init__(self, channel_name=None, store_id=None, block_manager=None):
         if channel_name is None:
@@ -80,6 +133,10 @@ class BlockChain:
         store_id = f"{store_id}_{channel_name}"
         self._blockchain_store, self._blockchain_store_path = utils.init_default_key_value_store(store_id)
 
+        # recent blocks by hash and height to decode a block once.
+        self.__block_cache = BlockCache(conf.BLOCK_CACHE_MAX_BLOCK_BYTES, conf.BLOCK_CACHE_MAX_SERIALIZED_BYTES,
+                                        conf.BLOCK_CACHE_MAX_DUMPED_BYTES)
+
         # tx receipts and next prep after invoke, {Hash32: (receipts, next_prep)}
         self.__invoke_results: AgingCache = AgingCache(max_age_seconds=conf.INVOKE_RESULT_AGING_SECONDS)
 
@@ -87,7 +144,25 @@ class BlockChain:
         self.__confirmed_block_lock = threading.RLock()
 
         self.__total_tx = 0
+        # hash and counters of the block written last
+        self.__last_block_counters: Tuple[Optional[Hash32], Optional[BlockCounters]] = (None, None)
+        # write batch of consecutive blocks during block height sync. see coalesce_writes()
+        self.__coalesce_writes = False
+        self.__coalesced_batch: Optional[KeyValueStoreWriteBatch] = None
+        # blocks in the coalesced batch by height, which are not in the block DB yet.
+        self.__coalesced_blocks: Dict[int, Block] = {}
+        self.__coalesced_tx_hashes: Set[Hash32] = set()
+        self.__coalesced_since = 0.0
         self.__nid: Optional[str] = None
+        self.__tx_filter: Optional[TxBloomFilter] = None
+        # whether all committed txs are in the filter. see __make_tx_filter()
+        self.__tx_filter_complete = False
+        self.__logs_bloom_index = LogsBloomIndex(self._blockchain_store)
+        # migration of records added before indexes of the block DB. see start_migrations()
+        self.__migration_thread: Optional[threading.Thread] = None
+        self.__migration_stop = threading.Event()
+        # txs by address are read from the tx index and legacy tx list pages which are not migrated yet.
+        self.__tx_list_migration_lock = threading.Lock()
 
         channel_option = conf.CHANNEL_OPTION[channel_name]
 
@@ -99,6 +174,9 @@ class BlockChain:
         for tx_version, tx_hash_version in channel_option.get("hash_versions", {}).items():
             self.__tx_versioner.hash_generator_versions[tx_version] = tx_hash_version
 
+        # format of new block and tx info records. records in any format can be read.
+        self.__record_format = RecordFormat(channel_option.get("record_format", RecordFormat.json.value))
+
         self._init_blockchain()
 
     @property
@@ -221,72 +299,129 @@ class BlockChain:
     def get_blockchain_store(self):
         return self._blockchain_store
 
+    @property
+    def block_cache_status(self) -> dict:
+        return self.__block_cache.status()
+
     def close_blockchain_store(self):
         print(f"close blockchain_store = {self._blockchain_store}")
+        self.__stop_migrations()
+        self.__block_cache.clear()
         if self._blockchain_store:
+            self.write_coalesced_blocks()
+            self.__put_tx_filter(self.block_height)
             self._blockchain_store.close()
             self._blockchain_store: KeyValueStore = None
 
     def check_rollback_possible(self, target_block, start_block=None):
         """Check if the target block can be reached with the prev_hash of last_block.
-        CAUTION! This method is called recursively.
+        Blocks from the last block are found by the block height keys, otherwise only headers of blocks are read.
 
         :param target_block:
         :param start_block:
         :return:
         """
-        if not start_block:
-            start_block = self.__last_block
-
-        if target_block == start_block:
-            return True
-        else:
-            prev_block = self.find_block_by_hash32(start_block.header.prev_hash)
-            if not prev_block:
+        if not start_block or start_block is self.__last_block:
+            target_height = target_block.header.height
+            if not 0 <= target_height <= self.block_height:
+                return False
+            block_hash_key = self._blockchain_store.get(
+                BlockChain.BLOCK_HEIGHT_KEY + target_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'),
+                default=b'')
+            return block_hash_key == target_block.header.hash.hex().encode(encoding='UTF-8')
+
+        header = start_block.header
+        while header.hash != target_block.header.hash:
+            if not header.prev_hash:
+                return False
+            header = self.__find_block_header_by_key(header.prev_hash.hex().encode(encoding='UTF-8'))
+            if not header:
                 return False
 
-            return self.check_rollback_possible(target_block, prev_block)
+        return True
 
-    def __remove_block_up_to_target(self, target_block: Block):
-        """CAUTION! This method is called recursively.
+    def __remove_block_up_to_target(self, target_block: Block,
+                                    progress: Callable[[int, int], None] = None) -> Block:
+        """remove blocks after the target block and their data in a single write batch.
 
-        :param target_block:
-        :return:
+        :param target_block: the last block after roll back
+        :param progress: called with the number of removed blocks and the number of blocks to be removed
+        :return: the target block
         """
-        block_to_be_removed: Block = self.__last_block
-
-        if block_to_be_removed == target_block:
+        with self.__add_block_lock:
+            last_height = self.__last_block.header.height
+            target_height = target_block.header.height
+            remove_count = last_height - target_height
+            if remove_count <= 0:
+                return target_block
+
+            started = time.monotonic()
+            batch = self._blockchain_store.WriteBatch()
+            total_tx = self.__total_tx
+            removed_count = 0
+            first_removed_block = None
+            for block in self.find_blocks_by_height_range(target_height + 1, remove_count):
+                if removed_count == 0 and block.header.prev_hash != target_block.header.hash:
+                    raise RuntimeError(f"Block({block.header.hash.hex()}) is not the next block of "
+                                       f"the target block({target_block.header.hash.hex()}).")
+                first_removed_block = first_removed_block or block
+                total_tx -= len(block.body.transactions)
+                self.__delete_block_data(block, batch)
+
+                removed_count += 1
+                if removed_count % conf.ROLL_BACK_PROGRESS_INTERVAL == 0 or removed_count == remove_count:
+                    utils.logger.info(f"Roll back blocks({removed_count}/{remove_count}) "
+                                      f"elapsed({time.monotonic() - started:.3f}s)")
+                    if progress:
+                        progress(removed_count, remove_count)
+
+            if removed_count != remove_count:
+                raise RuntimeError(f"Blocks from height({target_height + 1}) to ({last_height}) are not found. "
+                                   f"found({removed_count})")
+
+            self.__logs_bloom_index.remove_from_height(target_height + 1, last_height, batch)
+
+            target_hash_encoded = target_block.header.hash.hex().encode(encoding='UTF-8')
+            batch.put(BlockChain.LAST_BLOCK_KEY, target_hash_encoded)
+            batch.put(BlockChain.TRANSACTION_COUNT_KEY, total_tx.to_bytes((total_tx.bit_length() + 7) // 8, 'big'))
+            # confirm infos of the last two blocks are kept as if the target block is added last.
+            for block_hash, next_block in ((target_block.header.hash, first_removed_block),
+                                           (target_block.header.prev_hash, target_block)):
+                confirm_info = self.__get_confirm_info_from_block(next_block)
+                if block_hash and confirm_info:
+                    batch.put(BlockChain.CONFIRM_INFO_KEY + block_hash.hex().encode(encoding='UTF-8'), confirm_info)
+            batch.write()
+
+            self.__last_block = target_block
+            self.__total_tx = total_tx
+            self.__block_cache.remove_from_height(target_height + 1)
+
+            logging.warning(
+                f"REMOVE BLOCK HEIGHT : {target_height + 1} ~ {last_height} , "
+                f"TARGET HASH : {target_block.header.hash.hex()} , "
+                f"ELAPSED : {time.monotonic() - started:.3f}s , "
+                f"CHANNEL : {self.__channel_name}")
             return target_block
-        else:
-            with self.__add_block_lock:
-                new_last_block: Block = self.find_block_by_hash32(block_to_be_removed.header.prev_hash)
-                self.__total_tx -= (
-                        len(block_to_be_removed.body.transactions) +
-                        len(new_last_block.body.transactions)
-                )
-
-                confirm_info = self.__get_confirm_info_from_block(block_to_be_removed)
-                next_total_tx = self.__write_block_data(new_last_block,
-                                                        confirm_info,
-                                                        receipts=None,
-                                                        next_prep=None)
 
-                for index, tx in enumerate(block_to_be_removed.body.transactions.values()):
-                    tx_hash = tx.hash.hex()
-                    self._blockchain_store.delete(tx_hash.encode(encoding=conf.HASH_KEY_ENCODING))
-
-                self.__last_block = new_last_block
-                self.__total_tx = next_total_tx
-
-                logging.warning(
-                    f"REMOVE BLOCK HEIGHT : {block_to_be_removed.header.height} , "
-                    f"HASH : {block_to_be_removed.header.hash.hex()} , "
-                    f"CHANNEL : {self.__channel_name}")
-
-                return self.__remove_block_up_to_target(target_block)
+    def __delete_block_data(self, block: Block, batch):
+        height = block.header.height
+        for index, tx in enumerate(block.body.transactions.values()):
+            batch.delete(tx.hash.hex().encode(encoding=conf.HASH_KEY_ENCODING))
+            if tx.type() != "base":
+                batch.delete(self.__get_tx_by_address_key(tx.from_address.hex_hx(), height, index))
 
-    def roll_back(self, target_block):
-        self.__remove_block_up_to_target(target_block)
+        block_hash_encoded = block.header.hash.hex().encode(encoding='UTF-8')
+        batch.delete(block_hash_encoded)
+        batch.delete(BlockChain.BLOCK_HEADER_KEY + block_hash_encoded)
+        batch.delete(BlockChain.BLOCK_HEIGHT_KEY + height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'))
+        batch.delete(BlockChain.CONFIRM_INFO_KEY + block_hash_encoded)
+        batch.delete(BlockChain.RECEIPT_HASHES_KEY + block_hash_encoded)
+        batch.delete(self.__get_block_counters_key(height))
+
+    def roll_back(self, target_block, progress: Callable[[int, int], None] = None):
+        self.write_coalesced_blocks()
+        self.__remove_block_up_to_target(target_block, progress)
+        self.rebuild_made_block_count()
 
     def rebuild_made_block_count(self):
         """rebuild leader's made block count
@@ -295,34 +430,34 @@ class BlockChain:
         """
         self.reset_leader_made_block_count()
 
-        block_hash = self.__last_block.header.hash.hex()
-        block_height = self.__last_block.header.height
-
-        while block_hash != "":
-            if block_height <= 0:
-                return
-
-            block_dump = self._blockchain_store.get(block_hash.encode(encoding='UTF-8'))
-            block_version = self.__block_versioner.get_version(block_height)
-            block_serializer = BlockSerializer.new(block_version, self.__tx_versioner)
-            block = block_serializer.deserialize(json.loads(block_dump))
-
-            if self.__last_block.header.peer_id != block.header.peer_id:
-                break
-
-            self._increase_made_block_count(block)
-
-            # next loop
-            block_height = block.header.height - 1
-            block_hash = block.header.prev_hash.hex()
+        header = self.__last_block.header
+        counters = self.find_block_counters_by_height(header.height)
+        made_block_count = counters.made_block_count if counters else self.__count_made_blocks(header)
+        if made_block_count and header.prep_changed_reason is NextRepsChangeReason.TermEnd:
+            made_block_count = 1
+        if made_block_count:
+            self.__made_block_counter[header.peer_id] = made_block_count
+
+    def __count_made_blocks(self, header: BlockHeader) -> int:
+        """count consecutive blocks made by the leader of the header by walking back headers"""
+        made_block_count = 0
+        peer_id = header.peer_id
+        while header and header.height > 0 and header.peer_id == peer_id:
+            made_block_count += 1
+            header = self.__find_block_header_by_key(header.prev_hash.hex().encode(encoding='UTF-8'))
+        return made_block_count
 
     def rebuild_transaction_count(self):
         if self.__last_block is not None:
             # rebuild blocks to Genesis block.
             logging.info("re-build transaction count from DB....")
 
+            counters = self.find_block_counters_by_height(self.__last_block.header.height)
             try:
-                self.__total_tx = self._rebuild_transaction_count_from_cached()
+                if counters:
+                    self.__total_tx = counters.total_tx
+                else:
+                    self.__total_tx = self._rebuild_transaction_count_from_cached()
             except Exception as e:
                 if isinstance(e, KeyError):
                     logging.warning(f"Cannot find 'TRANSACTION_COUNT' Key from DB. Rebuild tx count")
@@ -349,7 +484,7 @@ class BlockChain:
             block_dump = self._blockchain_store.get(block_hash.encode(encoding='UTF-8'))
             block_version = self.__block_versioner.get_version(block_height)
             block_serializer = BlockSerializer.new(block_version, self.__tx_versioner)
-            block = block_serializer.deserialize(json.loads(block_dump))
+            block = block_serializer.deserialize(record_loads(block_dump), trusted=True)
 
             # Count only normal block`s tx count, not genesis block`s
             if block.header.height > 0:
@@ -364,17 +499,99 @@ class BlockChain:
         tx_count_bytes = self._blockchain_store.get(BlockChain.TRANSACTION_COUNT_KEY)
         return int.from_bytes(tx_count_bytes, byteorder='big')
 
-    def __find_block_by_key(self, key):
+    @staticmethod
+    def __get_block_counters_key(height: int) -> bytes:
+        return BlockChain.BLOCK_COUNTERS_KEY + height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big')
+
+    def find_block_counters_by_height(self, height: int) -> Optional[BlockCounters]:
         try:
-            block_bytes = self._blockchain_store.get(key)
-            block_dumped = json.loads(block_bytes)
-            block_height = self.__block_versioner.get_height(block_dumped)
-            block_version = self.__block_versioner.get_version(block_height)
-            return BlockSerializer.new(block_version, self.__tx_versioner).deserialize(block_dumped)
+            return BlockCounters.loads(self._blockchain_store.get(self.__get_block_counters_key(height)))
+        except KeyError:
+            return None
+
+    def find_total_tx_by_height(self, height: int) -> Optional[int]:
+        counters = self.find_block_counters_by_height(height)
+        return counters.total_tx if counters else None
+
+    def __make_block_counters(self, block: Block, total_tx: int) -> BlockCounters:
+        height = block.header.height
+        if height == 0:
+            return BlockCounters(total_tx, 0)
+
+        if self.__last_block and self.__last_block.header.height == height - 1:
+            prev_header = self.__last_block.header
+        else:
+            prev_header = self.find_block_header_by_height(height - 1)
+
+        if prev_header.peer_id != block.header.peer_id:
+            return BlockCounters(total_tx, 1)
+
+        # counters of the previous block may be in a write batch which is not written yet.
+        last_hash, last_counters = self.__last_block_counters
+        if last_hash == block.header.prev_hash:
+            prev_counters = last_counters
+        else:
+            prev_counters = self.find_block_counters_by_height(height - 1)
+        if prev_counters:
+            return BlockCounters(total_tx, prev_counters.made_block_count + 1)
+        # blocks before counters are stored
+        return BlockCounters(total_tx, self.__count_made_blocks(prev_header) + 1)
+
+    def __find_block_by_key(self, key, index_height=False):
+        """find a block of which body is decoded on the first access to the body."""
+        block = self.__block_cache.get_block(key)
+        if block is not None:
+            return block
+
+        try:
+            header, size = self.__load_block_header(key)
         except KeyError as e:
             logging.debug(f"__find_block_by_key::KeyError block_hash({key}) error({e})")
+            return None
 
-        return None
+        block = LazyBlock(header, self.__load_block_body)
+        self.__block_cache.put_block(key, header.height, block, size, index_height=index_height)
+        return block
+
+    def __find_block_header_by_key(self, key) -> Optional[BlockHeader]:
+        """find a block header without caching it, for walks over many blocks."""
+        block = self.__block_cache.get_block(key)
+        if block is not None:
+            return block.header
+
+        try:
+            return self.__load_block_header(key)[0]
+        except KeyError as e:
+            logging.debug(f"__find_block_header_by_key::KeyError block_hash({key}) error({e})")
+            return None
+
+    def __load_block_header(self, key) -> Tuple[BlockHeader, int]:
+        """load a block header from the header record.
+        The header of a block stored without the header record is loaded from the block record.
+
+        :return: block header, size of the record
+        """
+        try:
+            record = self._blockchain_store.get(BlockChain.BLOCK_HEADER_KEY + key)
+        except KeyError:
+            record = self.__block_cache.get_serialized(key) or self._blockchain_store.get(key)
+
+        header_dumped = record_loads(record)
+        block_height = self.__block_versioner.get_height(header_dumped)
+        block_version = self.__block_versioner.get_version(block_height)
+        header = BlockSerializer.new(block_version, self.__tx_versioner).deserialize_header(header_dumped)
+        return header, len(record)
+
+    def __load_block_body(self, block: LazyBlock) -> BlockBody:
+        key = block.header.hash.hex().encode(encoding='UTF-8')
+        block_bytes = self.__block_cache.get_serialized(key) or self._blockchain_store.get(key)
+
+        block_serializer = BlockSerializer.new(block.header.version, self.__tx_versioner)
+        body = block_serializer.deserialize_body(record_loads(block_bytes), trusted=True)
+
+        # the block is accounted by the size of whole block data now.
+        self.__block_cache.put(key, block.header.height, bytes(block_bytes), block, index_height=False)
+        return body
 
     def get_prev_block(self, block: Block) -> Block:
         """get prev block by given block
@@ -422,6 +639,24 @@ class BlockChain:
         """
         return self.__find_block_by_key(block_hash.hex().encode(encoding='UTF-8'))
 
+    def find_block_header_by_hash(self, block_hash: Union[str, Hash32]) -> Optional[BlockHeader]:
+        """find block header in DB by block hash without decoding the block body.
+
+        :param block_hash: plain string or Hash32
+        :return: None or BlockHeader
+        """
+        block = self.find_block_by_hash(block_hash)
+        return block.header if block else None
+
+    def find_block_header_by_height(self, block_height: int) -> Optional[BlockHeader]:
+        """find block header in DB by its height without decoding the block body.
+
+        :param block_height: int
+        :return: None or BlockHeader
+        """
+        block = self.find_block_by_height(block_height)
+        return block.header if block else None
+
     def find_block_by_height(self, block_height):
         """find block in DB by its height
 
@@ -432,16 +667,137 @@ class BlockChain:
         if block_height == -1:
             return self.__last_block
 
-        try:
-            key = self._blockchain_store.get(BlockChain.BLOCK_HEIGHT_KEY +
-                                             block_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'))
-        except KeyError:
-            if self.last_unconfirmed_block:
-                if self.last_unconfirmed_block.header.height == block_height:
-                    return self.last_unconfirmed_block
-            return None
+        block = self.__coalesced_blocks.get(block_height)
+        if block is not None:
+            return block
+
+        key = self.__block_cache.get_key_by_height(block_height)
+        if key is None:
+            try:
+                key = self._blockchain_store.get(BlockChain.BLOCK_HEIGHT_KEY +
+                                                 block_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'))
+            except KeyError:
+                if self.last_unconfirmed_block:
+                    if self.last_unconfirmed_block.header.height == block_height:
+                        return self.last_unconfirmed_block
+                return None
+
+        return self.__find_block_by_key(key, index_height=True)
+
+    def find_blocks_by_height_range(self, start_height: int, max_count: int):
+        """find consecutive confirmed blocks in DB from start_height.
+        Block hashes are read by a single iteration over the block height keys.
+
+        :param start_height: int, height of the first block
+        :param max_count: max number of blocks
+        :return: generator of Block
+        """
+        if start_height < 0 or max_count <= 0:
+            return
+
+        start_key = BlockChain.BLOCK_HEIGHT_KEY + start_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big')
+        stop_key = BlockChain.BLOCK_HEIGHT_KEY + (start_height + max_count - 1).to_bytes(
+            conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big')
+
+        expected_height = start_height
+        for _, block_hash_key in self._blockchain_store.Iterator(start_key=start_key, stop_key=stop_key):
+            block = self.__find_block_by_key(bytes(block_hash_key), index_height=True)
+            if block is None or block.header.height != expected_height:
+                return
+            yield block
+            expected_height += 1
+
+    def find_block_dumped_by_hash(self, block_hash: Union[str, Hash32]) -> Optional[BlockDumped]:
+        """find block payload of the block sync by block hash without deserializing the block.
+
+        :param block_hash: plain string or Hash32
+        :return: None or BlockDumped
+        """
+        if isinstance(block_hash, Hash32):
+            block_hash = block_hash.hex()
+        return self.__find_block_dumped_by_key(block_hash.encode(encoding='UTF-8'))
+
+    def find_block_dumped_by_height(self, block_height: int) -> Optional[BlockDumped]:
+        """find block payload of the block sync by its height without deserializing the block.
+        The last unconfirmed block is dumped from the block object if the block of the height is not in DB.
+
+        :param block_height: int
+        :return: None or BlockDumped
+        """
+        if block_height == -1:
+            block_height = self.block_height
+
+        key = self.__block_cache.get_key_by_height(block_height)
+        if key is None:
+            try:
+                key = self._blockchain_store.get(BlockChain.BLOCK_HEIGHT_KEY +
+                                                 block_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'))
+            except KeyError:
+                block = self.last_unconfirmed_block
+                if block and block.header.height == block_height:
+                    return BlockDumped(block.header.hash, block_height, block.header.version, self.block_dumps(block))
+                return None
+
+        return self.__find_block_dumped_by_key(bytes(key), block_height)
+
+    def find_blocks_dumped_by_height_range(self, start_height: int, max_count: int):
+        """find block payloads of the block sync of consecutive confirmed blocks in DB from start_height.
+        It is the same as find_blocks_by_height_range() except that blocks are not deserialized.
+
+        :param start_height: int, height of the first block
+        :param max_count: max number of blocks
+        :return: generator of BlockDumped
+        """
+        if start_height < 0 or max_count <= 0:
+            return
+
+        start_key = BlockChain.BLOCK_HEIGHT_KEY + start_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big')
+        stop_key = BlockChain.BLOCK_HEIGHT_KEY + (start_height + max_count - 1).to_bytes(
+            conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big')
 
-        return self.__find_block_by_key(key)
+        expected_height = start_height
+        for height_key, block_hash_key in self._blockchain_store.Iterator(start_key=start_key, stop_key=stop_key):
+            height = int.from_bytes(height_key[len(BlockChain.BLOCK_HEIGHT_KEY):], byteorder='big')
+            if height != expected_height:
+                return
+            block_dumped = self.__find_block_dumped_by_key(bytes(block_hash_key), height)
+            if block_dumped is None:
+                return
+            yield block_dumped
+            expected_height += 1
+
+    def __find_block_dumped_by_key(self, key: bytes, block_height: int = None) -> Optional[BlockDumped]:
+        """A JSON record is the JSON of the block payload, so it is just compressed.
+        A binary record is loaded and dumped to JSON without the block.
+
+        :param key: block hash key of the block DB
+        :param block_height: height of the block if known by the height key
+        """
+        cached = self.__block_cache.get_dumped(key)
+        if cached is not None:
+            block_height, block_dumped = cached
+        else:
+            try:
+                block_bytes = self.__block_cache.get_serialized(key) or self._blockchain_store.get(key)
+            except KeyError as e:
+                logging.debug(f"__find_block_dumped_by_key::KeyError block_hash({key}) error({e})")
+                return None
+
+            if is_binary_record(block_bytes) or block_height is None:
+                block_serialized = record_loads(block_bytes)
+                block_height = self.__block_versioner.get_height(block_serialized)
+            if is_binary_record(block_bytes):
+                block_json = json.dumps(block_serialized).encode(encoding=conf.PEER_DATA_ENCODING)
+            else:
+                block_json = bytes(block_bytes)
+
+            block_dumped = zlib.compress(block_json)
+            self.__block_cache.put_dumped(key, block_height, block_dumped)
+
+        return BlockDumped(Hash32.fromhex(key.decode(), ignore_prefix=True),
+                           block_height,
+                           self.__block_versioner.get_version(block_height),
+                           block_dumped)
 
     def find_confirm_info_by_hash(self, block_hash: Union[str, Hash32]) -> bytes:
         if isinstance(block_hash, Hash32):
@@ -451,8 +807,8 @@ class BlockChain:
             return self._blockchain_store.get(BlockChain.CONFIRM_INFO_KEY + hash_encoded)
         except KeyError:
             utils.logger.debug(f"There is no confirm info by block hash: {block_hash}")
-            block = self.find_block_by_hash_str(block_hash)
-            return self.find_prev_confirm_info_by_height(block.header.height + 1) if block else bytes()
+            header = self.find_block_header_by_hash(block_hash)
+            return self.find_prev_confirm_info_by_height(header.height + 1) if header else bytes()
 
     def find_prev_confirm_info_by_hash(self, block_hash: Union[str, Hash32]) -> bytes:
         block = self.find_block_by_hash(block_hash)
@@ -560,6 +916,10 @@ class BlockChain:
         :param need_to_score_invoke:
         :return:
         """
+        # serialize the block out of the lock. citizens are announced with the same json.
+        block_json_data = BlockSerializer.new(block.header.version, self.__tx_versioner).serialize(block)
+        ObjectManager().channel_service.inner_service.put_new_block_json(block, block_json_data)
+
         with self.__add_block_lock:
             if need_to_write_tx_info and need_to_score_invoke and \
                     not self.prevent_next_block_mismatch(block.header.height):
@@ -575,9 +935,11 @@ class BlockChain:
                     'block_hash': block.header.hash.hex(),
                     'total_tx': self.total_tx}})
 
-            return self.__add_block(block, confirm_info, need_to_write_tx_info, need_to_score_invoke)
+            return self.__add_block(block, confirm_info, need_to_write_tx_info, need_to_score_invoke,
+                                    block_json_data)
 
-    def __add_block(self, block: Block, confirm_info, need_to_write_tx_info=True, need_to_score_invoke=True):
+    def __add_block(self, block: Block, confirm_info, need_to_write_tx_info=True, need_to_score_invoke=True,
+                    block_json_data: dict = None):
         with self.__add_block_lock:
             channel_service = ObjectManager().channel_service
 
@@ -593,7 +955,11 @@ class BlockChain:
                     Hash32.fromhex(next_prep['rootHash'], ignore_prefix=True)):
                 next_prep = None
 
-            next_total_tx = self.__write_block_data(block, confirm_info, receipts, next_prep)
+            batch = self.__get_coalesced_batch() if self.__coalesce_writes else None
+            # blocks of block height sync are requested by few peers, they are compressed on request.
+            precompress = conf.BLOCK_CACHE_PRECOMPRESS_NEW_BLOCK and batch is None
+            next_total_tx = self.__write_block_data(block, confirm_info, receipts, next_prep, batch, block_json_data,
+                                                    precompress)
 
             try:
                 if need_to_score_invoke:
@@ -605,6 +971,8 @@ class BlockChain:
             self._increase_made_block_count(block)  # must do this before self.__last_block = block
             self.__last_block = block
             self.__total_tx = next_total_tx
+            if batch is not None:
+                self.__coalesce_block(block, flush=bool(next_prep))
             self.__block_manager.new_epoch()
 
             logging.info(
@@ -633,6 +1001,74 @@ class BlockChain:
 
             return True
 
+    @contextmanager
+    def coalesce_writes(self):
+        """write blocks added in the context in write batches of consecutive blocks instead of a batch per block.
+        A batch is written when it has conf.SYNC_WRITE_BATCH_MAX_BLOCKS blocks or conf.SYNC_WRITE_BATCH_MAX_TXS txs,
+        its first block waited conf.SYNC_WRITE_BATCH_MAX_SECONDS, a block changes preps and at the end of the context.
+
+        LAST_BLOCK_KEY is written with the blocks in the same batch, so a crash loses whole blocks after the last
+        written block and the block DB stays consistent. The score commits every block, so it is rolled back to the
+        last written block after a crash, see prevent_next_block_mismatch.
+
+        Blocks in the batch are found by find_block_by_height and their txs by has_tx before the batch is written.
+        Other queries of them, e.g. by block hash or tx hash, read the block cache and the block DB only.
+        """
+        with self.__add_block_lock:
+            self.__coalesce_writes = True
+        try:
+            yield
+        finally:
+            with self.__add_block_lock:
+                self.__coalesce_writes = False
+                self.write_coalesced_blocks()
+
+    def write_coalesced_blocks(self):
+        """write the batch of coalesced blocks if any"""
+        with self.__add_block_lock:
+            batch, self.__coalesced_batch = self.__coalesced_batch, None
+            if batch is None:
+                return
+
+            batch.write()
+            utils.logger.debug(f"Write {len(self.__coalesced_blocks)} coalesced blocks to height({self.block_height}), "
+                               f"txs({len(self.__coalesced_tx_hashes)}), "
+                               f"after {time.monotonic() - self.__coalesced_since:.3f}s")
+            self.__coalesced_blocks.clear()
+            self.__coalesced_tx_hashes.clear()
+
+    def __get_coalesced_batch(self) -> KeyValueStoreWriteBatch:
+        if self.__coalesced_batch is None:
+            self.__coalesced_batch = self._blockchain_store.WriteBatch()
+            self.__coalesced_since = time.monotonic()
+        return self.__coalesced_batch
+
+    def __coalesce_block(self, block: Block, flush: bool):
+        """count the block put to the coalesced batch and write the batch on a threshold.
+
+        :param flush: write the batch now. preps of the next block are read from the block DB.
+        """
+        self.__coalesced_blocks[block.header.height] = block
+        self.__coalesced_tx_hashes.update(block.body.transactions)
+        if (flush or
+                len(self.__coalesced_blocks) >= conf.SYNC_WRITE_BATCH_MAX_BLOCKS or
+                len(self.__coalesced_tx_hashes) >= conf.SYNC_WRITE_BATCH_MAX_TXS or
+                time.monotonic() - self.__coalesced_since >= conf.SYNC_WRITE_BATCH_MAX_SECONDS):
+            self.write_coalesced_blocks()
+
+    def import_block(self, block: Block, confirm_info, receipts: dict, batch: KeyValueStoreWriteBatch):
+        """put a verified and invoked block to the write batch of an offline import without the channel service.
+        The block is the last block of the blockchain, so the batch must be written before the next import.
+
+        :param block: the next block of the last block
+        :param confirm_info: votes of the block in the next block
+        :param receipts: tx receipts by tx hash
+        :param batch: write batch of consecutive blocks
+        """
+        with self.__add_block_lock:
+            self.__total_tx = self.__write_block_data(block, confirm_info, receipts, None, batch)
+            self.__last_block = block
+
     def _write_tx(self, block, receipts, batch=None):
         """save additional information of transactions to efficient searching and support user APIs.
 
@@ -645,7 +1081,8 @@ class BlockChain:
 
         # loop all tx in block
         logging.debug("try add all tx in block to block db, block hash: " + block.header.hash.hex())
-        tx_queue = self.__block_manager.get_tx_queue()
+        # offline tools write blocks without the block manager.
+        tx_queue = self.__block_manager.get_tx_queue() if self.__block_manager else {}
 
         for index, tx in enumerate(block.body.transactions.values()):
             tx_hash = tx.hash.hex()
@@ -662,12 +1099,13 @@ class BlockChain:
 
             write_target.put(
                 tx_hash.encode(encoding=conf.HASH_KEY_ENCODING),
-                json.dumps(tx_info).encode(encoding=conf.PEER_DATA_ENCODING))
+                record_dumps(tx_info, self.__record_format))
+            self.__tx_filter.add(tx.hash)
 
             tx_queue.pop(tx_hash, None)
 
             if block.header.height > 0:
-                self._write_tx_by_address(tx, batch)
+                self._write_tx_by_address(tx, block.header.height, index, batch)
 
         # save_invoke_result_block_height
         bit_length = block.header.height.bit_length()
@@ -678,7 +1116,14 @@ class BlockChain:
             block_height_bytes
         )
 
-    def __write_block_data(self, block: Block, confirm_info, receipts, next_prep):
+    def __write_block_data(self, block: Block, confirm_info, receipts, next_prep,
+                           batch: KeyValueStoreWriteBatch = None, block_json_data: dict = None, precompress=False):
+        """write the block and its data. They are written in a new write batch if `batch` is None,
+        otherwise they are put to the batch and the caller writes it.
+
+        :param block_json_data: the block serialized by BlockSerializer, serialized here if None
+        :param precompress: cache the compressed block sync payload of the block
+        """
         # a condition for the exception case of genesis block.
         next_total_tx = self.__total_tx
         if block.header.height > 0:
@@ -689,20 +1134,41 @@ class BlockChain:
         next_total_tx_bytes = next_total_tx.to_bytes(byte_length, byteorder='big')
 
         block_serializer = BlockSerializer.new(block.header.version, self.__tx_versioner)
-        block_serialized = json.dumps(block_serializer.serialize(block))
+        if block_json_data is None:
+            block_json_data = block_serializer.serialize(block)
+        block_serialized = record_dumps(block_json_data, self.__record_format)
         block_hash_encoded = block.header.hash.hex().encode(encoding='UTF-8')
 
-        batch = self._blockchain_store.WriteBatch()
-        batch.put(block_hash_encoded, block_serialized.encode("utf-8"))
+        write_batch = batch is None
+        if write_batch:
+            batch = self._blockchain_store.WriteBatch()
+        batch.put(block_hash_encoded, block_serialized)
+        batch.put(BlockChain.BLOCK_HEADER_KEY + block_hash_encoded,
+                  record_dumps(block_serializer.extract_header(block_json_data), self.__record_format))
         batch.put(BlockChain.LAST_BLOCK_KEY, block_hash_encoded)
         batch.put(BlockChain.TRANSACTION_COUNT_KEY, next_total_tx_bytes)
+        block_counters = self.__make_block_counters(block, next_total_tx)
+        batch.put(self.__get_block_counters_key(block.header.height), block_counters.dumps())
+        self.__last_block_counters = (block.header.hash, block_counters)
         batch.put(
             BlockChain.BLOCK_HEIGHT_KEY +
             block.header.height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'),
             block_hash_encoded)
 
+        logs_bloom = getattr(block.header, "logs_bloom", None)
+        if logs_bloom:
+            self.__logs_bloom_index.add(block.header.height, logs_bloom, batch)
+
         if receipts:
             self._write_tx(block, receipts, batch)
+            if block.header.version != v0_1a.version:
+                receipt_hashes = self.__make_receipt_hashes(
+                    block, (receipts[tx_hash.hex()] for tx_hash in block.body.transactions))
+                batch.put(BlockChain.RECEIPT_HASHES_KEY + block_hash_encoded, receipt_hashes)
+
+        if block.header.height % conf.TX_FILTER_CHECKPOINT_BLOCKS == 0:
+            # the filter is loaded from the last checkpoint and txs of blocks after it.
+            self.__put_tx_filter(block.header.height, batch)
 
         if next_prep:
             utils.logger.spam(
@@ -725,11 +1191,20 @@ class BlockChain:
 
         if self.__last_block and self.__last_block.header.prev_hash:
             # Delete confirm info to avoid data duplication.
-            block_hash_encoded = self.__last_block.header.prev_hash.hex().encode("utf-8")
-            block_confirm_info_key = BlockChain.CONFIRM_INFO_KEY + block_hash_encoded
+            prev_block_hash_encoded = self.__last_block.header.prev_hash.hex().encode("utf-8")
+            block_confirm_info_key = BlockChain.CONFIRM_INFO_KEY + prev_block_hash_encoded
             batch.delete(block_confirm_info_key)
 
-        batch.write()
+        if write_batch:
+            batch.write()
+        self.__block_cache.put(block_hash_encoded, block.header.height, block_serialized)
+        if precompress and conf.BLOCK_CACHE_MAX_DUMPED_BYTES > 0:
+            # precompute the block sync payload of a new block which is requested by lagging peers soon.
+            if self.__record_format is not RecordFormat.json:
+                block_json = json.dumps(block_json_data).encode(encoding=conf.PEER_DATA_ENCODING)
+            else:
+                block_json = block_serialized
+            self.__block_cache.put_dumped(block_hash_encoded, block.header.height, zlib.compress(block_json))
 
         return next_total_tx
 
@@ -744,6 +1219,16 @@ class BlockChain:
         response = score_stub.sync_task().query(request)
         score_last_block_height = int(response['lastBlock']['blockHeight'], 16)
 
+        # a block being added is committed by the score before it becomes the last block.
+        with self.__add_block_lock:
+            if score_last_block_height > self.block_height:
+                # blocks in a coalesced write batch are lost by a crash after the score committed them.
+                if not (self.__last_block and self.__roll_back_score(self.__last_block)):
+                    utils.exit_and_msg("The score has blocks which are not in the block DB. Peer will be down. : "
+                                       f"loopchain({self.block_height})/score({score_last_block_height})")
+                    return True
+                score_last_block_height = self.block_height
+
         if score_last_block_height < next_height:
             for invoke_block_height in range(score_last_block_height + 1, next_height):
                 logging.debug(f"mismatch invoke_block_height({invoke_block_height}) "
@@ -795,6 +1280,22 @@ class BlockChain:
                                f"loopchain({next_height})/score({score_last_block_height})")
             return True
 
+    def __roll_back_score(self, target_block: Block) -> bool:
+        request = convert_params({
+            'blockHeight': target_block.header.height,
+            'blockHash': target_block.header.hash.hex_0x()
+        }, ParamType.roll_back)
+        utils.logger.info(f"Roll back the score to the last block in block DB. request({request})")
+
+        score_stub = StubCollection().icon_score_stubs[self.__channel_name]
+        try:
+            response: dict = cast(dict, score_stub.sync_task().rollback(request))
+            response_to_json_query(response)
+        except Exception as e:
+            utils.logger.warning(f"Fail to roll back the score: {e!r}")
+            return False
+        return response.get("blockHeight") == hex(target_block.header.height)
+
     def __precommit_tx(self, precommit_block):
         """ change status of transactions in a precommit block
         :param block:
@@ -806,7 +1307,7 @@ class BlockChain:
 
         for tx in precommit_block.body.transactions.values():
             tx_hash = tx.hash.hex()
-            if tx_queue.get_item_in_status(TransactionStatusInQueue.normal, TransactionStatusInQueue.normal):
+            if not tx_queue.is_empty_in_status(TransactionStatusInQueue.normal):
                 try:
                     tx_queue.set_item_status(tx_hash, TransactionStatusInQueue.precommited_to_block)
                     # utils.logger.spam(
@@ -814,27 +1315,231 @@ class BlockChain:
                 except KeyError as e:
                     logging.warning(f"blockchain:__precommit_tx::KeyError:There is no tx by hash({tx_hash})")
 
-    def _write_tx_by_address(self, tx: 'Transaction', batch):
+    def _write_tx_by_address(self, tx: 'Transaction', block_height: int, tx_index: int, batch=None):
         if tx.type() == "base":
             return
         address = tx.from_address.hex_hx()
-        return self.add_tx_to_list_by_address(address, tx.hash.hex(), batch)
+        return self.add_tx_to_index_by_address(address, block_height, tx_index, tx.hash, batch)
 
     @staticmethod
-    def __get_tx_list_key(address, index):
-        return conf.TX_LIST_ADDRESS_PREFIX + (address + str(index)).encode(encoding=conf.HASH_KEY_ENCODING)
+    def __get_tx_by_address_key(address: str, block_height: int, tx_index: int) -> bytes:
+        return (BlockChain.TX_BY_ADDRESS_KEY + address.encode(encoding=conf.HASH_KEY_ENCODING) + b'|' +
+                block_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big') +
+                tx_index.to_bytes(BlockChain.TX_INDEX_BYTES_LEN, byteorder='big'))
+
+    def add_tx_to_index_by_address(self, address: str, block_height: int, tx_index: int, tx_hash: Hash32,
+                                   batch=None):
+        write_target = batch or self._blockchain_store
+        write_target.put(self.__get_tx_by_address_key(address, block_height, tx_index), tx_hash)
+        return True
+
+    def iter_txs_by_address(self, address: str, from_height: int = None, from_tx_index: int = None) \
+            -> Iterable[AddressTx]:
+        """iterate txs sent from the address, newest first.
+
+        :param address: address of tx sender
+        :param from_height: the newest block height to iterate from (inclusive). the last block if None.
+        :param from_tx_index: the newest tx index in the block of from_height to iterate from (inclusive)
+        """
+        address_key = BlockChain.TX_BY_ADDRESS_KEY + address.encode(encoding=conf.HASH_KEY_ENCODING) + b'|'
+        if from_height is None:
+            stop_key = address_key + b'\xff' * (conf.BLOCK_HEIGHT_BYTES_LEN + BlockChain.TX_INDEX_BYTES_LEN)
+        elif from_tx_index is None:
+            stop_key = (address_key + from_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big') +
+                        b'\xff' * BlockChain.TX_INDEX_BYTES_LEN)
+        else:
+            stop_key = self.__get_tx_by_address_key(address, from_height, from_tx_index)
+
+        height_offset = len(address_key)
+        index_offset = height_offset + conf.BLOCK_HEIGHT_BYTES_LEN
+        for key, tx_hash in self._blockchain_store.Iterator(start_key=address_key, stop_key=stop_key, reverse=True):
+            yield AddressTx(int.from_bytes(key[height_offset:index_offset], byteorder='big'),
+                            int.from_bytes(key[index_offset:], byteorder='big'),
+                            Hash32(tx_hash))
+
+    def find_txs_by_address(self, address: str, from_height: int = None, from_tx_index: int = None,
+                            limit: int = conf.MAX_TX_LIST_SIZE_BY_ADDRESS) -> List[AddressTx]:
+        """find a page of txs sent from the address, newest first.
+        The next page is found from the height and the tx index before the last tx of a page.
+        """
+        return list(islice(self.iter_txs_by_address(address, from_height, from_tx_index), limit))
 
     def get_tx_list_by_address(self, address, index=0):
-        list_key = self.__get_tx_list_key(address, index)
+        """the tx list of a page of `conf.MAX_TX_LIST_SIZE_BY_ADDRESS` txs by address in the legacy form.
+        Txs of legacy tx list pages which are not migrated yet follow txs of the tx index by address.
+
+        :param address: address of tx sender
+        :param index: index of the page. 0 is the newest page.
+        :return: hex tx hashes followed by the index of the next page, and the index of the next page.
+        0 means there is no more list after this.
+        """
+        page_size = conf.MAX_TX_LIST_SIZE_BY_ADDRESS
+        with self.__tx_list_migration_lock:
+            tx_hashes = chain((address_tx.tx_hash.hex() for address_tx in self.iter_txs_by_address(address)),
+                              self.__iter_legacy_tx_list_by_address(address))
+            tx_list = list(islice(tx_hashes, index * page_size, (index + 1) * page_size + 1))
+
+        next_index = index + 1 if len(tx_list) > page_size else 0
+        tx_list = tx_list[:page_size]
+        tx_list.append(next_index)
+        return tx_list, next_index
 
+    def __get_legacy_tx_list_key(self, address: str, page_index: int) -> bytes:
+        return (conf.TX_LIST_ADDRESS_PREFIX + address.encode(encoding=conf.HASH_KEY_ENCODING) +
+                str(page_index).encode(encoding=conf.HASH_KEY_ENCODING))
+
+    def __get_legacy_tx_list(self, address: str, page_index: int) -> Tuple[List[str], int]:
+        """hex tx hashes of a legacy tx list page by address and the index of the next page"""
+        tx_list = pickle.loads(self._blockchain_store.get(self.__get_legacy_tx_list_key(address, page_index)))
+        return tx_list[:-1], tx_list[-1]
+
+    def __iter_legacy_tx_list_by_address(self, address: str) -> Iterable[str]:
+        """iterate hex tx hashes of legacy tx list pages by address, newest first.
+        Page 0 has the newest txs and the index of the last full page, and each full page has the index of the page
+        before it. 0 means there is no more page.
+        """
+        page_index = 0
+        while True:
+            try:
+                tx_hashes, page_index = self.__get_legacy_tx_list(address, page_index)
+            except KeyError:
+                return
+            yield from tx_hashes
+            if not page_index:
+                return
+
+    def __migrate_tx_list_by_address(self):
+        """migrate legacy pickled tx list pages by address to the tx index by address, newest first.
+        A page is migrated in a write batch with page 0, which is the head of the remaining pages, so txs of the
+        remaining pages are older than txs of the index and an interrupted migration resumes from page 0.
+        """
+        prefix = conf.TX_LIST_ADDRESS_PREFIX
+        # keys of pages are `prefix + address + str(index)` and addresses are 'hx' and 40 hex digits.
+        address_length = len("hx") + ExternalAddress.size * 2
+        head_key_length = len(prefix) + address_length + 1
+
+        page_count = tx_count = 0
+        for list_key in self._blockchain_store.Iterator(start_key=prefix, stop_key=prefix + b'\xff',
+                                                        include_value=False):
+            list_key = bytes(list_key)
+            if not list_key.startswith(prefix) or len(list_key) != head_key_length or not list_key.endswith(b'0'):
+                continue
+
+            address = list_key[len(prefix):len(prefix) + address_length].decode(encoding=conf.HASH_KEY_ENCODING)
+            while not self.__migration_stop.is_set():
+                migrated = self.__migrate_legacy_tx_list_page(address)
+                if migrated is None:
+                    break
+                page_count += 1
+                tx_count += migrated
+
+            if self.__migration_stop.is_set():
+                break
+
+        if page_count:
+            utils.logger.info(f"Migrated tx lists by address. pages({page_count}), txs({tx_count})")
+
+    def __migrate_legacy_tx_list_page(self, address: str) -> Optional[int]:
+        """migrate txs of page 0 of the address, or of the page after it if page 0 has no txs.
+
+        :return: count of migrated txs. None if there is no more page.
+        """
+        head_key = self.__get_legacy_tx_list_key(address, 0)
         try:
-            tx_list = pickle.loads(self._blockchain_store.get(list_key))
-            next_index = tx_list[-1]
+            tx_hashes, next_index = self.__get_legacy_tx_list(address, 0)
         except KeyError:
-            tx_list = [0]  # 0 means there is no more list after this.
-            next_index = 0
+            return None
 
-        return tx_list, next_index
+        batch = self._blockchain_store.WriteBatch()
+        if not tx_hashes and next_index:
+            try:
+                tx_hashes, following_index = self.__get_legacy_tx_list(address, next_index)
+            except KeyError:
+                tx_hashes, following_index = [], 0
+            batch.delete(self.__get_legacy_tx_list_key(address, next_index))
+            next_index = following_index
+
+        tx_count = 0
+        for tx_hash in tx_hashes:
+            try:
+                tx_info = record_loads(self._blockchain_store.get(tx_hash.encode(encoding=conf.HASH_KEY_ENCODING)))
+            except KeyError:
+                continue
+            self.add_tx_to_index_by_address(address, tx_info["block_height"], int(tx_info["tx_index"], 16),
+                                            Hash32.fromhex(tx_hash, ignore_prefix=True), batch)
+            tx_count += 1
+
+        if next_index:
+            batch.put(head_key, pickle.dumps([next_index]))
+        else:
+            batch.delete(head_key)
+
+        with self.__tx_list_migration_lock:
+            batch.write()
+        return tx_count
+
+    def start_migrations(self):
+        """start migrations of records added before indexes of the block DB in a background thread.
+        Each migration resumes from its checkpoint in the block DB, so it is stopped on close at any time.
+        """
+        if self.__migration_thread is not None and self.__migration_thread.is_alive():
+            return
+
+        self.__migration_stop.clear()
+        self.__migration_thread = threading.Thread(target=self.__migrate, name="BlockChainMigrationThread",
+                                                   daemon=True)
+        self.__migration_thread.start()
+
+    def __stop_migrations(self):
+        thread, self.__migration_thread = self.__migration_thread, None
+        if thread is None:
+            return
+
+        self.__migration_stop.set()
+        thread.join()
+
+    def __migrate(self):
+        try:
+            self.__make_tx_filter()
+            self.__migrate_tx_list_by_address()
+            self.__migrate_logs_bloom_index()
+        except Exception as e:
+            utils.logger.exception(f"Migration of the block DB is stopped. ({e!r})")
+
+    def __migrate_logs_bloom_index(self):
+        """add logs blooms of blocks added before the logs bloom index from their stored headers, from the last one.
+        Until they are added, blocks before the start height of the index are found by their headers.
+        """
+        start_height = self.__logs_bloom_index.start_height
+        if not start_height:
+            return
+
+        utils.logger.info(f"Migrate logs blooms of blocks before height({start_height})")
+        bloom_count = 0
+        while start_height and not self.__migration_stop.is_set():
+            next_start_height = max(start_height - conf.LOGS_BLOOM_MIGRATION_BATCH_SIZE, 0)
+            blooms = [(height, self.__find_logs_bloom_by_height(height))
+                      for height in range(start_height - 1, next_start_height - 1, -1)]
+
+            with self.__add_block_lock:
+                # blocks rolled back while their headers are read are not added.
+                blooms = [(height, logs_bloom) for height, logs_bloom in blooms if height <= self.block_height]
+                # sections of the index are read from the block DB.
+                self.write_coalesced_blocks()
+                bloom_count += self.__logs_bloom_index.add_before_start(blooms, next_start_height)
+            start_height = next_start_height
+            utils.logger.debug(f"Migrated logs blooms to height({start_height}), blooms({bloom_count})")
+
+        utils.logger.info(f"Migrated logs blooms to height({start_height}), blooms({bloom_count})")
+
+    def __find_logs_bloom_by_height(self, height: int) -> Optional[bytes]:
+        try:
+            key = self._blockchain_store.get(
+                BlockChain.BLOCK_HEIGHT_KEY + height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big'))
+        except KeyError:
+            return None
+        header = self.__find_block_header_by_key(bytes(key))
+        return getattr(header, "logs_bloom", None)
 
     def get_precommit_block(self):
         return self.__find_block_by_key(BlockChain.PRECOMMIT_BLOCK_KEY)
@@ -851,22 +1556,118 @@ class BlockChain:
             logging.debug(f"blockchain:get_nid::There is no NID.")
             return None
 
-    def add_tx_to_list_by_address(self, address, tx_hash, batch=None):
-        write_target = batch or self._blockchain_store
-        current_list, current_index = self.get_tx_list_by_address(address, 0)
+    def has_tx(self, tx_hash: Union[str, Hash32]) -> bool:
+        """check whether the tx is committed without decoding its tx info.
+        The block DB is read only if the tx hash is in the bloom filter of committed txs, or the filter is being made.
 
-        if len(current_list) > conf.MAX_TX_LIST_SIZE_BY_ADDRESS:
-            new_index = current_index + 1
-            new_list_key = self.__get_tx_list_key(address, new_index)
-            self._blockchain_store.put(new_list_key, pickle.dumps(current_list))
-            current_list = [new_index]
+        :param tx_hash: tx hash
+        """
+        if isinstance(tx_hash, Hash32):
+            tx_hash_bytes, tx_hash = tx_hash, tx_hash.hex()
+        else:
+            tx_hash_bytes = bytes.fromhex(tx_hash)
 
-        current_list.insert(0, tx_hash)
-        list_key = self.__get_tx_list_key(address, 0)
-        write_target.put(list_key, pickle.dumps(current_list))
+        if tx_hash_bytes not in self.__tx_filter and self.__tx_filter_complete:
+            return False
+        if tx_hash_bytes in self.__coalesced_tx_hashes:
+            return True
 
+        try:
+            self._blockchain_store.get(tx_hash.encode(encoding=conf.HASH_KEY_ENCODING))
+        except KeyError:
+            return False
         return True
 
+    def has_txs(self, tx_hashes: Iterable[Union[str, Hash32]]) -> List[bool]:
+        return [self.has_tx(tx_hash) for tx_hash in tx_hashes]
+
+    def __load_tx_filter(self) -> TxBloomFilter:
+        """load the bloom filter checkpointed in the block DB and add tx hashes of blocks added after the checkpoint.
+        If it is not saved, an empty filter is made and it is made from the block DB by the migration thread.
+        """
+        try:
+            tx_filter = TxBloomFilter.loads(self._blockchain_store.get(BlockChain.TX_FILTER_KEY),
+                                            conf.TX_FILTER_ERROR_RATE)
+        except (KeyError, ValueError, struct.error) as e:
+            # a new block DB has no txs.
+            self.__tx_filter_complete = self.block_height < 0
+            if not self.__tx_filter_complete:
+                utils.logger.info(f"Make tx bloom filter from block DB in background. ({e!r})")
+            try:
+                total_tx = self._rebuild_transaction_count_from_cached()
+            except KeyError:
+                total_tx = 0
+            return TxBloomFilter(max(conf.TX_FILTER_CAPACITY, total_tx * 2), conf.TX_FILTER_ERROR_RATE,
+                                 self.block_height)
+
+        if tx_filter.height > self.block_height:
+            # txs of rolled back blocks remain in the filter. they are checked by the block DB.
+            tx_filter.height = self.block_height
+
+        for height in range(tx_filter.height + 1, self.block_height + 1):
+            tx_hashes = self.__find_tx_hashes_by_height(height)
+            if tx_hashes is None:
+                break
+            for tx_hash in tx_hashes:
+                tx_filter.add(tx_hash)
+            tx_filter.height = height
+        self.__tx_filter_complete = True
+        return tx_filter
+
+    def __find_tx_hashes_by_height(self, height: int) -> Optional[List[Hash32]]:
+        """tx hashes of a block from its record without deserializing its txs"""
+        try:
+            block_hash_key = bytes(self._blockchain_store.get(
+                BlockChain.BLOCK_HEIGHT_KEY + height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, byteorder='big')))
+            block_dumped = record_loads(self._blockchain_store.get(block_hash_key))
+        except KeyError:
+            return None
+
+        tx_list = block_dumped.get("transactions", block_dumped.get("confirmed_transaction_list", []))
+        try:
+            return [Hash32.fromhex(self.__get_tx_serializer(tx_data).get_hash(tx_data), ignore_prefix=True)
+                    for tx_data in tx_list]
+        except KeyError:
+            # tx hashes are not in the record. they are made by the txs.
+            block = self.__find_block_by_key(block_hash_key)
+            return list(block.body.transactions) if block else None
+
+    def __get_tx_serializer(self, tx_data: dict) -> TransactionSerializer:
+        tx_version, tx_type = self.__tx_versioner.get_version(tx_data)
+        return TransactionSerializer.new(tx_version, tx_type, self.__tx_versioner)
+
+    def __make_tx_filter(self):
+        """add all keys of tx infos in the block DB to the filter and checkpoint it.
+        Txs of blocks added meanwhile are added to the filter by the blocks.
+        """
+        if self.__tx_filter_complete:
+            return
+
+        # keys of tx infos are tx hashes. block hashes which have the same form are added as well.
+        for key in self._blockchain_store.Iterator(include_value=False):
+            if self.__migration_stop.is_set():
+                return
+            if len(key) == Hash32.size * 2:
+                try:
+                    self.__tx_filter.add(bytes.fromhex(bytes(key).decode()))
+                except ValueError:
+                    continue
+
+        with self.__add_block_lock:
+            self.write_coalesced_blocks()
+            self.__tx_filter_complete = True
+            self.__put_tx_filter(self.block_height)
+        utils.logger.info(f"Made tx bloom filter from block DB. txs({self.__tx_filter.count})")
+
+    def __put_tx_filter(self, block_height: int, batch=None):
+        """checkpoint the filter of txs to `block_height`. A filter which is being made is not saved."""
+        if self.__tx_filter is None or not self.__tx_filter_complete:
+            return
+
+        write_target = batch or self._blockchain_store
+        self.__tx_filter.height = block_height
+        write_target.put(BlockChain.TX_FILTER_KEY, self.__tx_filter.dumps())
+
     def find_tx_by_key(self, tx_hash_key):
         """find tx by hash
 
@@ -885,7 +1686,11 @@ class BlockChain:
         tx_data = tx_info_json["transaction"]
         tx_version, tx_type = self.__tx_versioner.get_version(tx_data)
         tx_serializer = TransactionSerializer.new(tx_version, tx_type, self.__tx_versioner)
-        return tx_serializer.from_(tx_data)
+        if isinstance(tx_hash_key, Hash32):
+            tx_hash = tx_hash_key
+        else:
+            tx_hash = Hash32.fromhex(tx_hash_key, ignore_prefix=True)
+        return tx_serializer.from_trusted(tx_data, tx_hash)
 
     def find_invoke_result_by_tx_hash(self, tx_hash: Union[str, Hash32]):
         """find invoke result matching tx_hash and return result if not in blockchain return code delay
@@ -916,7 +1721,7 @@ class BlockChain:
         try:
             tx_info = self._blockchain_store.get(
                 tx_hash_key.encode(encoding=conf.HASH_KEY_ENCODING))
-            tx_info_json = json.loads(tx_info, encoding=conf.PEER_DATA_ENCODING)
+            tx_info_json = record_loads(tx_info)
 
         except UnicodeDecodeError as e:
             logging.warning("blockchain::find_tx_info: UnicodeDecodeError: " + str(e))
@@ -924,6 +1729,51 @@ class BlockChain:
 
         return tx_info_json
 
+    def find_event_logs(self, from_height: int, to_height: int, score_address: str = None,
+                        indexed: Sequence[Optional[str]] = (), limit: int = conf.MAX_EVENT_LOGS_BY_QUERY) -> List[dict]:
+        """find event logs of txs in blocks from `from_height` to `to_height`.
+        Blocks and txs of which logs blooms do not match are skipped without reading receipts.
+
+        :param score_address: SCORE address of event logs. any SCORE if None
+        :param indexed: indexed values of event logs from the event signature. None means any value.
+        :return: event logs with their block height, tx hash, tx index and log index
+        """
+        event_filter = EventLogFilter(score_address, indexed)
+        to_height = min(to_height, self.block_height)
+
+        event_logs = []
+        for height in self.__find_heights_by_logs_bloom(from_height, to_height, event_filter):
+            block = self.find_block_by_height(height)
+            for tx_index, tx_hash in enumerate(block.body.transactions):
+                receipt = self.find_tx_info(tx_hash)["result"]
+                if "logsBloom" in receipt and not event_filter.match_bloom(int(receipt["logsBloom"], 16)):
+                    continue
+
+                for log_index, event_log in enumerate(receipt.get("eventLogs", [])):
+                    if not event_filter.match(event_log):
+                        continue
+                    event_logs.append({
+                        "blockHeight": hex(height),
+                        "txHash": tx_hash.hex_0x(),
+                        "txIndex": hex(tx_index),
+                        "logIndex": hex(log_index),
+                        "eventLog": event_log
+                    })
+                    if len(event_logs) >= limit:
+                        return event_logs
+        return event_logs
+
+    def __find_heights_by_logs_bloom(self, from_height: int, to_height: int, event_filter: EventLogFilter):
+        start_height = self.__logs_bloom_index.start_height
+        for height in range(from_height, min(to_height, start_height - 1) + 1):
+            header = self.find_block_header_by_height(height)
+            logs_bloom = int.from_bytes(getattr(header, "logs_bloom", b''), 'big')
+            if logs_bloom and event_filter.match_bloom(logs_bloom):
+                yield height
+
+        yield from self.__logs_bloom_index.find_heights(max(from_height, start_height), to_height,
+                                                        event_filter.bloom_bits)
+
     def __add_genesis_block(self, tx_info: dict, reps: List[ExternalAddress]):
         """
         :param tx_info: Transaction data for making genesis block from an initial file
@@ -1068,16 +1918,20 @@ class BlockChain:
 
         if last_block_key:
             block_dump = self._blockchain_store.get(last_block_key)
-            block_dump = json.loads(block_dump)
+            block_dump = record_loads(block_dump)
             block_height = self.__block_versioner.get_height(block_dump)
             block_version = self.__block_versioner.get_version(block_height)
             confirm_info = self.find_confirm_info_by_hash(self.__block_versioner.get_hash(block_dump))
             block_dump["confirm_prev_block"] = confirm_info is not b''
-            self.__last_block = BlockSerializer.new(block_version, self.__tx_versioner).deserialize(block_dump)
+            self.__last_block = BlockSerializer.new(block_version, self.__tx_versioner).deserialize(
+                block_dump, trusted=True)
 
             logging.debug("restore from last block hash(" + str(self.__last_block.header.hash.hex()) + ")")
             logging.debug("restore from last block height(" + str(self.__last_block.header.height) + ")")
 
+        self.__tx_filter = self.__load_tx_filter()
+        self.__logs_bloom_index.set_start_height(self.block_height + 1)
+
     def generate_genesis_block(self, reps: List[ExternalAddress]):
         tx_info = None
         nid = NID.unknown.value
@@ -1099,10 +1953,18 @@ class BlockChain:
 
         utils.logger.spam(f"add_genesis_block({self.__channel_name}/nid({nid}))")
 
-    def block_dumps(self, block: Block) -> bytes:
+    def block_dumps(self, block: Block, compact=False) -> bytes:
+        """
+        :param compact: dump hashes of txs instead of txs. the block is loaded by compact_block_loads().
+        """
         block_version = self.__block_versioner.get_version(block.header.height)
         block_serializer = BlockSerializer.new(block_version, self.__tx_versioner)
-        block_serialized = block_serializer.serialize(block)
+        if compact:
+            body = dataclasses.replace(block.body, transactions=OrderedDict())
+            block_serialized = block_serializer.serialize(Block(block.header, body))
+            block_serialized[self.COMPACT_TX_HASHES_KEY] = [tx_hash.hex_0x() for tx_hash in block.body.transactions]
+        else:
+            block_serialized = block_serializer.serialize(block)
 
         """
         FIXME: this is a workaround. confirm_prev_block is used temporarily. We will remove the attribute.
@@ -1117,28 +1979,48 @@ class BlockChain:
         return block_dumped
 
     def block_loads(self, block_dumped: bytes) -> Block:
-        block_dumped = zlib.decompress(block_dumped)
-        block_json = block_dumped.decode(encoding=conf.PEER_DATA_ENCODING)
-        block_serialized = json.loads(block_json)
+        block_serialized = self.__block_serialized_loads(block_dumped)
         block_height = self.__block_versioner.get_height(block_serialized)
         block_version = self.__block_versioner.get_version(block_height)
         block_serializer = BlockSerializer.new(block_version, self.__tx_versioner)
         return block_serializer.deserialize(block_serialized)
 
+    def compact_block_loads(self, block_dumped: bytes) -> Tuple[Block, List[Hash32]]:
+        """Load a block dumped by block_dumps(block, compact=True).
+
+        :return: the block without txs and hashes of the txs in the order of the block.
+        the block with the txs is made by put_transactions().
+        """
+        block_serialized = self.__block_serialized_loads(block_dumped)
+        try:
+            tx_hashes = [Hash32.fromhex(tx_hash) for tx_hash in block_serialized.pop(self.COMPACT_TX_HASHES_KEY)]
+        except (KeyError, TypeError, ValueError) as e:
+            raise BlockError(f"Invalid tx hashes of the compact block. {e!r}")
+
+        block_height = self.__block_versioner.get_height(block_serialized)
+        block_version = self.__block_versioner.get_version(block_height)
+        block_serializer = BlockSerializer.new(block_version, self.__tx_versioner)
+        return block_serializer.deserialize(block_serialized), tx_hashes
+
+    @staticmethod
+    def put_transactions(block: Block, transactions: Iterable[Transaction]) -> Block:
+        """the block of which txs are replaced with `transactions`"""
+        transactions = OrderedDict((tx.hash, tx) for tx in transactions)
+        return Block(block.header, dataclasses.replace(block.body, transactions=transactions))
+
+    def __block_serialized_loads(self, block_dumped: bytes) -> dict:
+        block_dumped = zlib.decompress(block_dumped)
+        block_json = block_dumped.decode(encoding=conf.PEER_DATA_ENCODING)
+        return json.loads(block_json)
+
     def get_transaction_proof(self, tx_hash: Hash32):
         try:
             tx_info = self.find_tx_info(tx_hash.hex())
         except KeyError:
             raise RuntimeError(f"Tx does not exist.")
 
-        block_hash = tx_info["block_hash"]
-        block = self.find_block_by_hash(block_hash)
-
-        if block.header.version == "0.1a":
-            raise RuntimeError(f"Block version({block.header.version}) of the Tx does not support proof.")
-
-        block_prover = BlockProver.new(block.header.version, block.body.transactions, BlockProverType.Transaction)
-        return block_prover.get_proof(tx_hash)
+        block_prover = self.__find_block_prover(tx_info["block_hash"], BlockProverType.Transaction)
+        return block_prover.get_proof(int(tx_info["tx_index"], 16))
 
     def prove_transaction(self, tx_hash: Hash32, proof: list):
         try:
@@ -1160,18 +2042,57 @@ class BlockChain:
             tx_info = self.find_tx_info(tx_hash.hex())
         except KeyError:
             raise RuntimeError(f"Tx does not exist.")
-        tx_result = tx_info["result"]
 
-        block_hash = tx_info["block_hash"]
+        block_prover = self.__find_block_prover(tx_info["block_hash"], BlockProverType.Receipt)
+        return block_prover.get_proof(int(tx_info["tx_index"], 16))
+
+    @lru_cache(maxsize=16)
+    def __find_block_prover(self, block_hash: str, prover_type: BlockProverType) -> BlockProver:
+        """the prover of txs or receipts of a block with its merkle tree built.
+        Proofs of txs in recent blocks are made from the same tree.
+        """
         block = self.find_block_by_hash(block_hash)
 
         if block.header.version == "0.1a":
             raise RuntimeError(f"Block version({block.header.version}) of the Tx does not support proof.")
 
+        if prover_type == BlockProverType.Receipt:
+            receipt_hashes = self.__get_receipt_hashes(block)
+            leaves = (Hash32(receipt_hashes[offset:offset + Hash32.size])
+                      for offset in range(0, len(receipt_hashes), Hash32.size))
+        else:
+            leaves = block.body.transactions
+        block_prover = BlockProver.new(block.header.version, leaves, prover_type)
+        block_prover.get_proof_root()
+        return block_prover
+
+    def __make_receipt_hashes(self, block: Block, tx_results) -> bytes:
+        block_prover = BlockProver.new(block.header.version, None, BlockProverType.Receipt)
+        return b''.join(block_prover.to_hash32(tx_result) for tx_result in tx_results)
+
+    def __get_receipt_hashes(self, block: Block) -> bytes:
+        """get receipt hashes of the block stored by __write_block_data.
+
+        Receipt hashes of blocks stored before are made from tx infos and stored at the first request.
+        They are stored under the add block lock only if the block is still in DB, so a rolled back block
+        does not leave its receipt hashes.
+        """
+        block_hash_encoded = block.header.hash.hex().encode(encoding='UTF-8')
+        key = BlockChain.RECEIPT_HASHES_KEY + block_hash_encoded
+        try:
+            return bytes(self._blockchain_store.get(key))
+        except KeyError:
+            pass
+
         tx_results = (self.find_tx_info(tx_hash)["result"] for tx_hash in block.body.transactions)
-        block_prover = BlockProver.new(block.header.version, tx_results, BlockProverType.Receipt)
-        receipts_hash = block_prover.to_hash32(tx_result)
-        return block_prover.get_proof(receipts_hash)
+        receipt_hashes = self.__make_receipt_hashes(block, tx_results)
+        with self.__add_block_lock:
+            try:
+                self._blockchain_store.get(block_hash_encoded)
+            except KeyError:
+                return receipt_hashes
+            self._blockchain_store.put(key, receipt_hashes)
+        return receipt_hashes
 
     def prove_receipt(self, tx_hash: Hash32, proof: list):
         try:
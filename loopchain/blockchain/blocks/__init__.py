@@ -1,4 +1,4 @@
-from .block import Block, BlockHeader, BlockBody, _dict__str__, NextRepsChangeReason
+from .block import Block, BlockHeader, BlockBody, LazyBlock, _dict__str__, NextRepsChangeReason
 from .block_builder import BlockBuilder
 from .block_serializer import BlockSerializer
 from .block_verifier import BlockVerifier
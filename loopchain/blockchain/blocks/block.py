@@ -16,7 +16,7 @@ from collections import OrderedDict
 from dataclasses import dataclass, _FIELD, _FIELDS
 from enum import IntEnum
 from types import MappingProxyType
-from typing import Mapping
+from typing import Mapping, Callable
 
 from loopchain.blockchain.transactions import Transaction
 from loopchain.blockchain.types import Hash32, ExternalAddress, Signature
@@ -52,6 +52,31 @@ class Block:
     body: BlockBody
 
 
+class LazyBlock(Block):
+    """Block of which body is loaded on the first access to the body.
+
+    It is for blocks read from the block DB. Callers which only need the header do not decode the body.
+    """
+
+    def __init__(self, header: BlockHeader, body_loader: Callable[['LazyBlock'], BlockBody]):
+        object.__setattr__(self, "header", header)
+        object.__setattr__(self, "_body", None)
+        object.__setattr__(self, "_body_loader", body_loader)
+
+    @property
+    def body(self) -> BlockBody:
+        body = self._body
+        if body is None:
+            body = self._body_loader(self)
+            object.__setattr__(self, "_body", body)
+            object.__setattr__(self, "_body_loader", None)
+        return body
+
+    @property
+    def is_body_loaded(self) -> bool:
+        return self._body is not None
+
+
 def _dataclass__str__(self):
     fields = getattr(self, _FIELDS, None)
     if fields is None:
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
-from loopchain.blockchain.blocks import Block
+from loopchain.blockchain.blocks import Block, BlockHeader, BlockBody
 from loopchain.blockchain.exception import BlockVersionNotMatch
 
 if TYPE_CHECKING:
@@ -12,6 +12,7 @@ class BlockSerializer(ABC):
     version = None
     BlockHeaderClass = None
     BlockBodyClass = None
+    body_keys = ()  # keys of body data in a serialized block
 
     def __init__(self, tx_versioner: 'TransactionVersioner'):
         self._tx_versioner = tx_versioner
@@ -26,26 +27,48 @@ class BlockSerializer(ABC):
     def _serialize(self, block: 'Block') -> dict:
         raise NotImplementedError
 
-    def deserialize(self, block_dumped: dict) -> 'Block':
+    def deserialize(self, block_dumped: dict, trusted=False) -> 'Block':
+        """
+        :param block_dumped: serialized block
+        :param trusted: the block is from a trusted source such as the block DB.
+        tx hashes in the block are used as they are instead of generating them.
+        """
         if block_dumped['version'] != self.version:
             raise BlockVersionNotMatch(block_dumped['version'], self.version,
                                        "The block of this version cannot be deserialized by the serializer.")
-        return self._deserialize(block_dumped)
+        return self._deserialize(block_dumped, trusted)
 
-    def _deserialize(self, json_data):
+    def _deserialize(self, json_data, trusted=False):
         header_data = self._deserialize_header_data(json_data)
         header = self.BlockHeaderClass(**header_data)
 
-        body_data = self._deserialize_body_data(json_data)
+        body_data = self._deserialize_body_data(json_data, trusted)
         body = self.BlockBodyClass(**body_data)
         return Block(header, body)
 
+    def extract_header(self, block_dumped: dict) -> dict:
+        """serialized header which is the serialized block without body data"""
+        return {key: value for key, value in block_dumped.items() if key not in self.body_keys}
+
+    def deserialize_header(self, header_dumped: dict) -> 'BlockHeader':
+        """deserialize a header from a serialized header or a serialized block"""
+        if header_dumped['version'] != self.version:
+            raise BlockVersionNotMatch(header_dumped['version'], self.version,
+                                       "The block of this version cannot be deserialized by the serializer.")
+        return self.BlockHeaderClass(**self._deserialize_header_data(header_dumped))
+
+    def deserialize_body(self, block_dumped: dict, trusted=False) -> 'BlockBody':
+        if block_dumped['version'] != self.version:
+            raise BlockVersionNotMatch(block_dumped['version'], self.version,
+                                       "The block of this version cannot be deserialized by the serializer.")
+        return self.BlockBodyClass(**self._deserialize_body_data(block_dumped, trusted))
+
     @abstractmethod
     def _deserialize_header_data(self, json_data: dict):
         raise NotImplementedError
 
     @abstractmethod
-    def _deserialize_body_data(self, json_data: dict):
+    def _deserialize_body_data(self, json_data: dict, trusted=False):
         raise NotImplementedError
 
     @classmethod
@@ -74,6 +74,7 @@ class BlockVerifier(ABC):
         raise NotImplementedError
 
     def verify_transactions(self, block: 'Block', blockchain=None):
+        TransactionVerifier.verify_many(tuple(block.body.transactions.values()), self._tx_versioner)
         for tx in block.body.transactions.values():
             if not utils.is_in_time_boundary(
                     tx.timestamp, conf.TIMESTAMP_BOUNDARY_SECOND, block.header.timestamp):
@@ -86,6 +87,7 @@ class BlockVerifier(ABC):
                 self.exceptions.extend(tv.exceptions)
 
     def verify_transactions_loosely(self, block: 'Block', blockchain=None):
+        TransactionVerifier.verify_many(tuple(block.body.transactions.values()), self._tx_versioner)
         for tx in block.body.transactions.values():
             tv = TransactionVerifier.new(tx.version, tx.type(), self._tx_versioner, self._raise_exceptions)
             tv.verify_loosely(tx, blockchain)
@@ -9,6 +9,7 @@ class BlockSerializer(BaseBlockSerializer):
     version = BlockHeader.version
     BlockHeaderClass = BlockHeader
     BlockBodyClass = BlockBody
+    body_keys = ("confirmed_transaction_list", "confirm_prev_block")
 
     def _serialize(self, block: 'Block'):
         header: BlockHeader = block.header
@@ -59,14 +60,14 @@ class BlockSerializer(BaseBlockSerializer):
             "commit_state": json_data["commit_state"]
         }
 
-    def _deserialize_body_data(self, json_data: dict):
+    def _deserialize_body_data(self, json_data: dict, trusted=False):
         confirm_prev_block = json_data.get("confirm_prev_block")
 
         transactions = OrderedDict()
         for tx_data in json_data['confirmed_transaction_list']:
             tx_version, tx_type = self._tx_versioner.get_version(tx_data)
             ts = TransactionSerializer.new(tx_version, tx_type, self._tx_versioner)
-            tx = ts.from_(tx_data)
+            tx = ts.from_trusted(tx_data) if trusted else ts.from_(tx_data)
             transactions[tx.hash] = tx
 
         return {
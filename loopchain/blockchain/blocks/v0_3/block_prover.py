@@ -32,6 +32,7 @@ class BlockProver(BaseBlockProver):
         return MerkleTree.validate_proof(proof, hash_, root_hash)
 
     def make_tree(self):
+        # values of a prover are fixed, so the tree is built once and the incremental append of MerkleTree is unused.
         self._merkle_tree.reset_tree()
         self._merkle_tree.add_leaf(self.hashes)
         self._merkle_tree.make_tree()
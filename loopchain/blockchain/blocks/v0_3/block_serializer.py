@@ -11,6 +11,7 @@ class BlockSerializer(BaseBlockSerializer):
     version = BlockHeader.version
     BlockHeaderClass = BlockHeader
     BlockBodyClass = BlockBody
+    body_keys = ("transactions", "leaderVotes", "prevVotes")
 
     def _serialize(self, block: 'Block'):
         header: BlockHeader = block.header
@@ -104,12 +105,12 @@ class BlockSerializer(BaseBlockSerializer):
             "logs_bloom": BloomFilter.fromhex(json_data["logsBloom"])
         }
 
-    def _deserialize_body_data(self, json_data: dict):
+    def _deserialize_body_data(self, json_data: dict, trusted=False):
         transactions = OrderedDict()
         for tx_data in json_data['transactions']:
             tx_version, tx_type = self._tx_versioner.get_version(tx_data)
             ts = TransactionSerializer.new(tx_version, tx_type, self._tx_versioner)
-            tx = ts.from_(tx_data)
+            tx = ts.from_trusted(tx_data) if trusted else ts.from_(tx_data)
             transactions[tx.hash] = tx
 
         leader_votes = LeaderVotes.deserialize_votes(json_data["leaderVotes"])
@@ -67,12 +67,12 @@ class BlockSerializer(BlockSerializer):
             "nextLeader": header.next_leader.hex_xx(),
         }
 
-    def _deserialize_body_data(self, json_data: dict):
+    def _deserialize_body_data(self, json_data: dict, trusted=False):
         transactions = OrderedDict()
         for tx_data in json_data['transactions']:
             tx_version, tx_type = self._tx_versioner.get_version(tx_data)
             ts = TransactionSerializer.new(tx_version, tx_type, self._tx_versioner)
-            tx = ts.from_(tx_data)
+            tx = ts.from_trusted(tx_data) if trusted else ts.from_(tx_data)
             transactions[tx.hash] = tx
 
         vote_class = BlockVotes
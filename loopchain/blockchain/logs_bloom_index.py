@@ -0,0 +1,231 @@
+"""Hierarchical index of logs blooms of blocks and event log matching"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from loopchain import configure as conf
+from loopchain.store.key_value_store import KeyValueStore
+
+__all__ = ("LogsBloomIndex", "EventLogFilter")
+
+_BLOOM_BITS = 2048
+_SCORE_ADDRESS_INDEX = 0xff
+_SIGNATURE_PATTERN = re.compile(r"^\w+\((.*)\)$")
+
+
+def _bloom_bits(item: bytes) -> int:
+    """bloom bits of an item in the same way as the logs bloom of a receipt made by iconservice"""
+    item_hash = hashlib.sha3_256(item).digest()
+    bits = 0
+    for i in range(0, 6, 2):
+        bits |= 1 << (int.from_bytes(item_hash[i:i + 2], 'big') % _BLOOM_BITS)
+    return bits
+
+
+def _address_to_bytes(address: str) -> bytes:
+    body = bytes.fromhex(address[2:])
+    return b'\x01' + body if address.startswith("cx") else body
+
+
+def _int_to_bytes(value: int) -> bytes:
+    return value.to_bytes((value.bit_length() + 8) // 8, 'big', signed=True)
+
+
+def _indexed_to_bytes(type_: str, value: str) -> bytes:
+    """bytes of an indexed value of an event log in a receipt by the type of its event signature"""
+    if type_ == "Address":
+        return _address_to_bytes(value)
+    if type_ in ("int", "bool"):
+        return _int_to_bytes(int(value, 16))
+    if type_ == "bytes":
+        return bytes.fromhex(value[2:])
+    return value.encode('utf-8')
+
+
+class EventLogFilter:
+    """Event logs of a SCORE with indexed values. None of indexed values means any value.
+
+    :param score_address: SCORE address. any SCORE if None
+    :param indexed: indexed values in the form of receipts. the first value is the event signature.
+    """
+
+    def __init__(self, score_address: Optional[str] = None, indexed: Sequence[Optional[str]] = ()):
+        self.score_address = score_address
+        self.indexed = list(indexed)
+        self.bloom_bits = self.__make_bloom_bits()
+
+    def __make_bloom_bits(self) -> int:
+        items = []
+        if self.score_address is not None:
+            items.append(_SCORE_ADDRESS_INDEX.to_bytes(1, 'big') + _address_to_bytes(self.score_address))
+
+        signature = self.indexed[0] if self.indexed else None
+        if signature is not None:
+            items.append(b'\x00' + signature.encode('utf-8'))
+            # other indexed values are in the bloom as typed values, and types are known by the signature.
+            matched = _SIGNATURE_PATTERN.match(signature)
+            types = matched.group(1).split(",") if matched else []
+            for index, (type_, value) in enumerate(zip(types, self.indexed[1:]), start=1):
+                if value is not None:
+                    items.append(index.to_bytes(1, 'big') + _indexed_to_bytes(type_, value))
+
+        bits = 0
+        for item in items:
+            bits |= _bloom_bits(item)
+        return bits
+
+    def match_bloom(self, logs_bloom: int) -> bool:
+        return logs_bloom & self.bloom_bits == self.bloom_bits
+
+    def match(self, event_log: dict) -> bool:
+        if self.score_address is not None and event_log.get("scoreAddress") != self.score_address:
+            return False
+
+        event_indexed = event_log.get("indexed", [])
+        if len(self.indexed) > len(event_indexed):
+            return False
+        return all(value is None or value == event_value for value, event_value in zip(self.indexed, event_indexed))
+
+    @staticmethod
+    def logs_bloom(event_logs: Iterable[dict]) -> bytes:
+        """logs bloom of event logs of a receipt"""
+        bits = 0
+        for event_log in event_logs:
+            event_filter = EventLogFilter(event_log["scoreAddress"], event_log.get("indexed", []))
+            bits |= event_filter.bloom_bits
+        return bits.to_bytes(_BLOOM_BITS // 8, 'big')
+
+
+class LogsBloomIndex:
+    """Logs blooms of blocks and aggregated logs blooms of sections of blocks.
+
+    A section of level 1 has `section_size` blocks and a section of level N has `section_size` sections of level N-1.
+    Level 0 is logs blooms of blocks. Empty blooms are not stored, so a query visits only sections which may have
+    matched event logs.
+    """
+
+    KEY = b'logs_bloom_key'
+    # the first block height of the index. blocks before it are not indexed.
+    START_HEIGHT_KEY = b'logs_bloom_start_height_key'
+
+    def __init__(self, store: KeyValueStore, section_size: int = conf.LOGS_BLOOM_SECTION_SIZE,
+                 levels: int = conf.LOGS_BLOOM_SECTION_LEVELS):
+        self.__store = store
+        self.section_size = section_size
+        self.levels = levels
+        # the last section of each level. blooms of a section can be added before the batch is written.
+        self.__sections: Dict[int, Tuple[int, int]] = {}
+
+        try:
+            self.start_height = int.from_bytes(store.get(LogsBloomIndex.START_HEIGHT_KEY), 'big')
+        except KeyError:
+            self.start_height = None
+
+    def __key(self, level: int, index: int) -> bytes:
+        return LogsBloomIndex.KEY + level.to_bytes(1, 'big') + index.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, 'big')
+
+    def __get(self, level: int, index: int) -> int:
+        return int.from_bytes(self.__store.get(self.__key(level, index), default=b''), 'big')
+
+    def __section_bloom(self, level: int, index: int) -> int:
+        section_index, bloom = self.__sections.get(level, (None, 0))
+        if section_index == index:
+            return bloom
+        return self.__get(level, index)
+
+    def set_start_height(self, height: int, batch=None):
+        if self.start_height is not None:
+            return
+        self.__put_start_height(height, batch)
+
+    def __put_start_height(self, height: int, batch=None):
+        write_target = batch or self.__store
+        write_target.put(LogsBloomIndex.START_HEIGHT_KEY, height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, 'big'))
+        self.start_height = height
+
+    def add_before_start(self, blooms: Iterable[Tuple[int, Optional[bytes]]], start_height: int) -> int:
+        """add blooms of blocks before the start height, from the last one, and lower the start height to
+        `start_height` in the same write batch. A migration in chunks resumes from the start height.
+
+        :param blooms: heights and logs blooms of blocks from `start_height` to the start height, the last one first
+        :param start_height: the new start height
+        :return: count of added blooms
+        """
+        # sections are read from the store, which has all blocks written before.
+        self.__sections.clear()
+        count = 0
+        batch = self.__store.WriteBatch()
+        for height, logs_bloom in blooms:
+            if logs_bloom and int.from_bytes(logs_bloom, 'big'):
+                self.add(height, logs_bloom, batch)
+                count += 1
+        batch.put(LogsBloomIndex.START_HEIGHT_KEY, start_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, 'big'))
+        batch.write()
+        # blocks from the new start height are found by the index only after they are written.
+        self.start_height = start_height
+
+        # sections of the last blocks are read from the store again.
+        self.__sections.clear()
+        return count
+
+    def add(self, height: int, logs_bloom: bytes, batch=None):
+        write_target = batch or self.__store
+        bloom = int.from_bytes(logs_bloom, 'big')
+        if not bloom:
+            return
+
+        write_target.put(self.__key(0, height), bytes(logs_bloom))
+        index = height
+        for level in range(1, self.levels + 1):
+            index //= self.section_size
+            section_bloom = self.__section_bloom(level, index) | bloom
+            self.__sections[level] = (index, section_bloom)
+            write_target.put(self.__key(level, index), section_bloom.to_bytes(_BLOOM_BITS // 8, 'big'))
+
+    def remove_from_height(self, height: int, last_height: int, batch=None):
+        """remove blooms of blocks from `height` to `last_height` and aggregate sections of `height` again"""
+        write_target = batch or self.__store
+        self.__sections.clear()
+
+        for block_height in range(height, last_height + 1):
+            write_target.delete(self.__key(0, block_height))
+
+        aggregated = {}
+        first, last = height, last_height
+        for level in range(1, self.levels + 1):
+            first, last = first // self.section_size, last // self.section_size
+            for index in range(first + 1, last + 1):
+                write_target.delete(self.__key(level, index))
+
+            section_bloom = 0
+            lower_last = (height - 1) // self.section_size ** (level - 1)
+            for lower_index in range(first * self.section_size, lower_last + 1):
+                lower_bloom = aggregated.get((level - 1, lower_index))
+                section_bloom |= self.__get(level - 1, lower_index) if lower_bloom is None else lower_bloom
+            aggregated[(level, first)] = section_bloom
+
+            if section_bloom:
+                write_target.put(self.__key(level, first), section_bloom.to_bytes(_BLOOM_BITS // 8, 'big'))
+            else:
+                write_target.delete(self.__key(level, first))
+
+    def find_heights(self, from_height: int, to_height: int, bloom_bits: int) -> Iterable[int]:
+        """heights of blocks of which logs blooms have all bits of `bloom_bits`, from the lowest"""
+        top_span = self.section_size ** self.levels
+        for index in range(from_height // top_span, to_height // top_span + 1):
+            yield from self.__find_heights(self.levels, index, from_height, to_height, bloom_bits)
+
+    def __find_heights(self, level: int, index: int, from_height: int, to_height: int, bloom_bits: int):
+        bloom = self.__get(level, index)
+        if not bloom or bloom & bloom_bits != bloom_bits:
+            return
+        if level == 0:
+            yield index
+            return
+
+        lower_span = self.section_size ** (level - 1)
+        first = max(index * self.section_size, from_height // lower_span)
+        last = min((index + 1) * self.section_size - 1, to_height // lower_span)
+        for lower_index in range(first, last + 1):
+            yield from self.__find_heights(level - 1, lower_index, from_height, to_height, bloom_bits)
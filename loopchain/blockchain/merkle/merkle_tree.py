@@ -15,95 +15,130 @@
 # link: https://github.com/Tierion/pymerkletools/
 
 import hashlib
-from typing import Union, Iterable, ByteString
+from typing import Union, Iterable, ByteString, List, Optional
+
+NODE_SIZE = 32
 
 
 class MerkleTree:
+    """Merkle tree of 32 bytes nodes.
+
+    Each level is a contiguous bytearray of nodes, leaves at level 0.
+    A node without its sibling at the end of a level is promoted to the upper level as it is.
+    `make_tree` recalculates only the nodes affected by leaves added after the previous `make_tree`.
+    """
     hash_function = hashlib.sha3_256
 
     def __init__(self):
-        self.leaves = list()
-        self.levels = None
+        self.levels: List[bytearray] = None
         self.is_ready = False
+        self._built_leaf_count = 0
+        self._proof_nodes: Optional[List[List[bytes]]] = None
 
         self.reset_tree()
 
     def reset_tree(self):
-        self.leaves = list()
-        self.levels = None
+        self.levels = [bytearray()]
         self.is_ready = False
+        self._built_leaf_count = 0
+        self._proof_nodes = None
+
+    @property
+    def leaves(self) -> List[bytes]:
+        return [self.get_leaf(index) for index in range(self.get_leaf_count())]
 
     def add_leaf(self, values: Union[Iterable[ByteString], ByteString], do_hash=False):
-        self.is_ready = False
+        """Leaves must be 32 bytes unless do_hash is set. Other sizes were accepted by the list based tree,
+        but a level is an array of fixed size nodes now. BlockProver adds only Hash32 leaves.
+
+        :raise ValueError: if a leaf is not 32 bytes. No leaf of the values is added.
+        """
         # check if single leaf
-        if not isinstance(values, Iterable):
+        if isinstance(values, (bytes, bytearray, memoryview)) or not isinstance(values, Iterable):
             values = [values]
 
+        if do_hash:
+            values = [self.hash_function(v).digest() for v in values]
+        else:
+            values = list(values)
+        for v in values:
+            if len(v) != NODE_SIZE:
+                raise ValueError(f"Leaf must be {NODE_SIZE} bytes. leaf({v!r})")
+
+        self.is_ready = False
+        self._proof_nodes = None
+        leaves = self.levels[0]
         for v in values:
-            if do_hash:
-                v = self.hash_function(v).digest()
-            v = bytes(v)
-            self.leaves.append(v)
+            leaves += v
 
-    def get_leaf(self, index):
-        return self.leaves[index]
+    def get_leaf(self, index) -> bytes:
+        return self._get_node(0, index)
 
     def get_leaf_count(self):
-        return len(self.leaves)
+        return len(self.levels[0]) // NODE_SIZE
 
     def get_tree_ready_state(self):
         return self.is_ready
 
-    def _calculate_next_level(self):
-        solo_leave = None
-        N = len(self.levels[0])  # number of leaves on the level
-        if N % 2 == 1:  # if odd number of leaves on the level
-            solo_leave = self.levels[0][-1]
-            N -= 1
-
-        new_level = []
-        for l, r in zip(self.levels[0][0:N:2], self.levels[0][1:N:2]):
-            new_level.append(self.hash_function(l+r).digest())
-        if solo_leave is not None:
-            new_level.append(solo_leave)
-        self.levels = [new_level, ] + self.levels  # prepend new level
+    def _get_node(self, level: int, index: int) -> bytes:
+        offset = index * NODE_SIZE
+        return bytes(self.levels[level][offset:offset + NODE_SIZE])
 
     def make_tree(self):
-        self.is_ready = False
-        if self.get_leaf_count() > 0:
-            self.levels = [self.leaves, ]
-            while len(self.levels[0]) > 1:
-                self._calculate_next_level()
+        levels = self.levels
+        hash_function = self.hash_function
+
+        start = self._built_leaf_count
+        level = 0
+        while len(levels[level]) > NODE_SIZE:
+            if level + 1 == len(levels):
+                levels.append(bytearray())
+
+            parents = levels[level + 1]
+            start //= 2
+            del parents[start * NODE_SIZE:]
+            with memoryview(levels[level]) as nodes:
+                count = len(nodes) // NODE_SIZE
+                for offset in range(start * 2 * NODE_SIZE, (count - 1) * NODE_SIZE, 2 * NODE_SIZE):
+                    parents += hash_function(nodes[offset:offset + 2 * NODE_SIZE]).digest()
+                if count % 2 == 1:
+                    parents += nodes[-NODE_SIZE:]
+            level += 1
+        del levels[level + 1:]
+
+        self._built_leaf_count = self.get_leaf_count()
+        self._proof_nodes = None
         self.is_ready = True
 
-    def get_merkle_root(self):
-        if self.is_ready:
-            if self.levels is not None:
-                return self.levels[0][0]
-            else:
-                return None
-        else:
+    def get_merkle_root(self) -> Optional[bytes]:
+        if not self.is_ready or not self.get_leaf_count():
             return None
+        return self._get_node(len(self.levels) - 1, 0)
 
     def get_proof(self, index):
-        if self.levels is None:
+        if not self.is_ready or not self.get_leaf_count():
             return None
-        elif not self.is_ready or index > len(self.leaves)-1 or index < 0:
+        elif index > self.get_leaf_count() - 1 or index < 0:
             return None
-        else:
-            proof = []
-            for x in range(len(self.levels) - 1, 0, -1):
-                level_len = len(self.levels[x])
-                if (index == level_len - 1) and (level_len % 2 == 1):  # skip if this is an odd end node
-                    index = int(index / 2.)
-                    continue
-                is_right_node = index % 2
-                sibling_index = index - 1 if is_right_node else index + 1
-                sibling_pos = "left" if is_right_node else "right"
-                sibling_value = self.levels[x][sibling_index]
-                proof.append({sibling_pos: sibling_value})
-                index = int(index / 2.)
-            return proof
+
+        proof = []
+        for nodes in self._get_proof_nodes():
+            sibling = index ^ 1
+            # skip if this is an odd end node
+            if sibling < len(nodes):
+                proof.append({"left" if index % 2 else "right": nodes[sibling]})
+            index //= 2
+        return proof
+
+    def _get_proof_nodes(self) -> List[List[bytes]]:
+        """nodes of levels except the root as bytes, made at the first proof of the tree.
+        A proof reads a node of each level without slicing the level.
+        """
+        if self._proof_nodes is None:
+            self._proof_nodes = [[bytes(nodes[offset:offset + NODE_SIZE])
+                                  for offset in range(0, len(nodes), NODE_SIZE)]
+                                 for nodes in self.levels[:-1]]
+        return self._proof_nodes
 
     @classmethod
     def validate_proof(cls, proof, target_hash, merkle_root):
@@ -4,6 +4,7 @@ from loopchain.crypto.hashing import build_hash_generator
 
 if TYPE_CHECKING:
     from loopchain.blockchain.transactions import Transaction, TransactionVersioner
+    from loopchain.blockchain.types import Hash32
 
 
 class TransactionSerializer(ABC):
@@ -32,6 +33,13 @@ class TransactionSerializer(ABC):
     def from_(self, tx_dumped: dict) -> 'Transaction':
         raise NotImplementedError
 
+    def from_trusted(self, tx_data: dict, tx_hash: 'Hash32' = None) -> 'Transaction':
+        """make a transaction of data from a trusted source such as the block DB.
+        The hash of the data or the given hash is used as it is instead of generating it.
+        TransactionVerifier generates the hash when the transaction is verified.
+        """
+        return self.from_(tx_data)
+
     @abstractmethod
     def get_hash(self, tx_dumped: dict) -> str:
         raise NotImplementedError
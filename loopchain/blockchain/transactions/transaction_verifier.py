@@ -1,7 +1,12 @@
 import functools
+import logging
+import multiprocessing as mp
+import threading
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional, Sequence
 
+from loopchain import configure as conf
 from loopchain.blockchain.exception import TransactionDuplicatedHashError, TransactionInvalidHashError
 from loopchain.blockchain.exception import TransactionInvalidSignatureError
 from loopchain.crypto.hashing import build_hash_generator
@@ -9,6 +14,10 @@ from loopchain.crypto.signature import SignVerifier
 
 if TYPE_CHECKING:
     from loopchain.blockchain.transactions import Transaction, TransactionVersioner
+    from loopchain.blockchain.types import Hash32
+
+_process_pool: ProcessPoolExecutor = None
+_process_pool_lock = threading.Lock()
 
 
 def cache_result(tv_func):
@@ -23,7 +32,7 @@ def cache_result(tv_func):
         tv: TransactionVerifier = args[0]
         tx: Transaction = args[1]
 
-        attr_name = "_cache_" + tv_func.__name__
+        attr_name = _cache_attr_name(tv_func)
         cached_result = getattr(tx, attr_name, False)
 
         if isinstance(cached_result, Exception):
@@ -52,6 +61,44 @@ def cache_result(tv_func):
     return _wrapper
 
 
+def _cache_attr_name(tv_func) -> str:
+    return "_cache_" + tv_func.__name__
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn workers to avoid forking a process which already runs threads and event loops.
+            _process_pool = ProcessPoolExecutor(max_workers=conf.TX_VERIFY_WORKER_COUNT,
+                                                mp_context=mp.get_context("spawn"))
+        return _process_pool
+
+
+def _shutdown_process_pool():
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True)
+            _process_pool = None
+
+
+def _check_in_worker(tx: 'Transaction', versioner: 'TransactionVersioner'):
+    try:
+        tv = TransactionVerifier.new(tx.version, tx.type(), versioner)
+        tx_hash_expected, signature_message = tv._check_hash(tx), tv._check_signature(tx)
+        pubkey = None
+        if signature_message is None and tx.is_signed():
+            # send the recovered public key to the signature cache of the parent.
+            pubkey = SignVerifier.find_recovered_pubkey(tx.hash, tx.signature, True)
+        return tx_hash_expected, signature_message, pubkey
+    except Exception:
+        # Leave it to the verification in place to report the same exception.
+        return None
+
+
 class TransactionVerifier(ABC):
     _hash_salt = None
     _allow_unsigned = False
@@ -76,29 +123,91 @@ class TransactionVerifier(ABC):
         raise NotImplementedError
 
     def verify_tx_hash_unique(self, tx: 'Transaction', blockchain):
-        if blockchain.find_tx_by_key(tx.hash.hex()):
+        if blockchain.has_tx(tx.hash):
             exception = TransactionDuplicatedHashError(tx)
             self._handle_exceptions(exception)
 
     @cache_result
     def verify_hash(self, tx: 'Transaction'):
-        params = self._tx_serializer.to_origin_data(tx)
-        tx_hash_expected = self._hash_generator.generate_hash(params)
-        if tx_hash_expected != tx.hash:
+        tx_hash_expected = self._check_hash(tx)
+        if tx_hash_expected is not None:
             exception = TransactionInvalidHashError(tx, tx_hash_expected)
             self._handle_exceptions(exception)
 
     @cache_result
     def verify_signature(self, tx: 'Transaction'):
+        message = self._check_signature(tx)
+        if message is not None:
+            exception = TransactionInvalidSignatureError(tx, message=message)
+            self._handle_exceptions(exception)
+
+    def _check_hash(self, tx: 'Transaction') -> Optional['Hash32']:
+        """:return: expected tx hash if the hash of tx is not valid"""
+        params = self._tx_serializer.to_origin_data(tx)
+        tx_hash_expected = self._hash_generator.generate_hash(params)
+        if tx_hash_expected != tx.hash:
+            return tx_hash_expected
+        return None
+
+    def _check_signature(self, tx: 'Transaction') -> Optional[str]:
+        """:return: error message if the signature of tx is not valid"""
         if self._allow_unsigned and not tx.is_signed():
-            return
+            return None
 
         sign_verifier = SignVerifier.from_address(tx.signer_address.hex_xx())
         try:
             sign_verifier.verify_hash(tx.hash, tx.signature)
         except Exception as e:
-            exception = TransactionInvalidSignatureError(tx, message=str(e))
-            self._handle_exceptions(exception)
+            return str(e)
+        return None
+
+    @classmethod
+    def verify_many(cls, txs: Sequence['Transaction'], versioner: 'TransactionVersioner'):
+        """Verify hashes and signatures of txs in worker processes and cache the results to each tx.
+
+        It doesn't raise exceptions. `verify`, `verify_loosely` and `pre_verify` of each tx
+        use the cached results and raise exceptions as before.
+        Small batches are left to the verification in place because of IPC overhead.
+        """
+        verify_hash_attr = _cache_attr_name(cls.verify_hash)
+        verify_signature_attr = _cache_attr_name(cls.verify_signature)
+        txs = [tx for tx in txs
+               if not hasattr(tx, verify_hash_attr) or not hasattr(tx, verify_signature_attr)]
+
+        worker_count = conf.TX_VERIFY_WORKER_COUNT
+        if worker_count <= 1 or len(txs) < conf.TX_VERIFY_PARALLEL_MIN_COUNT:
+            return
+
+        chunk_size = max(1, len(txs) // (worker_count * 4))
+        try:
+            results = list(_get_process_pool().map(_check_in_worker, txs, [versioner] * len(txs),
+                                                   chunksize=chunk_size))
+        except Exception as e:
+            logging.warning(f"Fail to verify txs({len(txs)}) in worker processes : {e!r}")
+            return
+
+        for tx, result in zip(txs, results):
+            if result is None:
+                continue
+
+            tx_hash_expected, signature_message, pubkey = result
+            if tx_hash_expected is None:
+                object.__setattr__(tx, verify_hash_attr, True)
+            else:
+                object.__setattr__(tx, verify_hash_attr, TransactionInvalidHashError(tx, tx_hash_expected))
+
+            if signature_message is None:
+                object.__setattr__(tx, verify_signature_attr, True)
+                if pubkey is not None:
+                    SignVerifier.cache_recovered_pubkey(tx.hash, tx.signature, True, pubkey)
+            else:
+                object.__setattr__(tx, verify_signature_attr,
+                                   TransactionInvalidSignatureError(tx, message=signature_message))
+
+    @staticmethod
+    def shutdown_workers():
+        """Shut down the worker processes of verify_many. They are spawned again by the next verify_many."""
+        _shutdown_process_pool()
 
     def _handle_exceptions(self, exception: Exception):
         if self._raise_exceptions:
@@ -21,15 +21,24 @@ class TransactionSerializer(BaseTransactionSerializer):
         return dict(tx.raw_data)
 
     def from_(self, tx_data: dict) -> 'Transaction':
+        return self._from(tx_data)
+
+    def from_trusted(self, tx_data: dict, tx_hash: Hash32 = None) -> 'Transaction':
+        if tx_hash is None and 'txHash' in tx_data:
+            tx_hash = Hash32.fromhex(tx_data['txHash'], ignore_prefix=True)
+        return self._from(tx_data, tx_hash)
+
+    def _from(self, tx_data: dict, tx_hash: Hash32 = None) -> 'Transaction':
         tx_data_copied = dict(tx_data)
         tx_data_copied.pop('txHash', None)
         raw_data = dict(tx_data_copied)
 
-        tx_hash = self._hash_generator.generate_hash(tx_data_copied)
+        if tx_hash is None:
+            tx_hash = Hash32(self._hash_generator.generate_hash(tx_data_copied))
 
         return Transaction(
             raw_data=raw_data,
-            hash=Hash32(tx_hash),
+            hash=tx_hash,
             signature=None,
             timestamp=int(tx_data['timestamp'], 16),
             data_type=tx_data.get('dataType'),
@@ -0,0 +1,110 @@
+"""Bloom filter of committed tx hashes"""
+
+import math
+import struct
+import threading
+from typing import List
+
+__all__ = ("TxBloomFilter", )
+
+
+class _BitArray:
+    """A bloom filter of fixed capacity. Bit indexes are taken from a tx hash by double hashing."""
+
+    HEADER = struct.Struct(">QQQB")  # capacity, count, bit count, hash count
+
+    def __init__(self, capacity: int, error_rate: float, count=0, bits: bytearray = None):
+        self.capacity = capacity
+        self.count = count
+        self.bit_count = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(round(self.bit_count / capacity * math.log(2)), 1)
+        self.bits = bits if bits is not None else bytearray((self.bit_count + 7) // 8)
+
+    def indexes(self, tx_hash: bytes):
+        # tx hashes are uniformly distributed, so parts of a tx hash are used as hashes.
+        h1 = int.from_bytes(tx_hash[:8], 'big')
+        h2 = int.from_bytes(tx_hash[8:16], 'big') | 1
+        bit_count = self.bit_count
+        return [(h1 + i * h2) % bit_count for i in range(self.hash_count)]
+
+    def add(self, tx_hash: bytes):
+        bits = self.bits
+        for index in self.indexes(tx_hash):
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, tx_hash: bytes):
+        bits = self.bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self.indexes(tx_hash))
+
+    def dumps(self) -> bytes:
+        return self.HEADER.pack(self.capacity, self.count, self.bit_count, self.hash_count) + self.bits
+
+    @classmethod
+    def loads(cls, data: memoryview, error_rate: float) -> '_BitArray':
+        capacity, count, bit_count, hash_count = cls.HEADER.unpack_from(data)
+        size = (bit_count + 7) // 8
+        bits = bytearray(data[cls.HEADER.size:cls.HEADER.size + size])
+        bit_array = cls(capacity, error_rate, count, bits)
+        if (bit_array.bit_count, bit_array.hash_count, len(bits)) != (bit_count, hash_count, size):
+            raise ValueError(f"Invalid tx bloom filter. capacity({capacity})")
+        return bit_array
+
+
+class TxBloomFilter:
+    """Scalable bloom filter of committed tx hashes.
+
+    "Not in the filter" is exact, "in the filter" should be confirmed by the block DB.
+    A new filter of the double capacity is added when the last filter is full, so it never needs to be rebuilt.
+    `height` is the height of the last block of which tx hashes are added.
+    """
+
+    HEADER = struct.Struct(">qI")  # height, number of filters
+
+    def __init__(self, capacity: int, error_rate: float, height=-1):
+        self.error_rate = error_rate
+        self.height = height
+        self.__filters: List[_BitArray] = [_BitArray(max(capacity, 1), error_rate)]
+        self.__lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return sum(bit_array.count for bit_array in self.__filters)
+
+    @property
+    def filter_count(self) -> int:
+        return len(self.__filters)
+
+    def add(self, tx_hash: bytes):
+        with self.__lock:
+            last_filter = self.__filters[-1]
+            if last_filter.count >= last_filter.capacity:
+                last_filter = _BitArray(last_filter.capacity * 2, self.error_rate)
+                self.__filters.append(last_filter)
+            last_filter.add(tx_hash)
+
+    def __contains__(self, tx_hash: bytes):
+        return any(tx_hash in bit_array for bit_array in self.__filters)
+
+    def dumps(self) -> bytes:
+        with self.__lock:
+            return b''.join([self.HEADER.pack(self.height, len(self.__filters))] +
+                            [bit_array.dumps() for bit_array in self.__filters])
+
+    @classmethod
+    def loads(cls, data: bytes, error_rate: float) -> 'TxBloomFilter':
+        data = memoryview(data)
+        height, filter_count = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+
+        filters = []
+        for _ in range(filter_count):
+            bit_array = _BitArray.loads(data[offset:], error_rate)
+            offset += _BitArray.HEADER.size + len(bit_array.bits)
+            filters.append(bit_array)
+        if not filters or offset != len(data):
+            raise ValueError(f"Invalid tx bloom filter. size({len(data)})")
+
+        tx_filter = cls(1, error_rate, height)
+        tx_filter.__filters = filters
+        return tx_filter
@@ -11,7 +11,6 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from collections import Counter
 from typing import Iterable, List, Dict
 
 from loopchain.blockchain.types import Hash32, ExternalAddress
@@ -43,18 +42,21 @@ class BlockVotes(BaseVotes[BlockVote]):
                                f"{vote}")
         super().verify_vote(vote)
 
+    def _count_key(self, vote: BlockVote):
+        if vote.block_hash == self.block_hash:
+            return True
+        if vote.block_hash == Hash32.empty():
+            return False
+        return None
+
     def is_completed(self):
         return self.get_result() is not None
 
     def get_result(self):
-        true_vote_count = sum(1 for vote in self.votes
-                              if vote and vote.block_hash == self.block_hash)
-        if true_vote_count >= self.quorum:
+        if self._tally[True] >= self.quorum:
             return True
 
-        false_vote_count = sum(1 for vote in self.votes
-                               if vote and vote.block_hash == Hash32.empty())
-        if false_vote_count >= len(self.reps) - self.quorum + 1:
+        if self._tally[False] >= len(self.reps) - self.quorum + 1:
             return False
         return None
 
@@ -113,8 +115,7 @@ class LeaderVotes(BaseVotes[LeaderVote]):
             if majority_count + out_of_round_count >= self.quorum:
                 return True
 
-            empty_count = self.votes.count(None)
-            if majority_count + out_of_round_count + empty_count < self.quorum:
+            if majority_count + out_of_round_count + self.empty_count < self.quorum:
                 # It determines the majority of this votes cannot reach the quorum
                 return True
         return False
@@ -130,14 +131,11 @@ class LeaderVotes(BaseVotes[LeaderVote]):
         return None
 
     def get_majority(self):
-        counter = Counter(vote.result() for vote in self.votes if (vote and vote.result() != ExternalAddress.empty()))
-        majorities = counter.most_common()
-        return majorities
+        return [(new_leader, count) for new_leader, count in super().get_majority()
+                if new_leader != ExternalAddress.empty()]
 
     def get_out_of_round(self):
-        counter = Counter(vote.result() for vote in self.votes if vote)
-        out_of_round = counter[ExternalAddress.empty()]
-        return out_of_round
+        return self._counter[ExternalAddress.empty()]
 
     def get_summary(self):
         msg = super().get_summary()
@@ -169,8 +167,7 @@ class LeaderVotes(BaseVotes[LeaderVote]):
             reps = [vote.rep for vote in votes]
             votes_instance = cls(reps, voting_ratio, votes[0].block_height, votes[0].round_, votes[0].old_leader)
             for vote in votes:
-                index = reps.index(vote.rep)
-                votes_instance.votes[index] = vote
+                votes_instance._set_vote(votes_instance._rep_indexes[vote.rep], vote)
             return votes_instance
         else:
             return cls([], voting_ratio, -1, -1, ExternalAddress.empty())
@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from functools import lru_cache
+from typing import Generic, TypeVar, Tuple, Type, Optional, Callable, ClassVar
 
+from loopchain import configure as conf
 from loopchain.blockchain.types import ExternalAddress, Signature, Hash32
 from loopchain.crypto.hashing import build_hash_generator
 from loopchain.crypto.signature import SignVerifier, Signer
@@ -24,12 +28,53 @@ TResult = TypeVar("TResult")
 hash_generator = build_hash_generator(1, "icx_vote")
 
 
+class VerifiedVoteCache:
+    """Process-wide LRU of (hash, signature) of votes which are verified.
+
+    A vote is verified when it arrives, and again in prev votes or leader votes of the next block and in confirm info
+    of block sync. Each of them is a new Vote object, so memoizing on the object does not help.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+        self.__keys = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __contains__(self, key: Tuple[Hash32, Signature]) -> bool:
+        with self.__lock:
+            if key not in self.__keys:
+                return False
+            self.__keys.move_to_end(key)
+            return True
+
+    def add(self, key: Tuple[Hash32, Signature]):
+        if self.max_size <= 0:
+            return
+
+        with self.__lock:
+            self.__keys[key] = None
+            self.__keys.move_to_end(key)
+            while len(self.__keys) > self.max_size:
+                self.__keys.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__keys.clear()
+
+    def __len__(self):
+        return len(self.__keys)
+
+
 @dataclass(frozen=True)
 class Vote(ABC, Generic[TResult]):
     rep: ExternalAddress
     timestamp: int
     signature: Signature
 
+    _verified_cache: ClassVar[Optional[VerifiedVoteCache]] = None
+    _verified_cache_lock = threading.Lock()
+
     @property
     def version(self):
         raise NotImplementedError
@@ -37,10 +82,17 @@ class Vote(ABC, Generic[TResult]):
     def origin_args(self):
         args = dict(self.__dict__)
         args.pop("signature", None)
+        args.pop("_hash", None)
         return args
 
-    def hash(self):
-        return self.to_hash(**self.origin_args())
+    def hash(self) -> Hash32:
+        """hash of the vote. it is kept in the object and in a LRU by the attributes for other objects of the vote."""
+        try:
+            return self.__dict__["_hash"]
+        except KeyError:
+            hash_ = _to_hash(type(self), tuple(self.origin_args().items()))
+            object.__setattr__(self, "_hash", hash_)
+            return hash_
 
     def serialize(self):
         origin_args = self.origin_args()
@@ -49,13 +101,30 @@ class Vote(ABC, Generic[TResult]):
         return origin_data
 
     def verify(self):
-        hash_ = self.to_hash(**self.origin_args())
+        hash_ = self.hash()
+        # the hash covers the rep, so a signature verified with it can't be valid for another rep.
+        verified_key = (hash_, self.signature)
+        if verified_key in Vote.verified_cache():
+            return
+
         sign_verifier = SignVerifier.from_address(self.rep.hex_hx())
         try:
             sign_verifier.verify_hash(hash_, self.signature)
         except Exception as e:
             raise RuntimeError(f"Invalid vote signature. {self}"
                                f"{e}")
+        Vote.verified_cache().add(verified_key)
+
+    @classmethod
+    def verified_cache(cls) -> VerifiedVoteCache:
+        """The cache is created on first use to be sized by the loaded configuration."""
+        cache = Vote._verified_cache
+        if cache is None:
+            with Vote._verified_cache_lock:
+                if Vote._verified_cache is None:
+                    Vote._verified_cache = VerifiedVoteCache(conf.VERIFIED_VOTE_CACHE_SIZE)
+                cache = Vote._verified_cache
+        return cache
 
     @abstractmethod
     def result(self) -> TResult:
@@ -124,3 +193,23 @@ class Vote(ABC, Generic[TResult]):
     def to_hash(cls, rep: ExternalAddress, timestamp: int, **kwargs):
         origin_data = cls.to_origin_data(rep, timestamp, **kwargs)
         return Hash32(hash_generator.generate_hash(origin_data))
+
+
+_to_hash_cache: Optional[Callable[[Type[Vote], tuple], Hash32]] = None
+_to_hash_cache_lock = threading.Lock()
+
+
+def _to_hash(vote_class: Type[Vote], origin_items: tuple) -> Hash32:
+    """LRU of hashes of votes. It is created on first use to be sized by the loaded configuration."""
+    global _to_hash_cache
+    to_hash = _to_hash_cache
+    if to_hash is None:
+        with _to_hash_cache_lock:
+            if _to_hash_cache is None:
+                _to_hash_cache = lru_cache(maxsize=conf.VERIFIED_VOTE_CACHE_SIZE)(_make_hash)
+            to_hash = _to_hash_cache
+    return to_hash(vote_class, origin_items)
+
+
+def _make_hash(vote_class: Type[Vote], origin_items: tuple) -> Hash32:
+    return vote_class.to_hash(**dict(origin_items))
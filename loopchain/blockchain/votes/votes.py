@@ -12,10 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import math
 from abc import ABC, abstractmethod
 from collections import Counter
-from typing import Iterable, List, Generic, TypeVar, Optional
+from typing import Iterable, List, Generic, TypeVar, Optional, Tuple, Dict, Hashable
 
 from loopchain.blockchain.types import ExternalAddress
 from loopchain.blockchain.votes import Vote
@@ -29,6 +30,11 @@ class Votes(ABC, Generic[TVote]):
     def __init__(self, reps: Iterable['ExternalAddress'], voting_ratio: float, votes: List[TVote] = None):
         super().__init__()
         self.reps = tuple(reps)
+        # slot index of each rep. the first slot is used if a rep is duplicated like tuple.index
+        self._rep_indexes: Dict[ExternalAddress, int] = {}
+        for index, rep in enumerate(self.reps):
+            self._rep_indexes.setdefault(rep, index)
+
         if votes is None:
             self.votes: List[Optional[TVote]] = [None] * len(self.reps)
         else:
@@ -36,6 +42,19 @@ class Votes(ABC, Generic[TVote]):
         self.voting_ratio = voting_ratio
         self.quorum = math.ceil(voting_ratio * len(self.reps))
 
+        # counts of votes in slots by their results for get_majority, and by _count_key for get_result.
+        # they are updated whenever a slot is set.
+        self._counter: Counter = Counter()
+        self._tally: Counter = Counter()
+        self._voted_count = 0
+        for vote in self.votes:
+            if vote:
+                self._counter[vote.result()] += 1
+                self._tally[self._count_key(vote)] += 1
+                self._voted_count += 1
+        # futures of coroutines waiting for completion, with their event loops. see wait_completed()
+        self._completion_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
     def add_vote(self, vote: TVote):
         try:
             self.verify_vote(vote)
@@ -44,8 +63,49 @@ class Votes(ABC, Generic[TVote]):
         except VoteError:
             raise
         else:
-            index = self.reps.index(vote.rep)
-            self.votes[index] = vote
+            self._set_vote(self._rep_indexes[vote.rep], vote)
+            if self._completion_waiters and self.is_completed():
+                self._notify_completed()
+
+    def _set_vote(self, index: int, vote: TVote):
+        old_vote = self.votes[index]
+        if old_vote:
+            self._counter[old_vote.result()] -= 1
+            self._tally[self._count_key(old_vote)] -= 1
+        else:
+            self._voted_count += 1
+        self.votes[index] = vote
+        self._counter[vote.result()] += 1
+        self._tally[self._count_key(vote)] += 1
+
+    def _count_key(self, vote: TVote) -> Hashable:
+        """key of the vote in the tally of votes for get_result"""
+        return vote.result()
+
+    @property
+    def empty_count(self) -> int:
+        return len(self.reps) - self._voted_count
+
+    async def wait_completed(self) -> 'Votes':
+        """wait until the votes are completed by votes added in any thread, as quorum or failure.
+        Wrap it with asyncio.wait_for to wait with a timeout.
+
+        :return: self
+        """
+        loop = asyncio.get_event_loop()
+        waiter = (loop, loop.create_future())
+        self._completion_waiters.append(waiter)
+        try:
+            # check after appending the waiter. votes added before it don't notify the waiter.
+            if not self.is_completed():
+                await waiter[1]
+        finally:
+            self._completion_waiters.remove(waiter)
+        return self
+
+    def _notify_completed(self):
+        for loop, future in tuple(self._completion_waiters):
+            loop.call_soon_threadsafe(_set_completed, future)
 
     def verify(self):
         for rep, vote in zip(self.reps, self.votes):
@@ -63,9 +123,8 @@ class Votes(ABC, Generic[TVote]):
     def verify_vote(self, vote: TVote):
         vote.verify()
 
-        try:
-            index = self.reps.index(vote.rep)
-        except ValueError:
+        index = self._rep_indexes.get(vote.rep)
+        if index is None:
             raise VoteNoRightRep(f"This rep({vote.rep.hex_hx()}) has no right to vote"
                                  f"\nreps({self.reps})")
 
@@ -112,26 +171,23 @@ class Votes(ABC, Generic[TVote]):
         raise NotImplementedError
 
     def get_majority(self):
-        counter = Counter(vote.result() for vote in self.votes if vote)
-        majorities = counter.most_common()
-        return majorities
+        return [(key, count) for key, count in self._counter.most_common() if count]
 
     def get_summary(self):
         def _fill_space(left_str):
             return ' ' * (length - len(str(left_str)))
 
         length = 8
-        counter = Counter(vote.result() for vote in self.votes if vote)
-        for k, v in counter.items():
+        majorities = self.get_majority()
+        for k, v in majorities:
             length = max(length, len(str(k)))
         length += 1
 
         msg = "Votes\n"
-        for k, v in counter.items():
+        for k, v in majorities:
             msg += f"{k} {_fill_space(k)}: {v}/{len(self.reps)}\n"
 
-        empty_count = sum(1 for vote in self.votes if not vote)
-        msg += f"Empty {_fill_space('Empty')}: {empty_count}/{len(self.reps)}\n"
+        msg += f"Empty {_fill_space('Empty')}: {self.empty_count}/{len(self.reps)}\n"
         msg += f"Result {_fill_space('Result')}: {self.get_result()}\n"
         msg += f"Quorum {_fill_space('Quorum')}: {self.quorum}\n"
         return msg
@@ -161,6 +217,11 @@ class Votes(ABC, Generic[TVote]):
                 for vote_data in votes_data]
 
 
+def _set_completed(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
 class VoteSafeDuplicateError(Exception):
     pass
 
@@ -0,0 +1,95 @@
+# Copyright 2019 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Serialized new block announcements shared by citizens"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from loopchain.blockchain.blocks import BlockSerializer
+
+if TYPE_CHECKING:
+    from loopchain.blockchain import BlockChain
+    from loopchain.blockchain.blocks import Block
+
+Announcement = Tuple[str, bytes]  # block json, confirm info
+
+
+class BlockAnnouncements:
+    """Announcements of recent blocks by block hash.
+
+    Every citizen waiting for a new block gets the same announcement, so a block is serialized once.
+    Announcements are keyed by block hash, a block rolled back at the same height is not announced.
+    The json of a new block can be put before the block is added, out of the add block lock.
+    """
+
+    def __init__(self, max_count: int):
+        self.max_count = max_count
+        self.__announcements = OrderedDict()
+        self.__block_jsons = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, blockchain: 'BlockChain', block: 'Block') -> Announcement:
+        with self.__lock:
+            announcement = self.__announcements.get(block.header.hash)
+        if announcement is not None:
+            return announcement
+
+        announcement = self.make(blockchain, block)
+        if announcement[1]:
+            # A block without its confirm info yet is announced with the confirm info from the next block later.
+            self.put(block, announcement)
+        return announcement
+
+    def prepare(self, blockchain: 'BlockChain', block: 'Block'):
+        with self.__lock:
+            if block.header.hash in self.__announcements:
+                return
+        self.get(blockchain, block)
+
+    def put(self, block: 'Block', announcement: Announcement):
+        if self.max_count <= 0:
+            return
+
+        with self.__lock:
+            self.__announcements[block.header.hash] = announcement
+            while len(self.__announcements) > self.max_count:
+                self.__announcements.popitem(last=False)
+
+    def put_block_json(self, block: 'Block', block_json: str):
+        if self.max_count <= 0:
+            return
+
+        with self.__lock:
+            self.__block_jsons[block.header.hash] = block_json
+            while len(self.__block_jsons) > self.max_count:
+                self.__block_jsons.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__announcements.clear()
+            self.__block_jsons.clear()
+
+    def __len__(self):
+        return len(self.__announcements)
+
+    def make(self, blockchain: 'BlockChain', block: 'Block') -> Announcement:
+        confirm_info: bytes = blockchain.find_confirm_info_by_hash(block.header.hash)
+        with self.__lock:
+            block_json: Optional[str] = self.__block_jsons.get(block.header.hash)
+        if block_json is None:
+            bs = BlockSerializer.new(block.header.version, blockchain.tx_versioner)
+            block_json = json.dumps(bs.serialize(block))
+        return block_json, confirm_info
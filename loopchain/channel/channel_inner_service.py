@@ -22,13 +22,16 @@ from loopchain.blockchain.transactions import (Transaction, TransactionSerialize
                                                TransactionVersioner)
 from loopchain.blockchain.types import Hash32
 from loopchain.blockchain.votes import Vote
+from loopchain.channel.block_announcements import BlockAnnouncements
 from loopchain.channel.channel_property import ChannelProperty
+from loopchain.crypto.signature import SignVerifier
 from loopchain.jsonrpc.exception import JsonError
 from loopchain.protos import message_code
 from loopchain.qos.qos_controller import QosController, QosCountControl
 from loopchain.utils.message_queue import StubCollection
 
 if TYPE_CHECKING:
+    from loopchain.blockchain import BlockDumped
     from loopchain.channel.channel_service import ChannelService
 
 
@@ -230,14 +233,15 @@ class ChannelTxReceiverInnerTask:
 
             ts = TransactionSerializer.new(tx_version, tx_type, self.__tx_versioner)
             tx = ts.from_(tx_json)
+            tx_list.append(tx)
 
-            tv = TransactionVerifier.new(tx_version, tx_type, self.__tx_versioner)
+        TransactionVerifier.verify_many(tx_list, self.__tx_versioner)
+        for tx in tx_list:
+            tv = TransactionVerifier.new(tx.version, tx.type(), self.__tx_versioner)
             tv.pre_verify(tx, nid=self.__nid)
 
             tx.size(self.__tx_versioner)
 
-            tx_list.append(tx)
-
         tx_len = len(tx_list)
         if tx_len == 0:
             response_code = message_code.Response.fail
@@ -290,6 +294,7 @@ class ChannelTxReceiverInnerService(MessageQueueService[ChannelTxReceiverInnerTa
         service.serve_all()
 
         service.loop.close()
+        TransactionVerifier.shutdown_workers()
 
         logging.info("ChannelTxReceiverInnerService: stopped")
 
@@ -394,6 +399,7 @@ class ChannelInnerTask:
         self._citizens: Dict[str, CitizenInfo] = dict()
         self._citizen_condition_new_block: Condition = None
         self._citizen_condition_unregister: Condition = None
+        self._block_announcements = BlockAnnouncements(conf.CITIZEN_ANNOUNCEMENT_CACHE_SIZE)
 
         self.__sub_processes = []
         self.__loop_for_sub_services = None
@@ -463,7 +469,7 @@ class ChannelInnerTask:
             if tx.hash.hex() in self._block_manager.get_tx_queue():
                 util.logger.debug(f"tx hash {tx.hash.hex_0x()} already exists in transaction queue.")
                 continue
-            if self._blockchain.find_tx_by_key(tx.hash.hex()):
+            if self._blockchain.has_tx(tx.hash):
                 util.logger.debug(f"tx hash {tx.hash.hex_0x()} already exists in blockchain.")
                 continue
 
@@ -505,11 +511,25 @@ class ChannelInnerTask:
                 await asyncio.sleep(2 * conf.INTERVAL_BLOCKGENERATION)
                 continue
 
-            confirm_info: bytes = self._blockchain.find_confirm_info_by_hash(new_block.header.hash)
-
             logging.debug(f"announce_new_block: height({new_block.header.height}), to: {subscriber_id}")
-            bs = BlockSerializer.new(new_block.header.version, self._blockchain.tx_versioner)
-            return json.dumps(bs.serialize(new_block)), confirm_info
+            return self._block_announcements.get(self._blockchain, new_block)
+
+    def put_new_block_json(self, block: Block, block_json_data: dict):
+        """dump the serialized new block for citizens before the block is added under the add block lock."""
+        if not self._citizens:
+            return
+
+        self._block_announcements.put_block_json(block, json.dumps(block_json_data))
+
+    def prepare_new_block_announcement(self):
+        """serialize the last block once for all citizens before they are notified."""
+        if not self._citizens or not self._blockchain:
+            return
+
+        try:
+            self._block_announcements.prepare(self._blockchain, self._blockchain.last_block)
+        except Exception as e:
+            logging.warning(f"Fail to prepare new block announcement : {e!r}")
 
     @message_queue_task
     async def register_citizen(self, peer_id, target, connected_time):
@@ -598,6 +618,8 @@ class ChannelInnerTask:
         status_data["leader"] = self._block_manager.epoch.leader_id if self._block_manager.epoch else ""
         status_data["epoch_leader"] = self._block_manager.epoch.leader_id if self._block_manager.epoch else ""
         status_data["versions"] = conf.ICON_VERSIONS
+        status_data["block_cache"] = self._blockchain.block_cache_status
+        status_data["signature_cache"] = SignVerifier.recovered_pubkey_cache().status()
 
         return status_data
 
@@ -689,9 +711,22 @@ class ChannelInnerTask:
                 return response_code, None
 
     @message_queue_task(type_=MessageQueueType.Worker)
-    async def announce_unconfirmed_block(self, block_dumped, round_: int) -> None:
+    def relay_broadcast(self, method_name: str, method_param) -> None:
+        """Relay a broadcast message received in a relay tree to the targets in its relay field."""
+        self._channel_service.broadcast_scheduler.schedule_relay(method_name, method_param)
+
+    @message_queue_task(type_=MessageQueueType.Worker)
+    async def announce_unconfirmed_block(self, block_dumped, round_: int, compact=False, peer_target="") -> None:
+        """
+        :param compact: block_dumped has hashes of txs instead of txs
+        :param peer_target: target of the sender to get missing txs of the compact block
+        """
         try:
-            unconfirmed_block = self._blockchain.block_loads(block_dumped)
+            if compact:
+                unconfirmed_block = await asyncio.get_event_loop().run_in_executor(
+                    None, self._block_manager.load_compact_block, block_dumped, peer_target)
+            else:
+                unconfirmed_block = self._blockchain.block_loads(block_dumped)
         except BlockError as e:
             traceback.print_exc()
             logging.error(f"announce_unconfirmed_block: {e}")
@@ -735,11 +770,11 @@ class ChannelInnerTask:
     @message_queue_task
     def block_sync(self, block_hash, block_height):
         response_code = None
-        block: Block = None
+        block: 'BlockDumped' = None
         if block_hash != "":
-            block = self._blockchain.find_block_by_hash(block_hash)
+            block = self._blockchain.find_block_dumped_by_hash(block_hash)
         elif block_height != -1:
-            block = self._blockchain.find_block_by_height(block_height)
+            block = self._blockchain.find_block_dumped_by_height(block_height)
         else:
             response_code = message_code.Response.fail_not_enough_data
 
@@ -754,14 +789,83 @@ class ChannelInnerTask:
             return response_code, -1, self._blockchain.block_height, unconfirmed_block_height, None, None
 
         confirm_info = None
-        if 0 < block.header.height <= self._blockchain.block_height:
-            confirm_info = self._blockchain.find_confirm_info_by_hash(block.header.hash)
-            if not confirm_info and parse_version(block.header.version) >= parse_version("0.3"):
+        if 0 < block.height <= self._blockchain.block_height:
+            confirm_info = self._blockchain.find_confirm_info_by_hash(block.hash)
+            if not confirm_info and parse_version(block.version) >= parse_version("0.3"):
                 response_code = message_code.Response.fail_no_confirm_info
                 return response_code, -1, self._blockchain.block_height, unconfirmed_block_height, None, None
 
-        return (message_code.Response.success, block.header.height, self._blockchain.block_height,
-                unconfirmed_block_height, confirm_info, self._blockchain.block_dumps(block))
+        return (message_code.Response.success, block.height, self._blockchain.block_height,
+                unconfirmed_block_height, confirm_info, block.dumped)
+
+    @message_queue_task
+    def get_unconfirmed_block(self, block_hash: str, tx_hashes: List[str]):
+        """Txs of the unconfirmed block in the order of tx_hashes, or the whole block if tx_hashes is empty.
+
+        :return: response_code, txs, block_dumped
+        """
+        block = self._block_manager.find_unconfirmed_block(Hash32.fromhex(block_hash, ignore_prefix=True))
+        if block is None:
+            return message_code.Response.fail_wrong_block_hash, [], None
+        if not tx_hashes:
+            return message_code.Response.success, [], self._blockchain.block_dumps(block)
+
+        txs = []
+        for tx_hash in tx_hashes:
+            tx = block.body.transactions.get(Hash32.fromhex(tx_hash, ignore_prefix=True))
+            if tx is None:
+                return message_code.Response.fail_invalid_key_error, [], None
+            ts = TransactionSerializer.new(tx.version, tx.type(), self._blockchain.tx_versioner)
+            txs.append(json.dumps(ts.to_full_data(tx)).encode(encoding=conf.PEER_DATA_ENCODING))
+        return message_code.Response.success, txs, None
+
+    @message_queue_task
+    def block_sync_range(self, start_height: int, max_count: int, max_bytes: int):
+        """Consecutive blocks from start_height limited by count and total bytes.
+        At least one block is returned if the block of start_height exists.
+
+        :return: response_code, max_block_height, unconfirmed_block_height, blocks, confirm_infos
+        """
+        max_count = min(max(max_count, 1), conf.BLOCK_SYNC_RANGE_MAX_COUNT)
+        if max_bytes <= 0 or max_bytes > conf.BLOCK_SYNC_RANGE_MAX_BYTES:
+            max_bytes = conf.BLOCK_SYNC_RANGE_MAX_BYTES
+
+        last_unconfirmed_block = self._blockchain.last_unconfirmed_block
+        if last_unconfirmed_block is None:
+            unconfirmed_block_height = -1
+        else:
+            unconfirmed_block_height = last_unconfirmed_block.header.height
+
+        response_code = message_code.Response.success
+        blocks: List[bytes] = []
+        confirm_infos: List[bytes] = []
+        total_bytes = 0
+        for block in self._blockchain.find_blocks_dumped_by_height_range(start_height, max_count):
+            confirm_info = b''
+            if 0 < block.height:
+                confirm_info = self._blockchain.find_confirm_info_by_hash(block.hash)
+                if not confirm_info and parse_version(block.version) >= parse_version("0.3"):
+                    if not blocks:
+                        response_code = message_code.Response.fail_no_confirm_info
+                    break
+
+            block_dumped = block.dumped
+            total_bytes += len(block_dumped) + len(confirm_info)
+            if blocks and total_bytes > max_bytes:
+                break
+            blocks.append(block_dumped)
+            confirm_infos.append(confirm_info)
+
+        next_height = start_height + len(blocks)
+        if (response_code == message_code.Response.success and len(blocks) < max_count and
+                last_unconfirmed_block and next_height == unconfirmed_block_height):
+            blocks.append(self._blockchain.block_dumps(last_unconfirmed_block))
+            confirm_infos.append(b'')
+
+        if not blocks and response_code == message_code.Response.success:
+            response_code = message_code.Response.fail_wrong_block_height
+
+        return response_code, self._blockchain.block_height, unconfirmed_block_height, blocks, confirm_infos
 
     @message_queue_task(type_=MessageQueueType.Worker)
     def vote_unconfirmed_block(self, vote_dumped: str) -> None:
@@ -777,10 +881,6 @@ class ChannelInnerTask:
             )
             self._block_manager.candidate_blocks.add_vote(vote)
 
-            if self._channel_service.state_machine.state == "BlockGenerate" and \
-                    self._block_manager.consensus_algorithm:
-                self._block_manager.consensus_algorithm.vote(vote)
-
     @message_queue_task(type_=MessageQueueType.Worker)
     async def complain_leader(self, vote_dumped: str) -> None:
         vote_serialized = json.loads(vote_dumped)
@@ -922,6 +1022,14 @@ class ChannelInnerTask:
 
         return tx_list, next_index
 
+    @message_queue_task
+    async def find_event_logs(self, from_height: int, to_height: int, score_address: str = None,
+                              indexed: list = None) -> Union[list, dict]:
+        try:
+            return self._blockchain.find_event_logs(from_height, to_height, score_address, indexed or ())
+        except Exception as e:
+            return make_error_response(JsonError.INVALID_PARAMS, str(e))
+
     @message_queue_task
     async def get_tx_proof(self, tx_hash: str) -> Union[list, dict]:
         try:
@@ -991,7 +1099,11 @@ class ChannelInnerService(MessageQueueService[ChannelInnerTask]):
     def _callback_connection_lost_callback(self, connection: RobustConnection):
         util.exit_and_msg("MQ Connection lost.")
 
+    def put_new_block_json(self, block: Block, block_json_data: dict):
+        self._task.put_new_block_json(block, block_json_data)
+
     def notify_new_block(self):
+        self._task.prepare_new_block_announcement()
 
         async def _notify_new_block():
             condition = self._task._citizen_condition_new_block
@@ -26,6 +26,7 @@ from loopchain.baseservice import (BroadcastScheduler, BroadcastSchedulerFactory
                                    RestClient, NodeSubscriber, UnregisteredException, TimerService)
 from loopchain.blockchain.blocks import Block
 from loopchain.blockchain.exception import AnnounceNewBlockError, WritePrecommitStateError
+from loopchain.blockchain.transactions import TransactionVerifier
 from loopchain.blockchain.types import ExternalAddress, TransactionStatusInQueue
 from loopchain.channel.channel_inner_service import ChannelInnerService
 from loopchain.channel.channel_property import ChannelProperty
@@ -175,6 +176,9 @@ class ChannelService:
             self.__timer_service.wait()
             logging.info("Cleanup TimerService.")
 
+        TransactionVerifier.shutdown_workers()
+        logging.info("Cleanup TransactionVerifier workers.")
+
     async def init(self, **kwargs):
         """Initialize Channel Service
 
@@ -287,6 +291,7 @@ class ChannelService:
                 channel_name=ChannelProperty().name,
                 store_identity=ChannelProperty().peer_target
             )
+            self.__block_manager.blockchain.start_migrations()
         except KeyValueStoreError as e:
             utils.exit_and_msg("KeyValueStoreError(" + str(e) + ")")
 
@@ -126,8 +126,10 @@ class ConsensusAlgorithm(IntEnum):
 
 INTERVAL_BLOCKGENERATION = 2
 INTERVAL_BROADCAST_SEND_UNCONFIRMED_BLOCK = INTERVAL_BLOCKGENERATION
+# announce unconfirmed blocks with hashes of txs, reps build them with txs in their tx queue.
+# all reps of the network should support it before it is turned on.
+COMPACT_BLOCK_ANNOUNCEMENT = False
 MAX_MADE_BLOCK_COUNT = 10
-WAIT_SECONDS_FOR_VOTE = 0.2
 # blockchain 용 level db 생성 재시도 횟수, 테스트가 아닌 경우 1로 설정하여도 무방하다.
 MAX_RETRY_CREATE_DB = 10
 # default key value store type
@@ -148,6 +150,11 @@ MAX_BLOCK_KBYTES = 3000  # default: 3000
 # The total size of the transactions in a block.
 MAX_TX_SIZE_IN_BLOCK = 1 * 1024 * 1024  # 1 MB is better than 2 MB (because tx invoke need CPU time)
 MAX_TX_COUNT_IN_ADDTX_LIST = 128  # AddTxList can send multiple tx in one message.
+# Hashes and signatures of txs in a block or an AddTxList message are verified by worker processes.
+TX_VERIFY_WORKER_COUNT = os.cpu_count() or 1  # 1 verifies txs in the calling process.
+TX_VERIFY_PARALLEL_MIN_COUNT = 64  # smaller batches are verified in the calling process.
+SIGNATURE_CACHE_SIZE = 100_000  # recovered signer public keys by (hash, signature), 0 disables the cache.
+VERIFIED_VOTE_CACHE_SIZE = 10_000  # verified (hash, signature) and hashes of votes, 0 disables the caches.
 SEND_TX_LIST_DURATION = 0.3  # seconds
 # Consensus Vote Ratio 1 = 100%, 0.5 = 50%
 VOTING_RATIO = 0.67  # for Add Block
@@ -159,8 +166,9 @@ BLOCK_VOTE_TIMEOUT = 60 * 5  # seconds
 CANDIDATE_BLOCK_TIMEOUT = 60 * 60  # seconds
 # default storage path
 DEFAULT_STORAGE_PATH = os.getenv('DEFAULT_STORAGE_PATH', os.path.join(LOOPCHAIN_ROOT_PATH, '.storage'))
-# max tx list size by address
+# prefix of legacy pickled tx list pages by address. they are migrated to the tx index by address on startup.
 TX_LIST_ADDRESS_PREFIX = b'tx_list_by_address_'
+# max tx list size of a page of txs by address
 MAX_TX_LIST_SIZE_BY_ADDRESS = 100
 MAX_PRE_VALIDATE_TX_CACHE = 10000
 TIMESTAMP_BOUNDARY_SECOND = 60 * 15
@@ -169,6 +177,21 @@ TIMESTAMP_BOUNDARY_SECOND = 60 * 15
 TIMESTAMP_BUFFER_IN_VERIFIER = int(0.3 * 1_000_000)  # 300ms (as microsecond)
 MAX_TX_QUEUE_AGING_SECONDS = 60 * 5
 INVOKE_RESULT_AGING_SECONDS = 60 * 60
+BLOCK_CACHE_MAX_BLOCK_BYTES = 32 * 1024 * 1024  # deserialized blocks, accounted by their serialized size
+BLOCK_CACHE_MAX_SERIALIZED_BYTES = 64 * 1024 * 1024  # serialized blocks as stored in the block DB
+BLOCK_CACHE_MAX_DUMPED_BYTES = 32 * 1024 * 1024  # compressed block payloads served by block sync, 0 to disable
+# compress the block sync payload of a new block when it is added. Blocks added by block height sync or imported
+# are compressed when a peer requests them.
+BLOCK_CACHE_PRECOMPRESS_NEW_BLOCK = True
+TX_FILTER_CAPACITY = 1_000_000  # tx hashes in the first bloom filter of committed txs, the next one is doubled
+TX_FILTER_ERROR_RATE = 0.001  # false positive rate of the bloom filter of committed txs
+TX_FILTER_CHECKPOINT_BLOCKS = 1000  # blocks between checkpoints of the bloom filter of committed txs in the block DB
+LOGS_BLOOM_SECTION_SIZE = 64  # blocks in a section of the logs bloom index, and sections in an upper section
+LOGS_BLOOM_SECTION_LEVELS = 3  # levels of sections of the logs bloom index
+LOGS_BLOOM_MIGRATION_BATCH_SIZE = 1000  # blocks in a write batch of adding blocks before the index in background
+MAX_EVENT_LOGS_BY_QUERY = 1000  # max event logs of a query of event logs
+ROLL_BACK_PROGRESS_INTERVAL = 1000  # blocks between progress reports of roll back
+BLOCK_IMPORT_BATCH_SIZE = 1000  # blocks in a write batch of the offline block import
 SAFE_BLOCK_BROADCAST = True
 
 
@@ -226,11 +249,27 @@ WAIT_SUB_PROCESS_RETRY_TIMES = 5
 INTERVAL_SECONDS_PROCESS_MONITORING = 30  # seconds
 PEER_NAME = "no_name"
 IS_BROADCAST_ASYNC = True
+# children of each rep in the relay tree of unconfirmed blocks and tx lists, 0 sends them to all reps directly.
+# all reps of the network should support the relay before it is turned on.
+RELAY_TREE_FANOUT = 0
+RELAY_TREE_TIMEOUT = 2  # seconds to wait for a child before sending the message to its subtree directly.
+RELAYED_MESSAGES_SIZE = 10_000  # ids of relayed messages kept to drop duplicates.
 SUBSCRIBE_LIMIT = 10
+CITIZEN_ANNOUNCEMENT_CACHE_SIZE = 32  # serialized recent blocks shared by citizens, lagging citizens read older ones from DB
 SUBSCRIBE_RETRY_TIMER = 14
 SHUTDOWN_TIMER = 60 * 120
 GET_LAST_BLOCK_TIMER = 30
 BLOCK_SYNC_RETRY_NUMBER = 5
+BLOCK_SYNC_WINDOW_SIZE = 8  # max number of in-flight block requests during block height sync
+BLOCK_SYNC_PEER_MAX_FAILURES = 3  # consecutive failures before a peer is excluded from block height sync
+BLOCK_SYNC_SLOW_PEER_RATIO = 4.0  # a peer slower than the fastest peer by this ratio is excluded
+BLOCK_SYNC_SLOW_PEER_MIN_SAMPLES = 5  # received blocks needed before judging a peer as slow
+BLOCK_SYNC_RANGE_COUNT = 16  # number of blocks requested by a BlockSyncRange request during block height sync
+BLOCK_SYNC_RANGE_MAX_COUNT = 32  # max number of blocks in a BlockSyncRange reply
+BLOCK_SYNC_RANGE_MAX_BYTES = 3 * 1024 * 1024  # keep a BlockSyncRange reply under the default gRPC message limit
+SYNC_WRITE_BATCH_MAX_BLOCKS = 64  # max blocks in a write batch during block height sync, 1 writes every block
+SYNC_WRITE_BATCH_MAX_TXS = 20000  # a write batch during block height sync is written when it has more txs
+SYNC_WRITE_BATCH_MAX_SECONDS = 1.0  # max seconds a block waits in a write batch during block height sync
 TIMEOUT_FOR_LEADER_COMPLAIN = 60
 MAX_TIMEOUT_FOR_LEADER_COMPLAIN = 300
 
@@ -308,7 +347,8 @@ CHANNEL_OPTION = {
         "consensus_cert_use": False,
         "tx_cert_use": False,
         "key_load_type": KeyLoadType.FILE_LOAD,
-        "crep_root_hash": ""
+        "crep_root_hash": "",
+        "record_format": "json"  # format of new records in the block DB [json|binary]. binary is smaller, read slower
     },
     LOOPCHAIN_TEST_CHANNEL: {
         "block_versions": {
@@ -324,7 +364,8 @@ CHANNEL_OPTION = {
         "consensus_cert_use": False,
         "tx_cert_use": False,
         "key_load_type": KeyLoadType.FILE_LOAD,
-        "crep_root_hash": ""
+        "crep_root_hash": "",
+        "record_format": "json"  # format of new records in the block DB [json|binary]. binary is smaller, read slower
     }
 }
 
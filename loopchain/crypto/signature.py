@@ -16,20 +16,77 @@
 import binascii
 import hashlib
 import logging
-from typing import Union, Type, TypeVar
+import threading
+from collections import OrderedDict
+from typing import Union, Type, TypeVar, Optional
 
 import eth_keyfile
 from secp256k1 import Base, ALL_FLAGS
 from secp256k1 import PrivateKey, PublicKey
 
+from loopchain import configure as conf
 from loopchain.crypto.cert_serializers import DerSerializer, PemSerializer
 
 T = TypeVar('T', bound='SignVerifier')
 
 
+class RecoveredPubkeyCache:
+    """Process-wide LRU of public keys recovered from (data, signature).
+
+    The same signature is recovered several times on a node, e.g. AddTxList, unconfirmed block and block sync.
+    Each of them has its own Transaction or Vote object, so caching on the object does not help.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self.__pubkeys = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self.__lock:
+            pubkey = self.__pubkeys.get(key)
+            if pubkey is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.__pubkeys.move_to_end(key)
+            return pubkey
+
+    def put(self, key, pubkey: bytes):
+        if self.max_size <= 0:
+            return
+
+        with self.__lock:
+            self.__pubkeys[key] = pubkey
+            self.__pubkeys.move_to_end(key)
+            while len(self.__pubkeys) > self.max_size:
+                self.__pubkeys.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__pubkeys.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def status(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "count": len(self.__pubkeys),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0
+        }
+
+
 class SignVerifier:
     _base = Base(None, ALL_FLAGS)
     _pri = PrivateKey(ctx=_base.ctx)
+    _recovered_pubkey_cache: RecoveredPubkeyCache = None
+    _recovered_pubkey_cache_lock = threading.Lock()
 
     def __init__(self):
         self.address: str = None
@@ -49,18 +106,47 @@ class SignVerifier:
 
     def verify_signature(self, origin_data: bytes, signature: bytes, is_hash: bool):
         try:
-            origin_signature, recover_code = signature[:-1], signature[-1]
-            recoverable_sig = self._pri.ecdsa_recoverable_deserialize(origin_signature, recover_code)
-            pub = self._pri.ecdsa_recover(origin_data,
-                                          recover_sig=recoverable_sig,
-                                          raw=is_hash,
-                                          digest=hashlib.sha3_256)
-            extract_pub = PublicKey(pub, ctx=self._base.ctx).serialize(compressed=False)
-            return self.verify_address(extract_pub)
+            cache_key = self.__recovered_pubkey_cache_key(origin_data, signature, is_hash)
+            extract_pub = self.recovered_pubkey_cache().get(cache_key)
+            if extract_pub is None:
+                origin_signature, recover_code = signature[:-1], signature[-1]
+                recoverable_sig = self._pri.ecdsa_recoverable_deserialize(origin_signature, recover_code)
+                pub = self._pri.ecdsa_recover(origin_data,
+                                              recover_sig=recoverable_sig,
+                                              raw=is_hash,
+                                              digest=hashlib.sha3_256)
+                extract_pub = PublicKey(pub, ctx=self._base.ctx).serialize(compressed=False)
+                self.recovered_pubkey_cache().put(cache_key, extract_pub)
+
+            self.verify_address(extract_pub)
         except Exception as e:
             raise RuntimeError(f"signature verification fail : {origin_data} {signature}\n"
                                f"{e}")
 
+    @classmethod
+    def recovered_pubkey_cache(cls) -> RecoveredPubkeyCache:
+        """The cache is created on first use to be sized by the loaded configuration."""
+        cache = SignVerifier._recovered_pubkey_cache
+        if cache is None:
+            with SignVerifier._recovered_pubkey_cache_lock:
+                if SignVerifier._recovered_pubkey_cache is None:
+                    SignVerifier._recovered_pubkey_cache = RecoveredPubkeyCache(conf.SIGNATURE_CACHE_SIZE)
+                cache = SignVerifier._recovered_pubkey_cache
+        return cache
+
+    @classmethod
+    def find_recovered_pubkey(cls, origin_data: bytes, signature: bytes, is_hash: bool) -> Optional[bytes]:
+        return cls.recovered_pubkey_cache().get(cls.__recovered_pubkey_cache_key(origin_data, signature, is_hash))
+
+    @classmethod
+    def cache_recovered_pubkey(cls, origin_data: bytes, signature: bytes, is_hash: bool, pubkey: bytes):
+        """cache the public key recovered from the signature in another process"""
+        cls.recovered_pubkey_cache().put(cls.__recovered_pubkey_cache_key(origin_data, signature, is_hash), pubkey)
+
+    @staticmethod
+    def __recovered_pubkey_cache_key(origin_data: bytes, signature: bytes, is_hash: bool) -> tuple:
+        return bytes(origin_data), bytes(signature), is_hash
+
     @classmethod
     def address_from_pubkey(cls, pubkey: bytes):
         hash_pub = hashlib.sha3_256(pubkey[1:]).hexdigest()
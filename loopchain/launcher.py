@@ -25,6 +25,7 @@ from loopchain import configure as conf
 from loopchain import utils
 from loopchain.channel.channel_service import ChannelService
 from loopchain.peer import PeerService
+from loopchain.tools import block_archive
 from loopchain.tools.grpc_helper import grpc_patcher
 from loopchain.utils import loggers, command_arguments, async_
 
@@ -50,6 +51,11 @@ def get_quick_command(unknowns):
 
 
 def main(argv):
+    if argv[:1] == ["tool"] and argv[1:2] and argv[1] in block_archive.COMMANDS:
+        # offline tools of the block DB have their own arguments.
+        block_archive.main(argv[1:])
+        return
+
     parser = argparse.ArgumentParser()
     for cmd_arg_type in command_arguments.Type:
         cmd_arg_attr = command_arguments.attributes[cmd_arg_type]
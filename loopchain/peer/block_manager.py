@@ -1,18 +1,21 @@
 """A management class for blockchain."""
 
+import heapq
 import json
 import threading
+import time
 import traceback
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from typing import TYPE_CHECKING, Dict, DefaultDict, Optional, Tuple, List, cast
 
+import grpc
 from pkg_resources import parse_version
 
 import loopchain.utils as util
 from loopchain import configure as conf
 from loopchain.baseservice import TimerService, ObjectManager, Timer, RestMethod
-from loopchain.baseservice.aging_cache import AgingCache
+from loopchain.baseservice.tx_pool import TxPool
 from loopchain.blockchain import (BlockChain, CandidateBlocks, Epoch, BlockchainError, NID, exception,
                                   NoConfirmInfo,
                                   BlockHeightMismatch, RoundMismatch)
@@ -31,6 +34,7 @@ from loopchain.blockchain.votes import Vote, Votes
 from loopchain.blockchain.votes.v0_5 import LeaderVote
 from loopchain.channel.channel_property import ChannelProperty
 from loopchain.peer import status_code
+from loopchain.peer.block_sync_peers import BlockSyncPeers, take_block_range
 from loopchain.peer.consensus_siever import ConsensusSiever
 from loopchain.protos import loopchain_pb2, loopchain_pb2_grpc, message_code
 from loopchain.store.key_value_store import KeyValueStore
@@ -55,8 +59,8 @@ class BlockManager:
         self.__pre_validate_strategy = self.__pre_validate
         self.__peer_id = peer_id
 
-        self.__txQueue = AgingCache(max_age_seconds=conf.MAX_TX_QUEUE_AGING_SECONDS,
-                                    default_item_status=TransactionStatusInQueue.normal)
+        self.__txQueue = TxPool(max_age_seconds=conf.MAX_TX_QUEUE_AGING_SECONDS,
+                                default_item_status=TransactionStatusInQueue.normal)
         self.blockchain = BlockChain(channel_name, store_identity, self)
         self.__peer_type = None
         self.__consensus_algorithm = None
@@ -167,13 +171,110 @@ class BlockManager:
             f"height({block_.header.height}) round({round_}) block({block_.header.hash}) peers: "
             f"target_reps_hash({target_reps_hash})")
 
-        block_dumped = self.blockchain.block_dumps(block_)
+        compact = conf.COMPACT_BLOCK_ANNOUNCEMENT
+        block_dumped = self.blockchain.block_dumps(block_, compact=compact)
         ObjectManager().channel_service.broadcast_scheduler.schedule_broadcast(
             "AnnounceUnconfirmedBlock",
-            loopchain_pb2.BlockSend(block=block_dumped, round_=round_, channel=self.__channel_name),
+            loopchain_pb2.BlockSend(block=block_dumped, round_=round_, channel=self.__channel_name,
+                                    compact=compact, peer_target=ChannelProperty().peer_target),
             reps_hash=target_reps_hash
         )
 
+    def find_unconfirmed_block(self, block_hash: Hash32) -> Optional[Block]:
+        candidate_block = self.candidate_blocks.blocks.get(block_hash)
+        if candidate_block and candidate_block.block:
+            return candidate_block.block
+
+        last_unconfirmed_block = self.blockchain.last_unconfirmed_block
+        if last_unconfirmed_block and last_unconfirmed_block.header.hash == block_hash:
+            return last_unconfirmed_block
+        return None
+
+    def load_compact_block(self, block_dumped: bytes, peer_target: str) -> Block:
+        """Load a compact unconfirmed block with txs in the tx queue.
+        Missing txs are requested to the sender at once.
+        The whole block is requested instead if the sender does not give the txs of the hashes.
+
+        :param block_dumped: block dumped by BlockChain.block_dumps(block, compact=True)
+        :param peer_target: target of the sender. it is requested only if it is a target of reps of the block.
+        """
+        block, tx_hashes = self.blockchain.compact_block_loads(block_dumped)
+        txs = [self.__txQueue.get(tx_hash.hex()) for tx_hash in tx_hashes]
+        missing_tx_hashes = [tx_hash.hex() for tx_hash, tx in zip(tx_hashes, txs) if tx is None]
+        if not missing_tx_hashes:
+            return self.blockchain.put_transactions(block, txs)
+
+        peer_target = self.__compact_block_target(block, peer_target)
+        util.logger.debug(f"load_compact_block: request {len(missing_tx_hashes)}/{len(tx_hashes)} txs "
+                          f"of block({block.header.hash.hex()}) to peer_target({peer_target})")
+        channel = GRPCHelper().create_client_channel(peer_target)
+        try:
+            return self.__load_compact_block_from_peer(
+                loopchain_pb2_grpc.PeerServiceStub(channel), peer_target, block, txs, missing_tx_hashes)
+        finally:
+            channel.close()
+
+    def __compact_block_target(self, block: Block, peer_target: str) -> str:
+        """target to request missing txs of a compact block.
+        The sender is requested only if it is a rep of the block, otherwise the leader of the block is.
+        """
+        rep_targets = self.blockchain.find_preps_targets_by_roothash(
+            self.blockchain.get_reps_hash_by_header(block.header))
+        if peer_target in rep_targets.values():
+            return peer_target
+
+        leader_target = rep_targets.get(block.header.peer_id.hex_hx())
+        if leader_target is None:
+            raise exception.BlockError(f"Neither peer_target({peer_target}) nor the leader of "
+                                       f"block({block.header.hash.hex()}) is a rep.")
+        util.logger.warning(f"load_compact_block: peer_target({peer_target}) is not a rep, "
+                            f"request the leader({leader_target}) instead.")
+        return leader_target
+
+    def __load_compact_block_from_peer(self, stub, peer_target: str, block: Block, txs: list,
+                                       missing_tx_hashes: List[str]) -> Block:
+        try:
+            missing_txs = iter(self.__request_unconfirmed_block_txs(stub, block.header.hash, missing_tx_hashes))
+            return self.blockchain.put_transactions(block, [tx or next(missing_txs) for tx in txs])
+        except Exception as e:
+            util.logger.warning(f"load_compact_block: request the whole block({block.header.hash.hex()}) "
+                                f"to peer_target({peer_target}) for missing txs. {e!r}")
+
+        block_hash = block.header.hash.hex()
+        try:
+            response = stub.GetUnconfirmedBlock(loopchain_pb2.UnconfirmedBlockRequest(
+                block_hash=block_hash, channel=self.__channel_name), conf.GRPC_TIMEOUT_SHORT)
+        except grpc.RpcError as e:
+            raise exception.BlockError(f"Failed to get block({block_hash}) from peer_target({peer_target}). {e}")
+        if response.response_code != message_code.Response.success:
+            raise exception.BlockError(f"Failed to get block({block_hash}) from peer_target({peer_target}). "
+                                       f"response_code({response.response_code})")
+
+        whole_block = self.blockchain.block_loads(response.block)
+        if whole_block.header.hash != block.header.hash:
+            raise exception.BlockError(f"Block({whole_block.header.hash.hex()}) from peer_target({peer_target}) "
+                                       f"is not the announced block({block_hash}).")
+        return whole_block
+
+    def __request_unconfirmed_block_txs(self, stub, block_hash: Hash32, tx_hashes: List[str]) -> List[Transaction]:
+        response = stub.GetUnconfirmedBlock(loopchain_pb2.UnconfirmedBlockRequest(
+            block_hash=block_hash.hex(), tx_hashes=tx_hashes, channel=self.__channel_name), conf.GRPC_TIMEOUT_SHORT)
+        if response.response_code != message_code.Response.success:
+            raise RuntimeError(f"response_code({response.response_code})")
+        if len(response.txs) != len(tx_hashes):
+            raise RuntimeError(f"{len(response.txs)} txs are given for {len(tx_hashes)} tx hashes.")
+
+        tx_versioner = self.blockchain.tx_versioner
+        txs = []
+        for tx_hash, tx_dumped in zip(tx_hashes, response.txs):
+            tx_json = json.loads(tx_dumped)
+            tx_version, tx_type = tx_versioner.get_version(tx_json)
+            tx = TransactionSerializer.new(tx_version, tx_type, tx_versioner).from_(tx_json)
+            if tx.hash.hex() != tx_hash:
+                raise RuntimeError(f"Tx({tx.hash.hex()}) is given for tx hash({tx_hash}).")
+            txs.append(tx)
+        return txs
+
     def add_tx_obj(self, tx):
         """전송 받은 tx 를 Block 생성을 위해서 큐에 입력한다. load 하지 않은 채 입력한다.
 
@@ -221,7 +322,7 @@ class BlockManager:
             return
 
         items = list(self.__txQueue.d.values())
-        self.__txQueue.d.clear()
+        self.__txQueue.clear()
 
         for item in items:
             tx = item.value
@@ -392,20 +493,54 @@ class BlockManager:
 
             return need_to_sync, self.__block_height_future
 
-    def __block_request(self, peer_stub, block_height):
-        """request block by gRPC or REST
+    def __block_request(self, peer_stub, block_height, max_count=1):
+        """request blocks by gRPC or REST
 
         :param peer_stub:
-        :param block_height:
-        :return block, max_block_height, confirm_info, response_code
+        :param block_height: height of the first block
+        :param max_count: max number of consecutive blocks to request
+        :return [(block, confirm_info), ...], max_block_height, unconfirmed_block_height, response_code
         """
         if ObjectManager().channel_service.is_support_node_function(conf.NodeFunction.Vote):
-            return self.__block_request_by_voter(block_height, peer_stub)
+            return self.__block_request_by_voter(block_height, peer_stub, max_count)
         else:
             # request REST(json-rpc) way to RS peer
-            return self.__block_request_by_citizen(block_height)
+            block, max_height, unconfirmed_block_height, votes, response_code = \
+                self.__block_request_by_citizen(block_height)
+            return [(block, votes)], max_height, unconfirmed_block_height, response_code
+
+    def __block_request_by_voter(self, block_height, peer_stub, max_count):
+        try:
+            response = peer_stub.BlockSyncRange(loopchain_pb2.BlockSyncRangeRequest(
+                start_height=block_height,
+                max_count=max_count,
+                max_bytes=conf.BLOCK_SYNC_RANGE_MAX_BYTES,
+                channel=self.__channel_name
+            ), conf.GRPC_TIMEOUT)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                raise
+            # the peer does not support BlockSyncRange yet.
+            block, max_block_height, unconfirmed_block_height, votes, response_code = \
+                self.__block_request_by_voter_one(block_height, peer_stub)
+            return [(block, votes)], max_block_height, unconfirmed_block_height, response_code
 
-    def __block_request_by_voter(self, block_height, peer_stub):
+        if response.response_code == message_code.Response.fail_no_confirm_info:
+            raise NoConfirmInfo(f"The peer has not confirm_info of the block by height({block_height}).")
+
+        blocks = []
+        for block_dumped, votes_dumped in zip(response.blocks, response.confirm_infos):
+            try:
+                block = self.blockchain.block_loads(block_dumped)
+            except Exception as e:
+                traceback.print_exc()
+                raise exception.BlockError(f"Received block is invalid: original exception={e}")
+
+            blocks.append((block, self.__load_votes(block.header.height, votes_dumped)))
+
+        return blocks, response.max_block_height, response.unconfirmed_block_height, response.response_code
+
+    def __block_request_by_voter_one(self, block_height, peer_stub):
         response = peer_stub.BlockSync(loopchain_pb2.BlockSyncRequest(
             block_height=block_height,
             channel=self.__channel_name
@@ -420,16 +555,18 @@ class BlockManager:
                 traceback.print_exc()
                 raise exception.BlockError(f"Received block is invalid: original exception={e}")
 
-            votes_dumped: bytes = response.confirm_info
-            try:
-                votes_serialized = json.loads(votes_dumped)
-                version = self.blockchain.block_versioner.get_version(block_height)
-                votes = Votes.get_block_votes_class(version).deserialize_votes(votes_serialized)
-            except json.JSONDecodeError:
-                votes = votes_dumped
+            votes = self.__load_votes(block_height, response.confirm_info)
 
         return block, response.max_block_height, response.unconfirmed_block_height, votes, response.response_code
 
+    def __load_votes(self, block_height, votes_dumped: bytes):
+        try:
+            votes_serialized = json.loads(votes_dumped)
+            version = self.blockchain.block_versioner.get_version(block_height)
+            return Votes.get_block_votes_class(version).deserialize_votes(votes_serialized)
+        except json.JSONDecodeError:
+            return votes_dumped
+
     def __block_request_by_citizen(self, block_height):
         rs_client = ObjectManager().channel_service.rs_client
         get_block_result = rs_client.call(
@@ -549,85 +686,164 @@ class BlockManager:
                                       reps_getter=reps_getter)
         return self.blockchain.add_block(prev_block, confirm_info)
 
+    def __timed_block_request(self, peer_stub, block_height, max_count):
+        start_time = time.monotonic()
+        result = self.__block_request(peer_stub, block_height, max_count)
+        return (*result, time.monotonic() - start_time)
+
     def __block_request_to_peers_in_sync(self, peer_stubs, my_height, unconfirmed_block_height, max_height):
         """Extracted func from __block_height_sync.
         It has block request loop with peer_stubs for block height sync.
 
+        Up to conf.BLOCK_SYNC_WINDOW_SIZE range requests are in flight over peer_stubs at once.
+        Received blocks are kept in a reorder buffer by height and added to the blockchain in order.
+        Peers which fail repeatedly or are much slower than the others are demoted to bad targets.
+
         :param peer_stubs:
         :param my_height:
         :param unconfirmed_block_height:
         :param max_height:
         :return: my_height, max_height
         """
-        peer_index = 0
-
-        while max_height > my_height:
-            if self.__channel_service.state_machine.state != 'BlockSync':
-                break
-
-            peer_target, peer_stub = peer_stubs[peer_index]
-            util.logger.info(f"Block Height Sync Target : {peer_target} / request height({my_height + 1})")
-            try:
-                block, max_block_height, current_unconfirmed_block_height, confirm_info, response_code = \
-                    self.__block_request(peer_stub, my_height + 1)
-            except NoConfirmInfo as e:
-                util.logger.warning(f"{e}")
-                response_code = message_code.Response.fail_no_confirm_info
-            except Exception as e:
-                util.logger.warning(f"There is a bad peer, I hate you: {type(e), e}")
-                traceback.print_exc()
-                response_code = message_code.Response.fail
-
-            if response_code == message_code.Response.success:
-                util.logger.debug(f"try add block height: {block.header.height}")
+        sync_peers = BlockSyncPeers(peer_stubs)
+        window_size = max(1, conf.BLOCK_SYNC_WINDOW_SIZE)
+        if ObjectManager().channel_service.is_support_node_function(conf.NodeFunction.Vote):
+            range_count = max(1, conf.BLOCK_SYNC_RANGE_COUNT)
+        else:
+            range_count = 1
+        in_flight: Dict[Future, Tuple[int, int, str]] = {}
+        received: Dict[int, Tuple[str, Block, int, object]] = {}  # reorder buffer by height
+        retry_ranges: List[Tuple[int, int]] = []
+        next_height = my_height + 1
 
-                max_block_height = max(max_block_height, current_unconfirmed_block_height)
-                if max_block_height > max_height:
-                    util.logger.spam(f"set max_height :{max_height} -> {max_block_height}")
-                    max_height = max_block_height
-                    if current_unconfirmed_block_height == max_block_height:
-                        unconfirmed_block_height = current_unconfirmed_block_height
+        executor = ThreadPoolExecutor(window_size, 'BlockSyncRequestThread')
+        try:
+            while max_height > my_height:
+                if self.__channel_service.state_machine.state != 'BlockSync':
+                    break
 
-                try:
-                    if (max_height == unconfirmed_block_height == block.header.height and
-                            max_height > 0 and not confirm_info):
-                        self.candidate_blocks.add_block(
-                            block, self.blockchain.find_preps_addresses_by_header(block.header))
-                        self.blockchain.last_unconfirmed_block = block
+                while len(in_flight) < window_size:
+                    if retry_ranges:
+                        height, count = heapq.heappop(retry_ranges)
                     else:
-                        self.__add_block_by_sync(block, confirm_info)
-
-                    if block.header.height == 0:
-                        self.__rebuild_nid(block)
-                    elif self.blockchain.find_nid() is None:
-                        genesis_block = self.blockchain.find_block_by_height(0)
-                        self.__rebuild_nid(genesis_block)
-
-                except KeyError as e:
-                    util.logger.error(f"{type(e)} during block height sync: {e, e.__traceback__}")
-                    raise
-                except exception.BlockError:
-                    util.exit_and_msg("Block Error Clear all block and restart peer.")
-                    raise
-                except Exception as e:
-                    util.logger.warning(f"fail block height sync: {type(e), e}")
-
-                    if self.blockchain.last_block.header.hash != block.header.prev_hash:
-                        raise exception.PreviousBlockMismatch
+                        last_height = min(max_height, my_height + window_size * range_count)
+                        if next_height > last_height:
+                            break
+                        height, count = next_height, min(range_count, last_height - next_height + 1)
+                        next_height += count
+
+                    peer = sync_peers.select(height)
+                    if peer is None:
+                        heapq.heappush(retry_ranges, (height, count))
+                        break
+
+                    util.logger.info(f"Block Height Sync Target : {peer.target} / "
+                                     f"request height({height}) count({count})")
+                    future = executor.submit(self.__timed_block_request, peer.stub, height, count)
+                    in_flight[future] = (height, count, peer.target)
+
+                if not in_flight:
+                    raise ConnectionError(f"There is no peer to request blocks({retry_ranges}).")
+
+                done, _ = wait(in_flight, timeout=conf.SYNC_WRITE_BATCH_MAX_SECONDS, return_when=FIRST_COMPLETED)
+                if not done:
+                    # don't keep added blocks in the coalesced write batch while peers are slow.
+                    self.blockchain.write_coalesced_blocks()
+                for future in done:
+                    height, count, peer_target = in_flight.pop(future)
+                    try:
+                        blocks, max_block_height, current_unconfirmed_block_height, response_code, elapsed = \
+                            future.result()
+                    except NoConfirmInfo as e:
+                        util.logger.warning(f"{e}")
+                        response_code = message_code.Response.fail_no_confirm_info
+                    except Exception as e:
+                        util.logger.warning(f"There is a bad peer, I hate you: {type(e), e}")
+                        traceback.print_exception(type(e), e, e.__traceback__)
+                        response_code = message_code.Response.fail
                     else:
-                        self.__block_height_sync_bad_targets[peer_target] = max_block_height
-                        raise
-                else:
-                    peer_index = (peer_index + 1) % len(peer_stubs)
+                        blocks = take_block_range(blocks, height, count)
+                        if blocks is None:
+                            util.logger.warning(f"There is a bad peer, blocks are not consecutive from {height}")
+                            response_code = message_code.Response.fail
+                        elif response_code == message_code.Response.success and not blocks:
+                            response_code = message_code.Response.fail
+
+                    if response_code != message_code.Response.success:
+                        if len(peer_stubs) == 1:
+                            raise ConnectionError
+
+                        if sync_peers.record_failure(peer_target):
+                            util.logger.warning(f"Demote block sync peer({peer_target}) by failures.")
+                            self.__block_height_sync_bad_targets[peer_target] = max_height
+                        heapq.heappush(retry_ranges, (height, count))
+                        continue
+
+                    sync_peers.record_success(peer_target, elapsed, max_block_height, len(blocks))
+                    max_block_height = max(max_block_height, current_unconfirmed_block_height)
+                    if max_block_height > max_height:
+                        util.logger.spam(f"set max_height :{max_height} -> {max_block_height}")
+                        max_height = max_block_height
+                        if current_unconfirmed_block_height == max_block_height:
+                            unconfirmed_block_height = current_unconfirmed_block_height
+
+                    for block, confirm_info in blocks:
+                        received[block.header.height] = (peer_target, block, max_block_height, confirm_info)
+                    if len(blocks) < count:
+                        heapq.heappush(retry_ranges, (height + len(blocks), count - len(blocks)))
+
+                for slow_target in sync_peers.find_slow_peers():
+                    util.logger.warning(f"Demote slow block sync peer({slow_target}) : {sync_peers.stats()}")
+                    sync_peers.demote(slow_target)
+                    self.__block_height_sync_bad_targets[slow_target] = max_height
+
+                while my_height + 1 in received:
+                    peer_target, block, max_block_height, confirm_info = received.pop(my_height + 1)
+                    self.__add_block_in_sync(peer_target, block, confirm_info,
+                                             max_height, max_block_height, unconfirmed_block_height)
                     my_height += 1
-            else:
-                if len(peer_stubs) == 1:
-                    raise ConnectionError
-
-                peer_index = (peer_index + 1) % len(peer_stubs)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+            util.logger.info(f"Block Height Sync Peers : {sync_peers.stats()}, demoted({sync_peers.demoted})")
 
         return my_height, max_height
 
+    def __add_block_in_sync(self, peer_target, block, confirm_info,
+                            max_height, max_block_height, unconfirmed_block_height):
+        util.logger.debug(f"try add block height: {block.header.height}")
+
+        try:
+            if (max_height == unconfirmed_block_height == block.header.height and
+                    max_height > 0 and not confirm_info):
+                self.candidate_blocks.add_block(
+                    block, self.blockchain.find_preps_addresses_by_header(block.header))
+                self.blockchain.last_unconfirmed_block = block
+            else:
+                self.__add_block_by_sync(block, confirm_info)
+
+            if block.header.height == 0:
+                self.__rebuild_nid(block)
+            elif self.blockchain.find_nid() is None:
+                genesis_block = self.blockchain.find_block_by_height(0)
+                self.__rebuild_nid(genesis_block)
+
+        except KeyError as e:
+            util.logger.error(f"{type(e)} during block height sync: {e, e.__traceback__}")
+            raise
+        except exception.BlockError:
+            util.exit_and_msg("Block Error Clear all block and restart peer.")
+            raise
+        except Exception as e:
+            util.logger.warning(f"fail block height sync: {type(e), e}")
+
+            if self.blockchain.last_block.header.hash != block.header.prev_hash:
+                raise exception.PreviousBlockMismatch
+            else:
+                self.__block_height_sync_bad_targets[peer_target] = max_block_height
+                raise
+
     def __request_roll_back(self):
         target_block = self.blockchain.find_block_by_hash32(self.blockchain.last_block.header.prev_hash)
         if not self.blockchain.check_rollback_possible(target_block):
@@ -669,10 +885,11 @@ class BlockManager:
             # prevent_next_block_mismatch until last_block_height in block DB.
             # (excludes last_unconfirmed_block_height)
             self.blockchain.prevent_next_block_mismatch(self.blockchain.block_height + 1)
-            self.__block_request_to_peers_in_sync(peer_stubs,
-                                                  my_height,
-                                                  unconfirmed_block_height,
-                                                  max_height)
+            with self.blockchain.coalesce_writes():
+                self.__block_request_to_peers_in_sync(peer_stubs,
+                                                      my_height,
+                                                      unconfirmed_block_height,
+                                                      max_height)
         except exception.PreviousBlockMismatch as e:
             util.logger.warning(f"There is a previous block hash mismatch! :: {type(e)}, {e}")
             self.__request_roll_back()
@@ -991,9 +1208,7 @@ class BlockManager:
                 return
 
             is_validated = exc is None
-            vote = self.vote_unconfirmed_block(unconfirmed_block, round_, is_validated)
-            if self.__channel_service.state_machine.state == "BlockGenerate" and self.consensus_algorithm:
-                self.consensus_algorithm.vote(vote)
+            self.vote_unconfirmed_block(unconfirmed_block, round_, is_validated)
 
     async def vote_as_peer(self, unconfirmed_block: Block, round_: int):
         """Vote to AnnounceUnconfirmedBlock
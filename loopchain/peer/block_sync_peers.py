@@ -0,0 +1,138 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per peer statistics for the pipelined block height sync"""
+
+from typing import Dict, List, Optional, Tuple
+
+from loopchain import configure as conf
+
+
+class BlockSyncPeerStat:
+    def __init__(self, target, stub):
+        self.target = target
+        self.stub = stub
+        self.in_flight = 0
+        self.received_blocks = 0
+        self.elapsed_seconds = 0.0
+        self.failures = 0
+        self.max_block_height = None
+
+    @property
+    def seconds_per_block(self) -> float:
+        if not self.received_blocks:
+            return 0.0
+        return self.elapsed_seconds / self.received_blocks
+
+    @property
+    def blocks_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.received_blocks / self.elapsed_seconds
+
+    def can_serve(self, height: int) -> bool:
+        return self.max_block_height is None or self.max_block_height >= height
+
+    def __repr__(self):
+        return (f"{self.target}(received={self.received_blocks}, "
+                f"blocks/s={self.blocks_per_second:.2f}, failures={self.failures})")
+
+
+class BlockSyncPeers:
+    """Selects block sync targets by throughput and demotes slow or failing ones.
+
+    Latency of each block request is accumulated per peer with the number of received blocks. A new request goes to the peer
+    with the lowest expected completion time, `(in_flight + 1) * seconds_per_block`,
+    so peers without samples are probed first and in-flight requests are spread among them.
+    """
+
+    def __init__(self, peer_stubs: List[Tuple]):
+        self.__stats: Dict[str, BlockSyncPeerStat] = {
+            target: BlockSyncPeerStat(target, stub) for target, stub in peer_stubs
+        }
+        self.__demoted: List[str] = []
+
+    def __len__(self):
+        return len(self.__stats)
+
+    @property
+    def demoted(self) -> List[str]:
+        return list(self.__demoted)
+
+    def stats(self) -> List[BlockSyncPeerStat]:
+        return list(self.__stats.values())
+
+    def select(self, height: int) -> Optional[BlockSyncPeerStat]:
+        candidates = [stat for stat in self.__stats.values() if stat.can_serve(height)]
+        if not candidates:
+            return None
+
+        stat = min(candidates, key=lambda s: ((s.in_flight + 1) * s.seconds_per_block, s.in_flight))
+        stat.in_flight += 1
+        return stat
+
+    def record_success(self, target, elapsed_seconds: float, max_block_height: int, block_count: int = 1):
+        stat = self.__stats.get(target)
+        if stat is None:
+            return
+
+        stat.in_flight -= 1
+        stat.received_blocks += block_count
+        stat.elapsed_seconds += elapsed_seconds
+        stat.failures = 0
+        stat.max_block_height = max_block_height
+
+    def record_failure(self, target) -> bool:
+        """
+        :return: True if the peer is demoted by this failure
+        """
+        stat = self.__stats.get(target)
+        if stat is None:
+            return False
+
+        stat.in_flight -= 1
+        stat.failures += 1
+        if stat.failures >= conf.BLOCK_SYNC_PEER_MAX_FAILURES:
+            self.demote(target)
+            return True
+        return False
+
+    def find_slow_peers(self) -> List[str]:
+        """Peers much slower than the fastest one. The last remaining peer is never regarded as slow.
+        """
+        sampled = [stat for stat in self.__stats.values()
+                   if stat.received_blocks >= conf.BLOCK_SYNC_SLOW_PEER_MIN_SAMPLES]
+        if len(self.__stats) < 2 or len(sampled) < 2:
+            return []
+
+        fastest = min(stat.seconds_per_block for stat in sampled)
+        limit = fastest * conf.BLOCK_SYNC_SLOW_PEER_RATIO
+        return [stat.target for stat in sampled if stat.seconds_per_block > limit]
+
+    def demote(self, target):
+        if self.__stats.pop(target, None) is not None:
+            self.__demoted.append(target)
+
+
+def take_block_range(blocks: List[Tuple], height: int, count: int) -> Optional[List[Tuple]]:
+    """Blocks of a BlockSyncRange reply within the requested range.
+
+    :param blocks: [(block, confirm_info), ...] of the reply
+    :param height: height of the first requested block
+    :param count: number of requested blocks
+    :return: up to count blocks, None if they are not consecutive from height
+    """
+    blocks = blocks[:count]
+    if any(block.header.height != height + i for i, (block, _) in enumerate(blocks)):
+        return None
+    return blocks
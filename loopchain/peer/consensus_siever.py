@@ -40,7 +40,7 @@ class ConsensusSiever(ConsensusBase):
         self.__lock = None
 
         self._loop: asyncio.BaseEventLoop = None
-        self._vote_queue: asyncio.Queue = None
+        self._stopped: asyncio.Event = None
 
         util.logger.debug(f"Stop previous broadcast!")
         self.stop_broadcast_send_unconfirmed_block_timer()
@@ -59,30 +59,15 @@ class ConsensusSiever(ConsensusBase):
         )
         self.__block_generation_timer.start(is_run_at_start=conf.ALLOW_MAKE_EMPTY_BLOCK is False)
 
-    def __put_vote(self, vote):
-        async def _put():
-            if self._vote_queue is not None:
-                await self._vote_queue.put(vote)  # sentinel
-
-        asyncio.run_coroutine_threadsafe(_put(), self._loop)
-
     def stop(self):
         self.__block_generation_timer.stop()
-        if self._loop:
-            self.__put_vote(None)
+        if self._loop and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
 
     @property
     def is_running(self):
         return self.__block_generation_timer.is_running
 
-    def vote(self, vote):
-        if self._loop:
-            self.__put_vote(vote)
-            return
-
-        util.logger.debug("Cannot vote before starting consensus.")
-        # raise RuntimeError("Cannot vote before starting consensus.")
-
     def __build_candidate_block(self, block_builder: 'BlockBuilder'):
         last_block = self._blockchain.last_block
         block_builder.height = last_block.header.height + 1
@@ -138,7 +123,7 @@ class ConsensusSiever(ConsensusBase):
                 util.logger.warning(
                     f"This peer is not leader. epoch leader={self._block_manager.epoch.leader_id}")
 
-            self._vote_queue = asyncio.Queue(loop=self._loop)
+            self._stopped = asyncio.Event(loop=self._loop)
             complain_votes = self.__get_complaint_votes()
             complained_result = self._block_manager.epoch.complained_result
             if complained_result:
@@ -258,17 +243,33 @@ class ConsensusSiever(ConsensusBase):
                 self.stop_broadcast_send_unconfirmed_block_timer()
                 return vote
 
-            await asyncio.sleep(conf.WAIT_SECONDS_FOR_VOTE)
-
             try:
                 timeout = self.__check_timeout(block)
-                if not await asyncio.wait_for(self._vote_queue.get(), timeout=timeout):  # sentinel
+                if not await self.__wait_for_completion(vote, timeout):
                     raise NotEnoughVotes
             except (TimeoutError, asyncio.TimeoutError):
                 util.logger.warning("Timed Out Block not confirmed duration: " +
                                     str(util.diff_in_seconds(block.header.timestamp)))
                 raise NotEnoughVotes
 
+    async def __wait_for_completion(self, votes: Votes, timeout: float) -> bool:
+        """wait until the votes are completed or the consensus is stopped.
+
+        :return: False if the consensus is stopped
+        """
+        completed = asyncio.ensure_future(votes.wait_completed(), loop=self._loop)
+        stopped = asyncio.ensure_future(self._stopped.wait(), loop=self._loop)
+        try:
+            done, _ = await asyncio.wait((completed, stopped), loop=self._loop, timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            completed.cancel()
+            stopped.cancel()
+
+        if not done:
+            raise asyncio.TimeoutError
+        return completed in done
+
     def __check_timeout(self, block):
         timeout_timestamp = block.header.timestamp + conf.BLOCK_VOTE_TIMEOUT * 1_000_000
         timeout = -util.diff_in_seconds(timeout_timestamp)
@@ -11,6 +11,7 @@ from loopchain import configure as conf
 from loopchain import utils
 from loopchain.baseservice import ObjectManager
 from loopchain.baseservice.lru_cache import lru_cache
+from loopchain.baseservice.relay_tree import RelayedMessages
 from loopchain.blockchain import ChannelStatusError
 from loopchain.peer import status_code
 from loopchain.protos import loopchain_pb2_grpc, message_code, ComplainLeaderRequest, loopchain_pb2
@@ -30,6 +31,7 @@ class PeerOuterService(loopchain_pb2_grpc.PeerServiceServicer):
         }
 
         self.__status_cache = None
+        self.__relayed_messages = RelayedMessages(conf.RELAYED_MESSAGES_SIZE)
 
     @property
     def peer_service(self):
@@ -296,6 +298,9 @@ class PeerOuterService(loopchain_pb2_grpc.PeerServiceServicer):
         """
         utils.logger.spam(f"peer_outer_service:AddTxList try validate_dumped_tx_message")
         channel_name = request.channel or conf.LOOPCHAIN_DEFAULT_CHANNEL
+        if not self.__relay(channel_name, "AddTxList", request):
+            return loopchain_pb2.CommonReply(response_code=message_code.Response.success, message="relayed")
+
         StubCollection().channel_tx_receiver_stubs[channel_name].sync_task().add_tx_list(request)
         return loopchain_pb2.CommonReply(response_code=message_code.Response.success, message="success")
 
@@ -396,12 +401,57 @@ class PeerOuterService(loopchain_pb2_grpc.PeerServiceServicer):
         except AttributeError:
             round_ = 0
 
+        if not self.__relay(channel_name, "AnnounceUnconfirmedBlock", request):
+            return loopchain_pb2.CommonReply(response_code=message_code.Response.success, message="relayed")
+
         asyncio.run_coroutine_threadsafe(
-            channel_stub.async_task().announce_unconfirmed_block(request.block, round_),
+            channel_stub.async_task().announce_unconfirmed_block(
+                request.block, round_, request.compact, request.peer_target),
             self.peer_service.inner_service.loop
         )
         return loopchain_pb2.CommonReply(response_code=message_code.Response.success, message="success")
 
+    def __relay(self, channel_name, method_name, request) -> bool:
+        """Relay a broadcast message in a relay tree to the subtree of this peer.
+
+        :return: False if the message has been received already
+        """
+        if not request.HasField("relay"):
+            return True
+        if not self.__relayed_messages.add(request.relay.message_id):
+            utils.logger.debug(f"{method_name} message({request.relay.message_id}) has been received.")
+            return False
+
+        # targets which are not reps of this peer are dropped by the broadcast scheduler.
+        if request.relay.targets:
+            channel_stub = StubCollection().channel_stubs[channel_name]
+            asyncio.run_coroutine_threadsafe(
+                channel_stub.async_task().relay_broadcast(method_name, request),
+                self.peer_service.inner_service.loop
+            )
+        return True
+
+    def GetUnconfirmedBlock(self, request, context):
+        """Get txs of an unconfirmed block which are missing in a compact announcement,
+        or the whole block if no tx hash is requested.
+
+        :param request:
+        :param context:
+        :return:
+        """
+        channel_name = conf.LOOPCHAIN_DEFAULT_CHANNEL if request.channel == '' else request.channel
+        utils.logger.debug(f"GetUnconfirmedBlock block_hash({request.block_hash}) "
+                           f"tx_hashes({len(request.tx_hashes)}) channel({channel_name})")
+
+        channel_stub = StubCollection().channel_stubs[channel_name]
+        future = asyncio.run_coroutine_threadsafe(
+            channel_stub.async_task().get_unconfirmed_block(request.block_hash, list(request.tx_hashes)),
+            self.peer_service.inner_service.loop
+        )
+        response_code, txs, block_dumped = future.result()
+
+        return loopchain_pb2.UnconfirmedBlockReply(response_code=response_code, txs=txs, block=block_dumped)
+
     def BlockSync(self, request, context):
         # Peer To Peer
         channel_name = conf.LOOPCHAIN_DEFAULT_CHANNEL if request.channel == '' else request.channel
@@ -425,6 +475,27 @@ class PeerOuterService(loopchain_pb2_grpc.PeerServiceServicer):
             block=block_dumped,
             unconfirmed_block_height=unconfirmed_block_height)
 
+    def BlockSyncRange(self, request, context):
+        # Peer To Peer
+        channel_name = conf.LOOPCHAIN_DEFAULT_CHANNEL if request.channel == '' else request.channel
+        utils.logger.info(
+            f"BlockSyncRange request start height({request.start_height}) "
+            f"max count({request.max_count}) max bytes({request.max_bytes}) channel({channel_name})")
+
+        channel_stub = StubCollection().channel_stubs[channel_name]
+        future = asyncio.run_coroutine_threadsafe(
+            channel_stub.async_task().block_sync_range(request.start_height, request.max_count, request.max_bytes),
+            self.peer_service.inner_service.loop
+        )
+        response_code, max_block_height, unconfirmed_block_height, blocks, confirm_infos = future.result()
+
+        return loopchain_pb2.BlockSyncRangeReply(
+            response_code=response_code,
+            max_block_height=max_block_height,
+            unconfirmed_block_height=unconfirmed_block_height,
+            blocks=blocks,
+            confirm_infos=confirm_infos)
+
     def VoteUnconfirmedBlock(self, request, context):
         channel_name = conf.LOOPCHAIN_DEFAULT_CHANNEL if request.channel == '' else request.channel
 
@@ -226,6 +226,7 @@ class KeyValueStore(abc.ABC):
         :param start_key: a start key (inclusive)
         :param stop_key: a stop key (inclusive)
         :param include_value: include value (for key, value in store_instance.Iterator(include_value=True):)
+        :param kwargs: reverse=True iterates from the stop key to the start key
         :return: iterator
         """
         # TODO: make KeyValueStoreIterator class. Currently, Iterator can be used in for-loop.
@@ -139,10 +139,19 @@ class KeyValueStoreDict(KeyValueStore):
 
     @_error_convert
     def Iterator(self, start_key: bytes = None, stop_key: bytes = None, include_value: bool = True, **kwargs):
-        if start_key is not None or stop_key is not None:
-            raise ValueError(f"Unsupported arguments which are start_key and stop_key")
+        reverse = kwargs.get('reverse', False)
+        if start_key is None and stop_key is None and not reverse:
+            if include_value:
+                return self._store_items.items()
+            else:
+                return self._store_items.keys()
 
+        include_stop = kwargs.get('include_stop', True)
+        keys = sorted((key for key in self._store_items
+                       if (start_key is None or key >= start_key) and
+                       (stop_key is None or key < stop_key or (include_stop and key == stop_key))),
+                      reverse=reverse)
         if include_value:
-            return self._store_items.items()
+            return [(key, self._store_items[key]) for key in keys]
         else:
-            return self._store_items.keys()
+            return keys
@@ -0,0 +1,337 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Offline export and import of blocks of a block DB.
+
+An archive has preps and blocks in height order with their confirm infos and receipts.
+Importing an archive bootstraps the block DB of a new node without the block height sync.
+The peer must be stopped while exporting or importing its block DB.
+
+usage: loopchain tool export .storage/db_{ip}:{port}_{channel} blocks.archive
+       loopchain tool import blocks.archive --peer_target {ip}:{port} --channel {channel} -o {configure json}
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from loopchain import configure as conf
+from loopchain import utils
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import Block, BlockBuilder, BlockSerializer, BlockVerifier, v0_1a
+from loopchain.blockchain.record_format import record_loads
+from loopchain.blockchain.transactions import TransactionVerifier, TransactionVersioner
+from loopchain.blockchain.types import Hash32
+from loopchain.store.key_value_store import KeyValueStore
+
+COMMANDS = ("export", "import")
+
+_MAGIC = b'LCBA\x01'
+_RECORD_PREPS = 1  # roothash, preps
+_RECORD_BLOCK = 2  # block, confirm info, receipts
+_RECORD_HEADER = struct.Struct(">BB")  # kind, number of fields
+_FIELD_LENGTH = struct.Struct(">I")
+
+
+def _write_record(stream: BinaryIO, kind: int, *fields: bytes):
+    stream.write(_RECORD_HEADER.pack(kind, len(fields)))
+    for field in fields:
+        stream.write(_FIELD_LENGTH.pack(len(field)))
+        stream.write(field)
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError(f"The archive is truncated. expected({size}) read({len(data)})")
+    return data
+
+
+def _read_records(stream: BinaryIO) -> Iterator[Tuple[int, List[bytes]]]:
+    if stream.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("It is not a block archive.")
+
+    while True:
+        header = stream.read(_RECORD_HEADER.size)
+        if not header:
+            return
+        if len(header) != _RECORD_HEADER.size:
+            raise ValueError(f"The archive is truncated. expected({_RECORD_HEADER.size}) read({len(header)})")
+
+        kind, field_count = _RECORD_HEADER.unpack(header)
+        fields = []
+        for _ in range(field_count):
+            length, = _FIELD_LENGTH.unpack(_read_exactly(stream, _FIELD_LENGTH.size))
+            fields.append(_read_exactly(stream, length))
+        yield kind, fields
+
+
+def export_blocks(store: KeyValueStore, stream: BinaryIO, start_height=0, end_height: int = None) -> int:
+    """write preps and blocks from `start_height` to `end_height` in the store to the archive stream.
+    Records are read by iterations over keys without loading the whole chain.
+
+    :return: number of exported blocks
+    """
+    stream.write(_MAGIC)
+
+    roothash_len = len(Hash32.empty())
+    for key, preps in store.Iterator(start_key=BlockChain.PREPS_KEY,
+                                     stop_key=BlockChain.PREPS_KEY + b'\xff' * roothash_len):
+        roothash = bytes(key)[len(BlockChain.PREPS_KEY):]
+        if len(roothash) == roothash_len:
+            _write_record(stream, _RECORD_PREPS, roothash, bytes(preps))
+
+    tx_versioner = TransactionVersioner()
+    start_key = BlockChain.BLOCK_HEIGHT_KEY + start_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, 'big')
+    if end_height is None:
+        stop_key = BlockChain.BLOCK_HEIGHT_KEY + b'\xff' * conf.BLOCK_HEIGHT_BYTES_LEN
+    else:
+        stop_key = BlockChain.BLOCK_HEIGHT_KEY + end_height.to_bytes(conf.BLOCK_HEIGHT_BYTES_LEN, 'big')
+
+    exported = 0
+    for height_key, block_hash_key in store.Iterator(start_key=start_key, stop_key=stop_key):
+        height = int.from_bytes(bytes(height_key)[len(BlockChain.BLOCK_HEIGHT_KEY):], 'big')
+        if height != start_height + exported:
+            raise RuntimeError(f"Block of height({start_height + exported}) is not found. next({height})")
+
+        block_hash_key = bytes(block_hash_key)
+        block_dumped = record_loads(store.get(block_hash_key))
+        block = BlockSerializer.new(block_dumped["version"], tx_versioner).deserialize(block_dumped, trusted=True)
+
+        receipts = []
+        for tx_hash in block.body.transactions:
+            tx_info = store.get(tx_hash.hex().encode(encoding=conf.HASH_KEY_ENCODING), default=b'')
+            if not tx_info:
+                # the block was added without tx infos.
+                receipts = []
+                break
+            receipts.append(record_loads(tx_info)["result"])
+
+        _write_record(stream, _RECORD_BLOCK,
+                      json.dumps(block_dumped).encode(encoding=conf.PEER_DATA_ENCODING),
+                      bytes(store.get(BlockChain.CONFIRM_INFO_KEY + block_hash_key, default=b'')),
+                      json.dumps(receipts).encode(encoding=conf.PEER_DATA_ENCODING))
+        exported += 1
+
+    return exported
+
+
+class ScoreStandIn:
+    """Local stand-in of the score service while importing blocks.
+    It replays receipts in the archive instead of invoking txs.
+    A subclass can invoke blocks with a local state DB in the same order.
+    """
+
+    def invoke(self, block: Block, prev_block: Optional[Block], archived_receipts: Sequence[dict]) -> dict:
+        """:return: receipts by tx hash"""
+        tx_hashes = [tx_hash.hex() for tx_hash in block.body.transactions]
+        if archived_receipts and len(archived_receipts) != len(tx_hashes):
+            raise RuntimeError(f"Block({block.header.height}, {block.header.hash.hex()}, "
+                               f"Receipts({len(archived_receipts)}), Expected({len(tx_hashes)}).")
+        return dict(zip(tx_hashes, archived_receipts))
+
+    def write_precommit_state(self, block: Block):
+        pass
+
+
+def _verify_block(block_json: bytes, hash_versions: dict) -> Optional[str]:
+    """verify signatures, tx hashes and root hashes of a block in a worker process.
+    It doesn't need other blocks, so blocks are verified in any order.
+
+    :return: error message if the block is not valid
+    """
+    try:
+        tx_versioner = TransactionVersioner()
+        tx_versioner.hash_generator_versions.update(hash_versions)
+
+        block_dumped = json.loads(block_json)
+        block = BlockSerializer.new(block_dumped["version"], tx_versioner).deserialize(block_dumped)
+        for tx in block.body.transactions.values():
+            TransactionVerifier.new(tx.version, tx.type(), tx_versioner).verify_loosely(tx)
+        if block.header.signature or block.header.height > 0:
+            BlockVerifier.new(block.header.version, tx_versioner).verify_signature(block)
+
+        # root hashes of txs and votes are built again and the other hashes of the header are kept.
+        builder = BlockBuilder.from_new(block, tx_versioner)
+        builder.hash = None
+        if block.header.version == v0_1a.version:
+            builder.merkle_tree_root_hash = None
+        else:
+            builder.transactions_hash = None
+            builder.leader_votes_hash = None
+            builder.prev_votes_hash = None
+        if builder.build_hash() != block.header.hash:
+            return f"Hash({block.header.hash.hex()}), Expected({builder.hash.hex()})."
+    except Exception as e:
+        return repr(e)
+    return None
+
+
+def _verify_next_block(block: Block, prev_block: Optional[Block]):
+    expected_height = prev_block.header.height + 1 if prev_block else 0
+    if block.header.height != expected_height or (prev_block and block.header.prev_hash != prev_block.header.hash):
+        prev_hash = prev_block.header.hash.hex() if prev_block else None
+        raise RuntimeError(f"Block({block.header.height}, {block.header.hash.hex()}) is not the next block of "
+                           f"the last block({expected_height - 1}, {prev_hash}).")
+
+
+def _verify_receipts(block: Block, receipts: dict, tx_versioner: TransactionVersioner):
+    if block.header.version == v0_1a.version:
+        return
+
+    builder = BlockBuilder.new(block.header.version, tx_versioner)
+    builder.transactions.update(block.body.transactions)
+    builder.receipts = receipts
+    if builder.build_receipts_hash() != block.header.receipts_hash:
+        raise RuntimeError(f"Block({block.header.height}, {block.header.hash.hex()}, "
+                           f"ReceiptRootHash({block.header.receipts_hash.hex()}), "
+                           f"Expected({builder.receipts_hash.hex()}).")
+
+
+def import_blocks(blockchain: BlockChain, stream: BinaryIO, score: ScoreStandIn = None,
+                  worker_count: int = None, batch_size: int = None,
+                  progress: Callable[[int, float], None] = None) -> int:
+    """add blocks in the archive stream to the blockchain without the consensus.
+
+    Blocks of a batch are verified by worker processes, invoked in height order by the score
+    and written in a single write batch. Blocks already in the blockchain are skipped.
+    Blocks of a batch are not written if any block of the batch is not valid.
+
+    :param score: the score service stand-in. it replays receipts in the archive if None
+    :param worker_count: number of worker processes. 1 verifies blocks in the calling process
+    :param batch_size: number of blocks in a write batch
+    :param progress: called with the number of imported blocks and the elapsed seconds after each batch
+    :return: number of imported blocks
+    """
+    score = score or ScoreStandIn()
+    worker_count = worker_count or conf.TX_VERIFY_WORKER_COUNT
+    batch_size = batch_size or conf.BLOCK_IMPORT_BATCH_SIZE
+    tx_versioner = blockchain.tx_versioner
+    hash_versions = dict(tx_versioner.hash_generator_versions)
+
+    pool = None
+    if worker_count > 1:
+        pool = ProcessPoolExecutor(max_workers=worker_count, mp_context=mp.get_context("spawn"))
+
+    started = time.monotonic()
+    imported = 0
+    records = _read_records(stream)
+    try:
+        while True:
+            batch = blockchain.get_blockchain_store().WriteBatch()
+            block_records = []
+            for kind, fields in records:
+                if kind == _RECORD_PREPS:
+                    roothash, preps = fields
+                    blockchain.write_preps(Hash32(roothash), json.loads(preps), batch)
+                elif kind == _RECORD_BLOCK:
+                    block_records.append(fields)
+                    if len(block_records) >= batch_size:
+                        break
+
+            block_jsons = [block_json for block_json, _, _ in block_records]
+            if pool:
+                errors = pool.map(_verify_block, block_jsons, repeat(hash_versions),
+                                  chunksize=max(1, len(block_jsons) // (worker_count * 4)))
+            else:
+                errors = map(_verify_block, block_jsons, repeat(hash_versions))
+            for block_json, error in zip(block_jsons, errors):
+                if error:
+                    raise RuntimeError(f"Block({json.loads(block_json).get('height')}) is not valid. {error}")
+
+            imported_blocks = []
+            for block_json, confirm_info, receipts_json in block_records:
+                block_dumped = json.loads(block_json)
+                block = BlockSerializer.new(block_dumped["version"], tx_versioner).deserialize(
+                    block_dumped, trusted=True)
+                if block.header.height <= blockchain.block_height:
+                    continue
+
+                prev_block = blockchain.last_block
+                _verify_next_block(block, prev_block)
+                receipts = score.invoke(block, prev_block, json.loads(receipts_json))
+                _verify_receipts(block, receipts, tx_versioner)
+                blockchain.import_block(block, confirm_info, receipts, batch)
+                imported_blocks.append(block)
+
+            batch.write()
+            for block in imported_blocks:
+                score.write_precommit_state(block)
+
+            if not block_records:
+                break
+
+            imported += len(imported_blocks)
+            elapsed = time.monotonic() - started
+            utils.logger.info(f"Import blocks({imported}) height({blockchain.block_height}) "
+                              f"elapsed({elapsed:.3f}s) blocks/sec({imported / max(elapsed, 1e-9):.1f})")
+            if progress:
+                progress(imported, elapsed)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="loopchain tool", description="export and import blocks of a block DB")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    export_parser = subparsers.add_parser("export", help="export blocks of a block DB to an archive")
+    export_parser.add_argument("path", help="path of the block DB (.storage/db_...)")
+    export_parser.add_argument("archive", help="path of the archive to write")
+    export_parser.add_argument("--start_height", type=int, default=0, help="height of the first block")
+    export_parser.add_argument("--end_height", type=int, default=None, help="height of the last block")
+    export_parser.add_argument("--store_type", default=None, help="key value store type [plyvel|leveldb]")
+
+    import_parser = subparsers.add_parser("import", help="import blocks of an archive to the block DB of a peer")
+    import_parser.add_argument("archive", help="path of the archive to read")
+    import_parser.add_argument("--peer_target", required=True,
+                               help="{ip}:{port} of the peer. the block DB is .storage/db_{peer_target}_{channel}")
+    import_parser.add_argument("--channel", default=None, help="channel name")
+    import_parser.add_argument("-o", "--configure_file_path", default=None, help="json configure file path")
+    import_parser.add_argument("--workers", type=int, default=None, help="number of verifying worker processes")
+    import_parser.add_argument("--batch_size", type=int, default=None, help="number of blocks in a write batch")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        store = KeyValueStore.new(f"file://{args.path}", store_type=args.store_type, create_if_missing=False)
+        try:
+            with open(args.archive, "wb") as stream:
+                exported = export_blocks(store, stream, args.start_height, args.end_height)
+        finally:
+            store.close()
+        print(f"exported blocks({exported}) to {args.archive}")
+        return
+
+    if args.configure_file_path:
+        conf.Configure().load_configure_json(args.configure_file_path)
+
+    blockchain = BlockChain(args.channel or conf.LOOPCHAIN_DEFAULT_CHANNEL, args.peer_target)
+    try:
+        with open(args.archive, "rb") as stream:
+            imported = import_blocks(blockchain, stream, worker_count=args.workers, batch_size=args.batch_size)
+        print(f"imported blocks({imported}), the last block height({blockchain.block_height})")
+    finally:
+        blockchain.close_blockchain_store()
+
+
+if __name__ == "__main__":
+    main()
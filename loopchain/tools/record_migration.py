@@ -0,0 +1,101 @@
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Offline migration of block and tx info records between record formats.
+
+The peer must be stopped while migrating its block DB.
+The binary format makes the block DB smaller, and records are read slower than JSON records.
+
+usage: python3 -m loopchain.tools.record_migration .storage/db_{ip}:{port}_{channel} --format binary
+"""
+
+import argparse
+import re
+from typing import Tuple
+
+from loopchain.blockchain.record_format import RecordFormat, is_binary_record, record_dumps, record_loads
+from loopchain.store.key_value_store import KeyValueStore
+
+# Blocks are stored by block hash and tx infos are stored by tx hash, without prefix.
+# Block headers are stored by block hash with the prefix `BlockChain.BLOCK_HEADER_KEY`.
+_RECORD_KEY_PATTERN = re.compile(rb"(?:block_header_key)?[0-9a-f]{64}")
+
+
+def is_record_key(key: bytes) -> bool:
+    return _RECORD_KEY_PATTERN.fullmatch(key) is not None
+
+
+def migrate(store: KeyValueStore, format_: RecordFormat, batch_size=1000, dry_run=False) -> Tuple[int, int, int]:
+    """convert block and tx info records in the store to the format.
+
+    :return: number of converted records, total size of the records before and after
+    """
+    to_binary = format_ is RecordFormat.binary
+    converted, size_before, size_after = 0, 0, 0
+
+    batch = store.WriteBatch()
+    batch_count = 0
+    for key, value in store.Iterator():
+        key, value = bytes(key), bytes(value)
+        if not is_record_key(key) or is_binary_record(value) == to_binary:
+            continue
+
+        try:
+            record = record_dumps(record_loads(value), format_)
+        except ValueError as e:
+            print(f"skip a record of key({key}) : {e}")
+            continue
+
+        converted += 1
+        size_before += len(value)
+        size_after += len(record)
+        if dry_run:
+            continue
+
+        batch.put(key, record)
+        batch_count += 1
+        if batch_count >= batch_size:
+            batch.write()
+            batch = store.WriteBatch()
+            batch_count = 0
+
+    if batch_count:
+        batch.write()
+
+    return converted, size_before, size_after
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="migrate block and tx info records of a block DB")
+    parser.add_argument("path", help="path of the block DB (.storage/db_...)")
+    parser.add_argument("--format", choices=[f.value for f in RecordFormat], default=RecordFormat.binary.value,
+                        help="record format to convert to")
+    parser.add_argument("--store_type", default=None, help="key value store type [plyvel|leveldb]")
+    parser.add_argument("--batch_size", type=int, default=1000, help="number of records in a write batch")
+    parser.add_argument("--dry_run", action="store_true", help="report sizes without writing")
+    args = parser.parse_args(argv)
+
+    store = KeyValueStore.new(f"file://{args.path}", store_type=args.store_type, create_if_missing=False)
+    try:
+        converted, size_before, size_after = migrate(store, RecordFormat(args.format), args.batch_size, args.dry_run)
+    finally:
+        store.close()
+
+    ratio = size_after / size_before if size_before else 1
+    print(f"converted records({converted}) to {args.format}, "
+          f"size({size_before} -> {size_after} bytes, {ratio:.2%})")
+    print(f"Set \"record_format\": \"{args.format}\" in CHANNEL_OPTION to write new records in the same format.")
+
+
+if __name__ == "__main__":
+    main()
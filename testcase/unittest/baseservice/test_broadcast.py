@@ -63,6 +63,7 @@ class TestBroadcaster:
         (BroadcastCommand.UPDATE_AUDIENCE, ["p2pEndpoint1:port", "p2pEndpoint2:port"]),
         (BroadcastCommand.BROADCAST, ("method", "method_param", "kwargs")),
         (BroadcastCommand.SEND_TO_SINGLE_TARGET, ("method", "method_param", "kwargs")),
+        (BroadcastCommand.RELAY, ("method", "method_param")),
     ])
     def test_handle_command_passes_param_to_deserving_handler(self, mocking_, bc, command: str, params):
         bc.handle_command(command, params)
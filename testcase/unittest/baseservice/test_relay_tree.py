@@ -0,0 +1,199 @@
+from concurrent import futures
+from typing import Dict, Sequence
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.baseservice import BroadcastCommand
+from loopchain.baseservice import broadcast_scheduler
+from loopchain.baseservice.broadcast_scheduler import _Broadcaster
+from loopchain.baseservice.relay_tree import RelayedMessages, relay_order, split_subtrees
+from loopchain.protos import loopchain_pb2
+
+MESSAGE_SIZE = 100_000  # bytes of an unconfirmed block
+UPLINK = 12_500_000  # bytes per second of each rep
+HOP_LATENCY = 0.05  # seconds
+
+
+def _targets(count: int):
+    return [f"10.0.{i // 250}.{i % 250}:7100" for i in range(count)]
+
+
+def _simulate(origin: str, targets: Sequence[str], fanout: int, failed=()) -> (int, Dict[str, float]):
+    """Propagation of a message from the origin in a relay tree, or by direct sends if fanout is 0.
+    Each rep sends copies of the message one by one through its uplink. Failed reps do not relay the message and
+    their parents send it to their subtrees directly after RELAY_TREE_TIMEOUT.
+
+    :return: bytes sent by the origin, arrival time of the message at each rep
+    """
+    arrivals = {origin: 0.0}
+    origin_bytes = 0
+    uplink_free = {}
+
+    def _send(sender, receiver, subtree, ready):
+        nonlocal origin_bytes
+        if sender == origin:
+            origin_bytes += MESSAGE_SIZE
+        uplink_free[sender] = max(uplink_free.get(sender, 0.0), ready) + MESSAGE_SIZE / UPLINK
+        arrival = uplink_free[sender] + HOP_LATENCY
+        if receiver in failed:
+            for target in subtree:
+                _send(sender, target, [], arrival + conf.RELAY_TREE_TIMEOUT)
+            return
+
+        arrivals[receiver] = min(arrivals.get(receiver, arrival), arrival)
+        if subtree:
+            _relay(receiver, subtree)
+
+    def _relay(sender, subtree):
+        for child, child_subtree in split_subtrees(subtree, fanout):
+            _send(sender, child, child_subtree, arrivals[sender])
+
+    others = [target for target in targets if target != origin]
+    if fanout:
+        _relay(origin, relay_order(others, "message_id"))
+    else:
+        for target in others:
+            _send(origin, target, [], 0.0)
+    return origin_bytes, arrivals
+
+
+class TestRelayTree:
+    @pytest.mark.parametrize("count", [1, 5, 21, 99])
+    @pytest.mark.parametrize("fanout", [1, 3, 4])
+    def test_subtrees_cover_targets_once(self, count, fanout):
+        targets = _targets(count)
+
+        subtrees = split_subtrees(targets, fanout)
+
+        assert len(subtrees) == min(count, fanout)
+        assert sorted(target for child, subtree in subtrees for target in [child, *subtree]) == sorted(targets)
+        sizes = [len(subtree) for child, subtree in subtrees]
+        assert max(sizes) - min(sizes) <= 1
+
+    def test_relay_order_differs_by_message(self):
+        targets = _targets(21)
+
+        assert relay_order(targets, "a") == relay_order(list(reversed(targets)), "a")
+        assert relay_order(targets, "a") != relay_order(targets, "b")
+
+    @pytest.mark.parametrize("rep_count", [22, 100])
+    def test_relay_tree_against_direct_sends(self, rep_count):
+        targets = _targets(rep_count)
+        direct_bytes, direct_arrivals = _simulate(targets[0], targets, fanout=0)
+        relay_bytes, relay_arrivals = _simulate(targets[0], targets, fanout=4)
+
+        assert relay_arrivals.keys() == direct_arrivals.keys() == set(targets)
+        assert direct_bytes == (rep_count - 1) * MESSAGE_SIZE
+        assert relay_bytes == 4 * MESSAGE_SIZE
+        assert max(relay_arrivals.values()) < max(direct_arrivals.values())
+
+    def test_subtrees_of_failed_relays_get_direct_sends(self):
+        targets = _targets(100)
+        failed = {child for child, subtree in split_subtrees(relay_order(targets[1:], "message_id"), 4)[:2]}
+
+        relay_bytes, relay_arrivals = _simulate(targets[0], targets, fanout=4, failed=failed)
+
+        assert relay_arrivals.keys() == set(targets) - failed
+        assert min(relay_arrivals[target] for target in set(targets) - failed - {targets[0]}) > 0
+
+    def test_relayed_messages_drop_duplicates(self):
+        relayed_messages = RelayedMessages(max_size=2)
+
+        assert relayed_messages.add("a")
+        assert not relayed_messages.add("a")
+        assert relayed_messages.add("b")
+        assert relayed_messages.add("c")
+        assert len(relayed_messages) == 2
+        assert relayed_messages.add("a")
+
+
+class TestBroadcasterRelay:
+    @pytest.fixture
+    def stub_managers(self, mocker) -> Dict[str, object]:
+        stub_managers = {}
+
+        def _stub_manager(target, *args, **kwargs):
+            return stub_managers.setdefault(target, mocker.MagicMock())
+
+        mocker.patch.object(broadcast_scheduler, "StubManager", side_effect=_stub_manager)
+        return stub_managers
+
+    @pytest.fixture
+    def broadcaster(self, stub_managers, monkeypatch) -> _Broadcaster:
+        monkeypatch.setattr(conf, "RELAY_TREE_FANOUT", 2)
+        broadcaster = _Broadcaster("chann", "peer_target")
+        broadcaster.handle_command(BroadcastCommand.UPDATE_AUDIENCE, ["peer_target", *_targets(7)])
+        return broadcaster
+
+    def _sent_messages(self, stub_managers) -> Dict[str, loopchain_pb2.BlockSend]:
+        return {target: stub_manager.call_async.call_args[1]["message"]
+                for target, stub_manager in stub_managers.items() if stub_manager.call_async.called}
+
+    def test_broadcast_is_sent_to_children(self, broadcaster: _Broadcaster, stub_managers):
+        message = loopchain_pb2.BlockSend(block=b"block", round_=0, channel="chann")
+
+        broadcaster.handle_command(BroadcastCommand.BROADCAST, ("AnnounceUnconfirmedBlock", message, {}))
+
+        sent_messages = self._sent_messages(stub_managers)
+        assert len(sent_messages) == 2
+        relayed_targets = [target for child, sent in sent_messages.items() for target in [child, *sent.relay.targets]]
+        assert sorted(relayed_targets) == sorted(_targets(7))
+        assert all(sent.block == b"block" for sent in sent_messages.values())
+        assert len({sent.relay.message_id for sent in sent_messages.values()}) == 1
+        assert not message.HasField("relay")
+
+    def test_relay_is_sent_to_subtree(self, broadcaster: _Broadcaster, stub_managers):
+        message = loopchain_pb2.BlockSend(block=b"block", round_=0, channel="chann")
+        message.relay.message_id = "message_id"
+        message.relay.targets.extend(_targets(7)[1:])
+
+        broadcaster.handle_command(BroadcastCommand.RELAY, ("AnnounceUnconfirmedBlock", message))
+
+        sent_messages = self._sent_messages(stub_managers)
+        assert sorted(sent_messages) == [_targets(7)[1], _targets(7)[4]]
+        assert [list(sent.relay.targets) for sent in sent_messages.values()] == [_targets(7)[2:4], _targets(7)[5:]]
+        assert all(sent.relay.message_id == "message_id" for sent in sent_messages.values())
+
+    def test_subtree_gets_direct_sends_on_relay_failure(self, broadcaster: _Broadcaster, stub_managers):
+        message = loopchain_pb2.BlockSend(block=b"block", round_=0, channel="chann")
+        message.relay.message_id = "message_id"
+        message.relay.targets.extend(_targets(7)[1:])
+        broadcaster.handle_command(BroadcastCommand.RELAY, ("AnnounceUnconfirmedBlock", message))
+        failed = futures.Future()
+        failed.set_exception(TimeoutError())
+
+        stub_managers[_targets(7)[1]].call_async.call_args[1]["call_back"](failed)
+
+        for target in _targets(7)[2:4]:
+            sent = stub_managers[target].call_async.call_args[1]["message"]
+            assert sent.relay.message_id == "message_id"
+            assert not sent.relay.targets
+        assert not stub_managers[_targets(7)[5]].call_async.called
+
+    def test_relay_is_not_sent_to_unknown_targets(self, broadcaster: _Broadcaster, stub_managers):
+        message = loopchain_pb2.BlockSend(block=b"block", round_=0, channel="chann")
+        message.relay.message_id = "message_id"
+        unknown_targets = ["10.1.0.1:7100", "169.254.169.254:80", "peer_target"]
+        message.relay.targets.extend(unknown_targets + _targets(7)[1:3])
+
+        broadcaster.handle_command(BroadcastCommand.RELAY, ("AnnounceUnconfirmedBlock", message))
+
+        sent_messages = self._sent_messages(stub_managers)
+        assert sorted(sent_messages) == _targets(7)[1:3]
+        assert all(not sent.relay.targets for sent in sent_messages.values())
+        assert not set(unknown_targets) & set(stub_managers) - {"peer_target"}
+
+    def test_direct_sends_skip_targets_removed_from_audience(self, broadcaster: _Broadcaster, stub_managers):
+        message = loopchain_pb2.BlockSend(block=b"block", round_=0, channel="chann")
+        message.relay.message_id = "message_id"
+        message.relay.targets.extend(_targets(7)[1:])
+        broadcaster.handle_command(BroadcastCommand.RELAY, ("AnnounceUnconfirmedBlock", message))
+        broadcaster.handle_command(BroadcastCommand.UPDATE_AUDIENCE, ["peer_target", *_targets(3)])
+        failed = futures.Future()
+        failed.set_exception(TimeoutError())
+
+        stub_managers[_targets(7)[1]].call_async.call_args[1]["call_back"](failed)
+
+        assert not stub_managers[_targets(7)[2]].call_async.call_args[1]["message"].relay.targets
+        assert not stub_managers[_targets(7)[3]].call_async.called
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from loopchain.baseservice.aging_cache import AgingCache
+from loopchain.baseservice.tx_pool import TxPool
+from loopchain.blockchain.types import TransactionStatusInQueue
+
+
+@pytest.fixture
+def tx_pool():
+    return TxPool(max_age_seconds=5, default_item_status=TransactionStatusInQueue.normal)
+
+
+class TestTxPool:
+    def test_get_item_in_status_follows_insertion_order(self, tx_pool: TxPool):
+        for i in range(5):
+            tx_pool[i] = f"value_{i}"
+
+        for i in range(5):
+            assert tx_pool.get_item_in_status(TransactionStatusInQueue.normal,
+                                              TransactionStatusInQueue.added_to_block) == f"value_{i}"
+            assert tx_pool.get_item_status(i) == TransactionStatusInQueue.added_to_block
+
+        assert tx_pool.get_item_in_status(TransactionStatusInQueue.normal,
+                                          TransactionStatusInQueue.added_to_block) is None
+        assert tx_pool.is_empty_in_status(TransactionStatusInQueue.normal)
+        assert tx_pool.count_in_status(TransactionStatusInQueue.added_to_block) == 5
+        assert len(tx_pool) == 5
+
+    def test_set_item_status(self, tx_pool: TxPool):
+        for i in range(3):
+            tx_pool[i] = f"value_{i}"
+
+        tx_pool.set_item_status(0, TransactionStatusInQueue.precommited_to_block)
+
+        assert tx_pool.count_in_status(TransactionStatusInQueue.normal) == 2
+        assert tx_pool.get_item_in_status(TransactionStatusInQueue.normal,
+                                          TransactionStatusInQueue.normal) == "value_1"
+        item = tx_pool.pop_item_in_status(TransactionStatusInQueue.precommited_to_block)
+        assert item.value == "value_0"
+        assert 0 not in tx_pool
+
+        with pytest.raises(KeyError):
+            tx_pool.set_item_status(0, TransactionStatusInQueue.normal)
+
+    def test_set_item_status_by_time(self, tx_pool: TxPool):
+        for i in range(3):
+            tx_pool[i] = f"value_{i}"
+
+        tx_pool.set_item_status_by_time(int(time.time()) + 1, TransactionStatusInQueue.fail_invoke)
+
+        assert tx_pool.is_empty_in_status(TransactionStatusInQueue.normal)
+        assert tx_pool.count_in_status(TransactionStatusInQueue.fail_invoke) == 3
+
+    def test_pop_and_delete_update_status_index(self, tx_pool: TxPool):
+        for i in range(3):
+            tx_pool[i] = f"value_{i}"
+
+        assert tx_pool.pop(0) == "value_0"
+        assert tx_pool.pop(0, None) is None
+        del tx_pool[1]
+
+        assert list(tx_pool) == [2]
+        assert tx_pool.count_in_status(TransactionStatusInQueue.normal) == 1
+
+    def test_aged_items_are_evicted(self, tx_pool: TxPool, monkeypatch):
+        now = time.time()
+        tx_pool["old"] = "old_value"
+        tx_pool.set_item_status("old", TransactionStatusInQueue.added_to_block)
+
+        monkeypatch.setattr(time, "time", lambda: now + tx_pool.max_age_seconds + 1)
+        tx_pool["new"] = "new_value"
+
+        assert list(tx_pool) == ["new"]
+        assert tx_pool.is_empty_in_status(TransactionStatusInQueue.added_to_block)
+
+    def test_reset_item_is_normal_again(self, tx_pool: TxPool):
+        tx_pool[0] = "value_0"
+        tx_pool.set_item_status(0, TransactionStatusInQueue.added_to_block)
+
+        tx_pool[0] = "value_0"
+
+        assert tx_pool.get_item_status(0) == TransactionStatusInQueue.normal
+        assert tx_pool.is_empty_in_status(TransactionStatusInQueue.added_to_block)
+
+
+@pytest.mark.parametrize("size", [10_000, 100_000, 1_000_000])
+@pytest.mark.parametrize("cache_type", [AgingCache, TxPool])
+def test_benchmark_get_item_in_status(benchmark, cache_type, size):
+    """Find the next normal tx when all the other txs are already added to a block."""
+    cache = cache_type(max_age_seconds=60, default_item_status=TransactionStatusInQueue.normal)
+    for i in range(size):
+        cache[i] = i
+    for i in range(size - 1):
+        cache.set_item_status(i, TransactionStatusInQueue.added_to_block)
+
+    result = benchmark(cache.get_item_in_status,
+                       TransactionStatusInQueue.normal, TransactionStatusInQueue.normal)
+    assert result == size - 1
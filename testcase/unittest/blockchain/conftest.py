@@ -4,14 +4,22 @@ from typing import List, Callable, Optional
 
 import pytest
 
+from loopchain import configure as conf
+from loopchain import utils
+from loopchain.baseservice import ObjectManager
+from loopchain.baseservice.tx_pool import TxPool
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import Block, BlockBuilder, v0_3
 from loopchain.blockchain.transactions import Transaction, TransactionBuilder, TransactionVersioner
 from loopchain.blockchain.transactions import genesis, v2, v3
-from loopchain.blockchain.types import ExternalAddress, Address
+from loopchain.blockchain.types import ExternalAddress, Address, Hash32
+from loopchain.blockchain.votes.v0_3 import BlockVote, BlockVotes
 from loopchain.crypto.signature import Signer
 
 # ----- Type Hints
 TxBuilderFactory = Callable[[str, Optional[str]], TransactionBuilder]
 TxFactory = Callable[[str, Optional[str]], Transaction]
+BlockFactory = Callable[..., Block]
 
 
 # ----- Global variables
@@ -100,3 +108,64 @@ def tx_factory(tx_builder_factory) -> TxFactory:
         return transaction
 
     return functools.partial(_tx_factory, tx_builder_factory)
+
+
+# ----- Blocks
+def make_receipt(tx: Transaction) -> dict:
+    return {"txHash": tx.hash.hex_0x(), "status": "0x1", "stepUsed": "0x186a0"}
+
+
+@pytest.fixture
+def block_factory(tx_factory) -> BlockFactory:
+    def _block_factory(height: int = 1, prev_hash: Hash32 = None, tx_count: int = 10,
+                       block_version: str = v0_3.version, receipt_factory=make_receipt) -> Block:
+        signer: Signer = pytest.SIGNERS[0]
+        tx_versioner = TransactionVersioner()
+
+        block_builder = BlockBuilder.new(block_version, tx_versioner)
+        receipts = {}
+        for _ in range(tx_count):
+            tx = tx_factory(v3.version)
+            block_builder.transactions[tx.hash] = tx
+            receipts[tx.hash.hex()] = receipt_factory(tx)
+
+        block_builder.signer = signer
+        block_builder.height = height
+        block_builder.prev_hash = prev_hash or Hash32(bytes(Hash32.size))
+        block_builder.state_hash = Hash32(bytes(Hash32.size))
+        block_builder.receipts = receipts
+        block_builder.reps = [pytest.REPS[0]]
+        block_builder.next_leader = pytest.REPS[0]
+        block_builder.next_reps = []
+
+        vote = BlockVote.new(signer, utils.get_time_stamp(), height - 1, 0, block_builder.prev_hash)
+        votes = BlockVotes(block_builder.reps, conf.VOTING_RATIO, height - 1, 0, block_builder.prev_hash)
+        votes.add_vote(vote)
+        block_builder.prev_votes = votes.votes
+
+        return block_builder.build()
+
+    return _block_factory
+
+
+# ----- BlockChain
+@pytest.fixture
+def blockchain(tmp_path, monkeypatch, mocker) -> BlockChain:
+    """BlockChain on a block DB in tmp_path, without channel service."""
+    monkeypatch.setattr(conf, "DEFAULT_STORAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(ObjectManager(), "channel_service", mocker.MagicMock())
+
+    block_manager = mocker.MagicMock()
+    block_manager.get_tx_queue.return_value = TxPool(max_age_seconds=conf.MAX_TX_QUEUE_AGING_SECONDS)
+
+    blockchain = BlockChain(conf.LOOPCHAIN_DEFAULT_CHANNEL, "test_blockchain", block_manager)
+    yield blockchain
+    blockchain.close_blockchain_store()
+
+
+def add_block(blockchain: BlockChain, block: Block, confirm_info=None, write_tx_info=True, receipts=None):
+    """Add the block as if it has been invoked with the receipts or receipts of `make_receipt`."""
+    if receipts is None:
+        receipts = {tx.hash.hex(): make_receipt(tx) for tx in block.body.transactions.values()}
+    blockchain._BlockChain__invoke_results[block.header.hash] = (receipts, None)
+    blockchain.add_block(block, confirm_info, need_to_write_tx_info=write_tx_info, need_to_score_invoke=False)
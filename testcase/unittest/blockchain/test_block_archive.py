@@ -0,0 +1,112 @@
+import io
+import json
+import os
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from loopchain.blockchain.types import Hash32
+from loopchain.tools import block_archive
+from loopchain.tools.block_archive import ScoreStandIn, export_blocks, import_blocks
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+@pytest.fixture
+def new_blockchain(tmp_path, monkeypatch) -> BlockChain:
+    """empty BlockChain of a new node, without the block manager"""
+    monkeypatch.setattr(conf, "DEFAULT_STORAGE_PATH", str(tmp_path))
+    blockchain = BlockChain(conf.LOOPCHAIN_DEFAULT_CHANNEL, "new_node")
+    yield blockchain
+    blockchain.close_blockchain_store()
+
+
+def _store_items(blockchain: BlockChain) -> dict:
+    return {bytes(key): bytes(value) for key, value in blockchain.get_blockchain_store().Iterator()}
+
+
+class _RecordingScore(ScoreStandIn):
+    def __init__(self):
+        self.invoked = []
+        self.committed = []
+
+    def invoke(self, block, prev_block, archived_receipts):
+        self.invoked.append(block.header.height)
+        return super().invoke(block, prev_block, archived_receipts)
+
+    def write_precommit_state(self, block):
+        self.committed.append(block.header.height)
+
+
+class TestBlockArchive:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int):
+        for _ in range(count):
+            height = blockchain.block_height + 1
+            prev_hash = blockchain.last_block.header.hash if blockchain.last_block else None
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=3, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+
+    def _export(self, blockchain: BlockChain) -> io.BytesIO:
+        archive = io.BytesIO()
+        export_blocks(blockchain.get_blockchain_store(), archive)
+        archive.seek(0)
+        return archive
+
+    def test_import_exported_blocks(self, blockchain: BlockChain, new_blockchain: BlockChain,
+                                    block_factory: BlockFactory, mocker):
+        blockchain.write_preps(Hash32(os.urandom(32)), [{"id": "hx" + "1" * 40, "p2pEndpoint": "127.0.0.1:7100"}])
+        self._add_blocks(blockchain, block_factory, 6)
+        archive = self._export(blockchain)
+        score = _RecordingScore()
+        write_batch = mocker.spy(new_blockchain.get_blockchain_store(), "WriteBatch")
+
+        imported = import_blocks(new_blockchain, archive, score, worker_count=1, batch_size=4)
+
+        assert imported == 6
+        assert write_batch.call_count == 3
+        assert score.invoked == score.committed == list(range(6))
+        assert _store_items(new_blockchain) == _store_items(blockchain)
+        assert new_blockchain.last_block.header.hash == blockchain.last_block.header.hash
+        assert new_blockchain.total_tx == blockchain.total_tx
+        assert new_blockchain.find_block_counters_by_height(5) == blockchain.find_block_counters_by_height(5)
+
+    def test_imported_blocks_are_skipped(self, blockchain: BlockChain, new_blockchain: BlockChain,
+                                         block_factory: BlockFactory):
+        self._add_blocks(blockchain, block_factory, 3)
+        import_blocks(new_blockchain, self._export(blockchain), worker_count=1)
+        self._add_blocks(blockchain, block_factory, 2)
+
+        assert import_blocks(new_blockchain, self._export(blockchain), worker_count=1) == 2
+        assert new_blockchain.block_height == 4
+
+    @pytest.mark.parametrize("worker_count", [1, 2])
+    def test_invalid_block_is_not_imported(self, blockchain: BlockChain, new_blockchain: BlockChain,
+                                           block_factory: BlockFactory, worker_count):
+        self._add_blocks(blockchain, block_factory, 5)
+        archive = io.BytesIO()
+        for kind, fields in block_archive._read_records(self._export(blockchain)):
+            block_dumped = json.loads(fields[0])
+            if block_dumped["height"] == "0x3":
+                block_dumped["transactions"][0]["value"] = "0x1"
+                fields[0] = json.dumps(block_dumped).encode()
+            block_archive._write_record(archive, kind, *fields)
+        archive = io.BytesIO(block_archive._MAGIC + archive.getvalue())
+
+        with pytest.raises(RuntimeError, match=r"Block\(0x3\) is not valid"):
+            import_blocks(new_blockchain, archive, worker_count=worker_count, batch_size=2)
+
+        assert new_blockchain.block_height == 1
+        assert new_blockchain.find_block_by_height(2) is None
+
+    def test_unlinked_block_is_not_imported(self, blockchain: BlockChain, new_blockchain: BlockChain,
+                                            block_factory: BlockFactory):
+        self._add_blocks(blockchain, block_factory, 2)
+        archive = io.BytesIO()
+        export_blocks(blockchain.get_blockchain_store(), archive, start_height=1)
+        archive.seek(0)
+
+        with pytest.raises(RuntimeError, match="is not the next block"):
+            import_blocks(new_blockchain, archive, worker_count=1)
+        assert new_blockchain.block_height == -1
@@ -0,0 +1,102 @@
+import pytest
+
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.block_cache import BlockCache
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+def _key(height: int) -> bytes:
+    return f"block_hash_{height}".encode()
+
+
+@pytest.fixture
+def block_cache():
+    return BlockCache(max_block_bytes=30, max_serialized_bytes=100)
+
+
+class TestBlockCache:
+    def test_get_block_by_key_and_height(self, block_cache: BlockCache):
+        block = object()
+        block_cache.put(_key(1), 1, b"0" * 10, block)
+
+        assert block_cache.get_key_by_height(1) == _key(1)
+        assert block_cache.get_block(_key(1)) is block
+        assert block_cache.get_serialized(_key(1)) == b"0" * 10
+
+    def test_put_without_height_index(self, block_cache: BlockCache):
+        block_cache.put(_key(1), 1, b"0" * 10, object(), index_height=False)
+
+        assert block_cache.get_key_by_height(1) is None
+        assert block_cache.get_block(_key(1))
+
+    def test_block_tier_is_evicted_before_serialized_tier(self, block_cache: BlockCache):
+        for height in range(5):
+            block_cache.put(_key(height), height, b"0" * 10, object())
+
+        status = block_cache.status()
+        assert status["block"]["count"] == 3
+        assert status["block"]["bytes"] <= 30
+        assert status["serialized"]["count"] == 5
+
+        assert block_cache.get_block(_key(0)) is None
+        assert block_cache.get_serialized(_key(0)) == b"0" * 10
+        assert block_cache.get_key_by_height(0) == _key(0)
+
+    def test_evicted_height_is_not_found(self, block_cache: BlockCache):
+        for height in range(20):
+            block_cache.put(_key(height), height, b"0" * 10)
+
+        assert block_cache.get_key_by_height(0) is None
+        assert block_cache.get_key_by_height(19) == _key(19)
+        assert block_cache.status()["serialized"]["bytes"] <= 100
+
+    def test_remove_from_height(self, block_cache: BlockCache):
+        for height in range(5):
+            block_cache.put(_key(height), height, b"0" * 10, object())
+
+        block_cache.remove_from_height(3)
+
+        assert block_cache.get_key_by_height(2) == _key(2)
+        assert block_cache.get_key_by_height(3) is None
+        assert block_cache.get_serialized(_key(4)) is None
+
+    def test_hit_and_miss_count(self, block_cache: BlockCache):
+        block_cache.put(_key(1), 1, b"0" * 10, object())
+
+        block_cache.get_block(_key(1))
+        block_cache.get_block(_key(2))
+        block_cache.get_block(_key(3))
+
+        status = block_cache.status()["block"]
+        assert status["hits"] == 1
+        assert status["misses"] == 2
+
+    def test_dumped_tier(self):
+        block_cache = BlockCache(max_block_bytes=30, max_serialized_bytes=100, max_dumped_bytes=20)
+        for height in range(3):
+            block_cache.put_dumped(_key(height), height, b"0" * 10)
+
+        assert block_cache.get_dumped(_key(0)) is None
+        assert block_cache.get_dumped(_key(2)) == (2, b"0" * 10)
+        assert block_cache.get_key_by_height(2) is None
+
+        block_cache.remove_from_height(2)
+        assert block_cache.get_dumped(_key(2)) is None
+        assert block_cache.status()["dumped"]["count"] == 1
+
+
+class TestBlockChainCache:
+    def test_written_blocks_are_cached_by_their_own_hash(self, blockchain: BlockChain, block_factory: BlockFactory):
+        blocks = []
+        prev_hash = None
+        for height in range(4):
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=1, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+            prev_hash = block.header.hash
+
+        for block in blocks:
+            assert blockchain.find_block_by_hash32(block.header.hash).header.hash == block.header.hash
+            assert blockchain.find_block_by_height(block.header.height).header.hash == block.header.hash
@@ -0,0 +1,87 @@
+import pytest
+
+from loopchain.blockchain import BlockChain, BlockCounters
+from loopchain.blockchain.blocks import BlockSerializer, NextRepsChangeReason, v0_1a, v0_3
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+@pytest.fixture(params=[NextRepsChangeReason.NoChange, NextRepsChangeReason.TermEnd])
+def prep_changed_reason(request, mocker) -> NextRepsChangeReason:
+    """prep changed reason of all v0.3 blocks. the made block count restarts from 1 after TermEnd."""
+    mocker.patch.object(v0_3.BlockHeader, "prep_changed_reason", new_callable=mocker.PropertyMock,
+                        return_value=request.param)
+    return request.param
+
+
+def _made_block_count(prep_changed_reason: NextRepsChangeReason, count: int) -> int:
+    return 1 if prep_changed_reason is NextRepsChangeReason.TermEnd else count
+
+
+class TestBlockCounters:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int, tx_count=3):
+        blocks = []
+        for _ in range(count):
+            height = blockchain.block_height + 1
+            prev_hash = blockchain.last_block.header.hash if blockchain.last_block else None
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=tx_count, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+        return blocks
+
+    def test_counters_by_height(self, blockchain: BlockChain, block_factory: BlockFactory):
+        self._add_blocks(blockchain, block_factory, 4)
+
+        assert blockchain.find_block_counters_by_height(0) == BlockCounters(0, 0)
+        assert blockchain.find_block_counters_by_height(1) == BlockCounters(3, 1)
+        assert blockchain.find_block_counters_by_height(3) == BlockCounters(9, 3)
+        assert blockchain.find_block_counters_by_height(4) is None
+        assert blockchain.find_total_tx_by_height(2) == 6
+        assert blockchain.find_total_tx_by_height(4) is None
+
+    def test_rebuild_without_reading_blocks(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                            prep_changed_reason, mocker):
+        self._add_blocks(blockchain, block_factory, 4)
+        assert blockchain.leader_made_block_count == _made_block_count(prep_changed_reason, 3)
+        blockchain._blockchain_store.delete(BlockChain.TRANSACTION_COUNT_KEY)
+        blockchain._BlockChain__block_cache.clear()
+        blockchain.reset_leader_made_block_count(is_switched_role=True)
+        deserialize = mocker.spy(BlockSerializer, "deserialize")
+        deserialize_header = mocker.spy(BlockSerializer, "deserialize_header")
+        store_get = mocker.spy(blockchain._blockchain_store, "get")
+
+        blockchain.rebuild_transaction_count()
+        blockchain.rebuild_made_block_count()
+
+        assert blockchain.total_tx == 9
+        assert blockchain.leader_made_block_count == _made_block_count(prep_changed_reason, 3)
+        assert deserialize.call_count == 0
+        assert deserialize_header.call_count == 0
+        assert store_get.call_count == 2
+
+    def test_blocks_without_counters(self, blockchain: BlockChain, block_factory: BlockFactory, prep_changed_reason):
+        self._add_blocks(blockchain, block_factory, 3)
+        for height in range(3):
+            blockchain._blockchain_store.delete(BlockChain.BLOCK_COUNTERS_KEY + height.to_bytes(12, 'big'))
+
+        blockchain.rebuild_transaction_count()
+        blockchain.rebuild_made_block_count()
+        assert blockchain.total_tx == 6
+        assert blockchain.leader_made_block_count == _made_block_count(prep_changed_reason, 2)
+
+        self._add_blocks(blockchain, block_factory, 1)
+        assert blockchain.find_block_counters_by_height(3) == BlockCounters(9, 3)
+
+    @pytest.mark.parametrize("target_height", [1, 2])
+    def test_rollback_restores_counters(self, blockchain: BlockChain, block_factory: BlockFactory, target_height,
+                                        prep_changed_reason):
+        blocks = self._add_blocks(blockchain, block_factory, 5)
+
+        blockchain.roll_back(blocks[target_height])
+
+        assert blockchain.total_tx == 3 * target_height
+        assert blockchain.leader_made_block_count == _made_block_count(prep_changed_reason, target_height)
+        assert blockchain.find_block_counters_by_height(target_height + 1) is None
+        self._add_blocks(blockchain, block_factory, 1)
+        assert blockchain.find_block_counters_by_height(target_height + 1) == \
+            BlockCounters(3 * (target_height + 1), target_height + 1)
@@ -0,0 +1,104 @@
+import pytest
+
+from loopchain import configure as conf
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import BlockSerializer, v0_1a, v0_3
+from loopchain.blockchain.record_format import RecordFormat
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+@pytest.fixture(params=[RecordFormat.json, RecordFormat.binary])
+def record_format(request) -> RecordFormat:
+    return request.param
+
+
+class TestBlockDumped:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int):
+        blocks = []
+        prev_hash = None
+        for height in range(count):
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=3, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+            prev_hash = block.header.hash
+        return blocks
+
+    def _clear_cache(self, blockchain: BlockChain):
+        blockchain._BlockChain__block_cache.clear()
+
+    def test_dumped_from_db_is_loaded_as_block(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                               record_format, mocker):
+        blockchain._BlockChain__record_format = record_format
+        blocks = self._add_blocks(blockchain, block_factory, 3)
+        self._clear_cache(blockchain)
+
+        deserialize = mocker.spy(BlockSerializer, "deserialize")
+        block_dumped = blockchain.find_block_dumped_by_height(1)
+        by_hash = blockchain.find_block_dumped_by_hash(blocks[1].header.hash)
+        assert deserialize.call_count == 0
+
+        assert block_dumped == by_hash
+        assert block_dumped.hash == blocks[1].header.hash
+        assert block_dumped.height == 1
+        assert block_dumped.version == blocks[1].header.version
+        assert blockchain.block_loads(block_dumped.dumped).header.hash == blocks[1].header.hash
+
+    def test_json_record_is_the_same_as_block_dumps(self, blockchain: BlockChain, block_factory: BlockFactory):
+        self._add_blocks(blockchain, block_factory, 2)
+        self._clear_cache(blockchain)
+
+        block_dumped = blockchain.find_block_dumped_by_height(1)
+
+        assert block_dumped.dumped == blockchain.block_dumps(blockchain.find_block_by_height(1))
+
+    def test_new_block_is_dumped_in_advance(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                            record_format, mocker):
+        blockchain._BlockChain__record_format = record_format
+        blocks = self._add_blocks(blockchain, block_factory, 2)
+
+        store_get = mocker.spy(blockchain._blockchain_store, "get")
+        block_dumped = blockchain.find_block_dumped_by_hash(blocks[1].header.hash)
+
+        assert store_get.call_count == 0
+        assert blockchain.block_cache_status["dumped"]["count"] == 2
+        assert blockchain.block_loads(block_dumped.dumped).header.hash == blocks[1].header.hash
+
+    def test_new_block_is_not_dumped_in_advance_if_disabled(self, blockchain: BlockChain,
+                                                            block_factory: BlockFactory, monkeypatch):
+        monkeypatch.setattr(conf, "BLOCK_CACHE_PRECOMPRESS_NEW_BLOCK", False)
+        self._add_blocks(blockchain, block_factory, 2)
+
+        assert blockchain.block_cache_status["dumped"]["count"] == 0
+        assert blockchain.find_block_dumped_by_height(1).height == 1
+
+    def test_synced_blocks_are_not_dumped_in_advance(self, blockchain: BlockChain, block_factory: BlockFactory):
+        with blockchain.coalesce_writes():
+            self._add_blocks(blockchain, block_factory, 2)
+
+        assert blockchain.block_cache_status["dumped"]["count"] == 0
+
+    def test_dumped_by_height_range(self, blockchain: BlockChain, block_factory: BlockFactory):
+        blocks = self._add_blocks(blockchain, block_factory, 5)
+        self._clear_cache(blockchain)
+
+        dumped_blocks = list(blockchain.find_blocks_dumped_by_height_range(1, 3))
+
+        assert [block_dumped.height for block_dumped in dumped_blocks] == [1, 2, 3]
+        assert [block_dumped.hash for block_dumped in dumped_blocks] == [block.header.hash for block in blocks[1:4]]
+        assert list(blockchain.find_blocks_dumped_by_height_range(5, 3)) == []
+
+    def test_unknown_block(self, blockchain: BlockChain, block_factory: BlockFactory):
+        self._add_blocks(blockchain, block_factory, 2)
+
+        assert blockchain.find_block_dumped_by_height(2) is None
+        assert blockchain.find_block_dumped_by_hash("00" * 32) is None
+
+    def test_unconfirmed_block_is_dumped_by_height(self, blockchain: BlockChain, block_factory: BlockFactory):
+        blocks = self._add_blocks(blockchain, block_factory, 2)
+        unconfirmed_block = block_factory(height=2, prev_hash=blocks[-1].header.hash)
+        blockchain.last_unconfirmed_block = unconfirmed_block
+
+        block_dumped = blockchain.find_block_dumped_by_height(2)
+
+        assert block_dumped.dumped == blockchain.block_dumps(unconfirmed_block)
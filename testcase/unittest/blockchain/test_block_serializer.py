@@ -0,0 +1,97 @@
+import pytest
+
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import BlockSerializer, v0_1a, v0_3
+from loopchain.blockchain.exception import TransactionInvalidHashError
+from loopchain.blockchain.transactions import TransactionSerializer, TransactionVerifier, TransactionVersioner
+from loopchain.blockchain.transactions import v3
+from loopchain.crypto.hashing.hash_generator import HashGenerator
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+tx_versioner = TransactionVersioner()
+
+
+class TestTrustedBlockDeserialization:
+    @pytest.mark.parametrize("block_version", [v0_1a.version, v0_3.version])
+    def test_trusted_block_is_the_same(self, block_factory: BlockFactory, block_version, mocker):
+        block = block_factory(tx_count=5, block_version=block_version)
+        bs = BlockSerializer.new(block_version, tx_versioner)
+        block_serialized = bs.serialize(block)
+
+        generate_hash = mocker.spy(HashGenerator, "generate_hash")
+        trusted_block = bs.deserialize(block_serialized, trusted=True)
+        assert generate_hash.call_count == 0
+
+        assert trusted_block.header == block.header
+        assert list(trusted_block.body.transactions) == list(block.body.transactions)
+        assert trusted_block.body.transactions == bs.deserialize(block_serialized).body.transactions
+
+    def test_tx_hash_is_verified_later(self, block_factory: BlockFactory):
+        block = block_factory(tx_count=1)
+        bs = BlockSerializer.new(v0_3.version, tx_versioner)
+        block_serialized = bs.serialize(block)
+        block_serialized["transactions"][0]["txHash"] = "00" * 32
+
+        tx = next(iter(bs.deserialize(block_serialized, trusted=True).body.transactions.values()))
+        tv = TransactionVerifier.new(tx.version, tx.type(), tx_versioner)
+
+        assert tx.hash.hex() == "00" * 32
+        with pytest.raises(TransactionInvalidHashError):
+            tv.verify_hash(tx)
+
+    def test_block_from_db_is_trusted(self, blockchain: BlockChain, block_factory: BlockFactory, mocker):
+        genesis_block = block_factory(height=0, tx_count=0, block_version=v0_1a.version)
+        add_block(blockchain, genesis_block)
+        block = block_factory(height=1, prev_hash=genesis_block.header.hash)
+        add_block(blockchain, block)
+        blockchain._BlockChain__block_cache.clear()
+
+        generate_hash = mocker.spy(HashGenerator, "generate_hash")
+        block_from_db = blockchain.find_block_by_height(1)
+        tx_hash = next(iter(block.body.transactions))
+        tx = blockchain.find_tx_by_key(tx_hash.hex())
+
+        assert generate_hash.call_count == 0
+        assert block_from_db.body.transactions == block.body.transactions
+        assert tx == block.body.transactions[tx_hash]
+
+
+class TestTrustedBlockDeserializationBenchmark:
+    @pytest.fixture
+    def block_serialized(self, block_factory: BlockFactory, tx_count) -> dict:
+        """A block of txs which differ by nonce. Signatures of the txs are not valid."""
+        block = block_factory(tx_count=1)
+        block_serialized = BlockSerializer.new(v0_3.version, tx_versioner).serialize(block)
+        tx_data = block_serialized["transactions"][0]
+        ts = TransactionSerializer.new(v3.version, None, tx_versioner)
+
+        transactions = []
+        for nonce in range(tx_count):
+            tx_data = dict(tx_data, nonce=hex(nonce))
+            tx_data["txHash"] = ts.to_full_data(ts.from_(tx_data))["txHash"]
+            transactions.append(tx_data)
+        block_serialized["transactions"] = transactions
+        return block_serialized
+
+    @pytest.mark.parametrize("tx_count", [1_000, 10_000])
+    @pytest.mark.parametrize("trusted", [False, True])
+    def test_benchmark_deserialize(self, benchmark, block_serialized, tx_count, trusted):
+        bs = BlockSerializer.new(v0_3.version, tx_versioner)
+
+        block = benchmark.pedantic(bs.deserialize, args=(block_serialized, trusted), rounds=3)
+
+        assert len(block.body.transactions) == tx_count
+
+
+class TestBlockHeaderSerialization:
+    @pytest.mark.parametrize("block_version", [v0_1a.version, v0_3.version])
+    def test_header_without_body(self, block_factory: BlockFactory, block_version):
+        block = block_factory(tx_count=2, block_version=block_version)
+        bs = BlockSerializer.new(block_version, tx_versioner)
+        block_serialized = bs.serialize(block)
+
+        header_serialized = bs.extract_header(block_serialized)
+
+        assert not set(header_serialized) & set(bs.body_keys)
+        assert bs.deserialize_header(header_serialized) == block.header
+        assert bs.deserialize_body(block_serialized).transactions == block.body.transactions
@@ -0,0 +1,163 @@
+import grpc
+import pytest
+
+from loopchain import configure as conf
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from loopchain.channel.channel_inner_service import ChannelInnerTask
+from loopchain.peer.block_manager import BlockManager
+from loopchain.protos import message_code, loopchain_pb2
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+class _RpcError(grpc.RpcError):
+    def __init__(self, code: grpc.StatusCode):
+        self.__code = code
+
+    def code(self):
+        return self.__code
+
+
+def _add_blocks(blockchain: BlockChain, block_factory: BlockFactory, count: int):
+    blocks = []
+    prev_hash = None
+    for height in range(count):
+        block_version = v0_1a.version if height == 0 else v0_3.version
+        block = block_factory(height=height, prev_hash=prev_hash, tx_count=1, block_version=block_version)
+        add_block(blockchain, block, confirm_info=b"[]")
+        blocks.append(block)
+        prev_hash = block.header.hash
+    return blocks
+
+
+def _block_sync_range(inner_task: ChannelInnerTask, start_height: int, max_count: int, max_bytes: int):
+    """call the task without the message queue"""
+    return ChannelInnerTask.block_sync_range.__wrapped__(inner_task, start_height, max_count, max_bytes)
+
+
+@pytest.fixture
+def inner_task(blockchain: BlockChain, mocker) -> ChannelInnerTask:
+    task = ChannelInnerTask(channel_service=mocker.MagicMock())
+    task._blockchain = blockchain
+    return task
+
+
+class TestBlockSyncRange:
+    def test_blocks_by_height_range(self, blockchain: BlockChain, block_factory: BlockFactory):
+        blocks = _add_blocks(blockchain, block_factory, 5)
+
+        found = list(blockchain.find_blocks_by_height_range(1, 3))
+
+        assert [block.header.hash for block in found] == [block.header.hash for block in blocks[1:4]]
+        assert [block.header.height for block in blockchain.find_blocks_by_height_range(3, 10)] == [3, 4]
+        assert not list(blockchain.find_blocks_by_height_range(5, 10))
+
+    def test_reply_is_capped_by_max_count(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                          inner_task: ChannelInnerTask, monkeypatch):
+        _add_blocks(blockchain, block_factory, 10)
+        monkeypatch.setattr(conf, "BLOCK_SYNC_RANGE_MAX_COUNT", 4)
+
+        response_code, max_block_height, _, blocks, confirm_infos = _block_sync_range(inner_task, 1, 100, 0)
+
+        assert response_code == message_code.Response.success
+        assert max_block_height == 9
+        assert len(blocks) == len(confirm_infos) == 4
+        assert [blockchain.block_loads(block).header.height for block in blocks] == [1, 2, 3, 4]
+        assert all(confirm_infos)
+
+    def test_reply_is_capped_by_max_bytes(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                          inner_task: ChannelInnerTask):
+        _add_blocks(blockchain, block_factory, 5)
+        _, _, _, blocks, confirm_infos = _block_sync_range(inner_task, 1, 2, 0)
+        max_bytes = sum(map(len, blocks)) + sum(map(len, confirm_infos))
+
+        _, _, _, blocks, _ = _block_sync_range(inner_task, 1, 4, max_bytes)
+        assert len(blocks) == 2
+
+        # the first block is returned even if it is larger than max_bytes.
+        _, _, _, blocks, _ = _block_sync_range(inner_task, 1, 4, 1)
+        assert len(blocks) == 1
+
+    def test_unconfirmed_block_is_appended_at_tip(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                                  inner_task: ChannelInnerTask):
+        blocks = _add_blocks(blockchain, block_factory, 3)
+        unconfirmed_block = block_factory(height=3, prev_hash=blocks[-1].header.hash, tx_count=1)
+        blockchain.last_unconfirmed_block = unconfirmed_block
+
+        response_code, max_block_height, unconfirmed_block_height, blocks, confirm_infos = \
+            _block_sync_range(inner_task, 1, 10, 0)
+
+        assert response_code == message_code.Response.success
+        assert (max_block_height, unconfirmed_block_height) == (2, 3)
+        assert len(blocks) == 3
+        assert blockchain.block_loads(blocks[-1]).header.hash == unconfirmed_block.header.hash
+        assert confirm_infos[-1] == b""
+
+    def test_unconfirmed_block_is_not_appended_to_full_reply(self, blockchain: BlockChain,
+                                                            block_factory: BlockFactory,
+                                                            inner_task: ChannelInnerTask):
+        blocks = _add_blocks(blockchain, block_factory, 3)
+        blockchain.last_unconfirmed_block = block_factory(height=3, prev_hash=blocks[-1].header.hash, tx_count=1)
+
+        _, _, _, blocks, _ = _block_sync_range(inner_task, 1, 2, 0)
+
+        assert [blockchain.block_loads(block).header.height for block in blocks] == [1, 2]
+
+    def test_unknown_height_fails(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                  inner_task: ChannelInnerTask):
+        _add_blocks(blockchain, block_factory, 2)
+
+        response_code, _, _, blocks, _ = _block_sync_range(inner_task, 5, 10, 0)
+
+        assert response_code == message_code.Response.fail_wrong_block_height
+        assert not blocks
+
+
+class TestBlockSyncRangeRequest:
+    @pytest.fixture
+    def block_manager(self, blockchain: BlockChain) -> BlockManager:
+        block_manager = object.__new__(BlockManager)
+        block_manager.blockchain = blockchain
+        block_manager._BlockManager__channel_name = conf.LOOPCHAIN_DEFAULT_CHANNEL
+        return block_manager
+
+    def test_range_is_requested(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                block_manager: BlockManager, mocker):
+        blocks = _add_blocks(blockchain, block_factory, 3)
+        peer_stub = mocker.MagicMock()
+        peer_stub.BlockSyncRange.return_value = loopchain_pb2.BlockSyncRangeReply(
+            response_code=message_code.Response.success, max_block_height=2, unconfirmed_block_height=-1,
+            blocks=[blockchain.block_dumps(block) for block in blocks[1:]], confirm_infos=[b"[]", b"[]"])
+
+        received, max_block_height, _, response_code = \
+            block_manager._BlockManager__block_request_by_voter(1, peer_stub, 2)
+
+        assert response_code == message_code.Response.success
+        assert max_block_height == 2
+        assert [block.header.hash for block, _ in received] == [block.header.hash for block in blocks[1:]]
+        assert not peer_stub.BlockSync.called
+
+    def test_fallback_to_block_sync_if_unimplemented(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                                     block_manager: BlockManager, mocker):
+        blocks = _add_blocks(blockchain, block_factory, 2)
+        peer_stub = mocker.MagicMock()
+        peer_stub.BlockSyncRange.side_effect = _RpcError(grpc.StatusCode.UNIMPLEMENTED)
+        peer_stub.BlockSync.return_value = loopchain_pb2.BlockSyncReply(
+            response_code=message_code.Response.success, block_height=1, max_block_height=1,
+            unconfirmed_block_height=-1, confirm_info=b"[]", block=blockchain.block_dumps(blocks[1]))
+
+        received, max_block_height, _, response_code = \
+            block_manager._BlockManager__block_request_by_voter(1, peer_stub, 4)
+
+        assert response_code == message_code.Response.success
+        assert [block.header.hash for block, _ in received] == [blocks[1].header.hash]
+        assert peer_stub.BlockSync.call_args[0][0].block_height == 1
+
+    def test_other_rpc_error_is_raised(self, block_manager: BlockManager, mocker):
+        peer_stub = mocker.MagicMock()
+        peer_stub.BlockSyncRange.side_effect = _RpcError(grpc.StatusCode.UNAVAILABLE)
+
+        with pytest.raises(grpc.RpcError):
+            block_manager._BlockManager__block_request_by_voter(1, peer_stub, 4)
+
+        assert not peer_stub.BlockSync.called
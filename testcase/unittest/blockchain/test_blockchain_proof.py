@@ -0,0 +1,67 @@
+import pytest
+
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import BlockProver, BlockProverType
+from loopchain.blockchain.types import Hash32
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+class TestBlockChainProof:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, tx_count=10):
+        genesis_block = block_factory(height=0, tx_count=0)
+        add_block(blockchain, genesis_block)
+
+        block = block_factory(height=1, prev_hash=genesis_block.header.hash, tx_count=tx_count)
+        add_block(blockchain, block)
+        return block
+
+    def test_receipt_proof_from_stored_receipt_hashes(self, blockchain: BlockChain, block_factory: BlockFactory):
+        block = self._add_blocks(blockchain, block_factory)
+        key = BlockChain.RECEIPT_HASHES_KEY + block.header.hash.hex().encode()
+
+        assert len(blockchain._blockchain_store.get(key)) == Hash32.size * len(block.body.transactions)
+        for tx_hash in block.body.transactions:
+            proof = blockchain.get_receipt_proof(tx_hash)
+            assert blockchain.prove_receipt(tx_hash, proof)
+
+    def test_receipt_hashes_are_made_for_legacy_blocks(self, blockchain: BlockChain, block_factory: BlockFactory):
+        block = self._add_blocks(blockchain, block_factory)
+        key = BlockChain.RECEIPT_HASHES_KEY + block.header.hash.hex().encode()
+        blockchain._blockchain_store.delete(key)
+
+        tx_hash = next(iter(block.body.transactions))
+        assert blockchain.prove_receipt(tx_hash, blockchain.get_receipt_proof(tx_hash))
+        assert blockchain._blockchain_store.get(key)
+
+    def test_transaction_proof(self, blockchain: BlockChain, block_factory: BlockFactory):
+        block = self._add_blocks(blockchain, block_factory)
+
+        for tx_hash in block.body.transactions:
+            proof = blockchain.get_transaction_proof(tx_hash)
+            assert blockchain.prove_transaction(tx_hash, proof)
+
+    def test_trees_are_built_once_per_block(self, blockchain: BlockChain, block_factory: BlockFactory, mocker):
+        block = self._add_blocks(blockchain, block_factory)
+        new_prover = mocker.spy(BlockProver, "new")
+
+        for tx_hash in block.body.transactions:
+            assert blockchain.prove_transaction(tx_hash, blockchain.get_transaction_proof(tx_hash))
+            assert blockchain.prove_receipt(tx_hash, blockchain.get_receipt_proof(tx_hash))
+
+        prover_types = [args[2] for args, _ in new_prover.call_args_list if args[1] is not None]
+        assert len(prover_types) == 2
+        assert set(prover_types) == {BlockProverType.Transaction, BlockProverType.Receipt}
+
+    def test_receipt_hashes_are_not_stored_for_removed_block(self, blockchain: BlockChain,
+                                                             block_factory: BlockFactory):
+        block = self._add_blocks(blockchain, block_factory)
+        block_hash_encoded = block.header.hash.hex().encode()
+        key = BlockChain.RECEIPT_HASHES_KEY + block_hash_encoded
+        blockchain._blockchain_store.delete(key)
+        blockchain._blockchain_store.delete(block_hash_encoded)
+
+        receipt_hashes = blockchain._BlockChain__get_receipt_hashes(block)
+
+        assert len(receipt_hashes) == Hash32.size * len(block.body.transactions)
+        with pytest.raises(KeyError):
+            blockchain._blockchain_store.get(key)
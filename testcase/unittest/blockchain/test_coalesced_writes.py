@@ -0,0 +1,202 @@
+import pytest
+
+from loopchain import configure as conf
+from loopchain import utils
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from loopchain.crypto.signature import Signer
+from loopchain.store.key_value_store import KeyValueStore
+from loopchain.store.key_value_store_dict import KeyValueStoreDict
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block, make_receipt
+
+
+@pytest.fixture(autouse=True, params=[KeyValueStore.STORE_TYPE_DICT, KeyValueStore.STORE_TYPE_PLYVEL])
+def store_type(request, mocker) -> str:
+    """type of the block DB of the blockchain fixture"""
+    if request.param == KeyValueStore.STORE_TYPE_DICT:
+        mocker.patch.object(utils, "init_default_key_value_store", return_value=(KeyValueStoreDict(), ""))
+    return request.param
+
+
+@pytest.fixture
+def signer(mocker) -> Signer:
+    """Signer of all txs made by the block factory, to make blocks fast"""
+    signer = Signer.new()
+    mocker.patch.object(Signer, "new", return_value=signer)
+    return signer
+
+
+def _make_blocks(block_factory: BlockFactory, count: int, prev_block=None, tx_count=2):
+    blocks = []
+    for _ in range(count):
+        height = prev_block.header.height + 1 if prev_block else 0
+        prev_hash = prev_block.header.hash if prev_block else None
+        block_version = v0_1a.version if height == 0 else v0_3.version
+        prev_block = block_factory(height=height, prev_hash=prev_hash, tx_count=tx_count, block_version=block_version)
+        blocks.append(prev_block)
+    return blocks
+
+
+def _last_block_hash_in_store(blockchain: BlockChain) -> bytes:
+    return blockchain.get_blockchain_store().get(BlockChain.LAST_BLOCK_KEY, default=b'')
+
+
+class TestCoalescedWrites:
+    def test_blocks_are_written_in_a_batch(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                           monkeypatch, mocker):
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_SECONDS", 60)
+        blocks = _make_blocks(block_factory, 5)
+        add_block(blockchain, blocks[0], confirm_info=b"[]")
+        write_batch = mocker.spy(blockchain.get_blockchain_store(), "WriteBatch")
+
+        with blockchain.coalesce_writes():
+            for block in blocks[1:]:
+                add_block(blockchain, block, confirm_info=b"[]")
+
+            # the block DB after a crash has the blocks before the batch.
+            assert _last_block_hash_in_store(blockchain) == blocks[0].header.hash.hex().encode()
+            assert blockchain.block_height == 4
+            assert blockchain.has_tx(next(iter(blocks[-1].body.transactions)))
+
+        assert write_batch.call_count == 1
+        assert _last_block_hash_in_store(blockchain) == blocks[-1].header.hash.hex().encode()
+        blockchain.get_blockchain_store().delete(BlockChain.TRANSACTION_COUNT_KEY)
+        blockchain.rebuild_transaction_count()
+        assert blockchain.total_tx == 8
+        assert blockchain.find_tx_by_key(next(iter(blocks[-1].body.transactions)).hex())
+        assert blockchain.find_block_counters_by_height(4).total_tx == 8
+
+    def test_batch_is_written_on_thresholds(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                            monkeypatch, mocker):
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_BLOCKS", 3)
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_TXS", 5)
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_SECONDS", 60)
+        blocks = _make_blocks(block_factory, 7, tx_count=1)
+        blocks += _make_blocks(block_factory, 1, blocks[-1], tx_count=5)
+        write_batch = mocker.spy(blockchain.get_blockchain_store(), "WriteBatch")
+
+        with blockchain.coalesce_writes():
+            for block in blocks[:7]:
+                add_block(blockchain, block, confirm_info=b"[]")
+            assert write_batch.call_count == 3
+            assert _last_block_hash_in_store(blockchain) == blocks[5].header.hash.hex().encode()
+
+            add_block(blockchain, blocks[7], confirm_info=b"[]")
+            assert write_batch.call_count == 3
+            assert _last_block_hash_in_store(blockchain) == blocks[7].header.hash.hex().encode()
+
+    def test_batch_is_written_before_roll_back(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                               monkeypatch):
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_SECONDS", 60)
+        blocks = _make_blocks(block_factory, 4)
+
+        with blockchain.coalesce_writes():
+            for block in blocks:
+                add_block(blockchain, block, confirm_info=b"[]")
+            blockchain.roll_back(blocks[1])
+
+        assert blockchain.last_block.header.hash == blocks[1].header.hash
+        assert _last_block_hash_in_store(blockchain) == blocks[1].header.hash.hex().encode()
+        assert blockchain.find_block_by_height(2) is None
+
+    def test_blocks_are_written_without_context(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                                mocker):
+        blocks = _make_blocks(block_factory, 3)
+        write_batch = mocker.spy(blockchain.get_blockchain_store(), "WriteBatch")
+
+        with blockchain.coalesce_writes():
+            pass
+        for block in blocks:
+            add_block(blockchain, block, confirm_info=b"[]")
+            assert _last_block_hash_in_store(blockchain) == block.header.hash.hex().encode()
+        assert write_batch.call_count == 3
+
+    @pytest.mark.parametrize("coalesced", [False, True], ids=["batch_per_block", "coalesced"])
+    def test_benchmark_sync_blocks(self, benchmark, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                   store_type, coalesced):
+        if store_type != KeyValueStore.STORE_TYPE_PLYVEL:
+            pytest.skip("blocks/sec is measured on plyvel")
+
+        blocks = _make_blocks(block_factory, 500, tx_count=10)
+
+        def _add_blocks():
+            if coalesced:
+                with blockchain.coalesce_writes():
+                    for block in blocks:
+                        add_block(blockchain, block, confirm_info=b"[]")
+            else:
+                for block in blocks:
+                    add_block(blockchain, block, confirm_info=b"[]")
+
+        benchmark.pedantic(_add_blocks, rounds=1, iterations=1)
+        benchmark.extra_info["blocks_per_sec"] = len(blocks) / benchmark.stats.stats.mean
+        assert blockchain.block_height == 499
+
+    @pytest.mark.parametrize("rolled_back", [True, False])
+    def test_score_is_rolled_back_to_block_db(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                              mocker, rolled_back):
+        blocks = _make_blocks(block_factory, 2)
+        for block in blocks:
+            add_block(blockchain, block, confirm_info=b"[]")
+        score_stub = mocker.MagicMock()
+        score_stub.sync_task().query.return_value = {"lastBlock": {"blockHeight": hex(6)}}
+        score_stub.sync_task().rollback.return_value = {"blockHeight": hex(1 if rolled_back else 6)}
+        mocker.patch("loopchain.blockchain.blockchain.StubCollection").return_value.icon_score_stubs = \
+            {blockchain._BlockChain__channel_name: score_stub}
+        exit_and_msg = mocker.patch.object(utils, "exit_and_msg")
+
+        assert blockchain.prevent_next_block_mismatch(2)
+        request = score_stub.sync_task().rollback.call_args[0][0]
+        assert request["blockHash"] == blocks[-1].header.hash.hex()
+        assert exit_and_msg.called is not rolled_back
+
+    @pytest.mark.parametrize("lost_blocks", [1, 2])
+    def test_lost_blocks_are_added_after_crash(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                               monkeypatch, mocker, lost_blocks):
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_SECONDS", 60)
+        blocks = _make_blocks(block_factory, 2 + lost_blocks)
+        for block in blocks[:2]:
+            add_block(blockchain, block, confirm_info=b"[]")
+        with blockchain.coalesce_writes():
+            for block in blocks[2:]:
+                add_block(blockchain, block, confirm_info=b"[]")
+            # crash before the batch is written. the score committed the lost blocks.
+            blockchain._BlockChain__coalesced_batch = None
+        blockchain.close_blockchain_store()
+
+        score_stub = mocker.MagicMock()
+        score_stub.sync_task().query.return_value = {"lastBlock": {"blockHeight": hex(1 + lost_blocks)}}
+        score_stub.sync_task().rollback.return_value = {"blockHeight": hex(1)}
+        mocker.patch("loopchain.blockchain.blockchain.StubCollection").return_value.icon_score_stubs = \
+            {conf.LOOPCHAIN_DEFAULT_CHANNEL: score_stub}
+        exit_and_msg = mocker.patch.object(utils, "exit_and_msg")
+
+        restarted = BlockChain(conf.LOOPCHAIN_DEFAULT_CHANNEL, "test_blockchain",
+                               blockchain._BlockChain__block_manager)
+        try:
+            assert restarted.block_height == 1
+            receipts = {tx.hash.hex(): make_receipt(tx) for tx in blocks[2].body.transactions.values()}
+            restarted._BlockChain__invoke_results[blocks[2].header.hash] = (receipts, None)
+
+            assert restarted.add_block(blocks[2], b"[]")
+
+            request = score_stub.sync_task().rollback.call_args[0][0]
+            assert request["blockHash"] == blocks[1].header.hash.hex()
+            assert not exit_and_msg.called
+            assert restarted.block_height == 2
+            assert _last_block_hash_in_store(restarted) == blocks[2].header.hash.hex().encode()
+        finally:
+            restarted.close_blockchain_store()
+
+    def test_blocks_in_batch_are_found_by_height(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                                 monkeypatch):
+        monkeypatch.setattr(conf, "SYNC_WRITE_BATCH_MAX_SECONDS", 60)
+        blocks = _make_blocks(block_factory, 3)
+
+        with blockchain.coalesce_writes():
+            for block in blocks:
+                add_block(blockchain, block, confirm_info=b"[]")
+            blockchain._BlockChain__block_cache.clear()
+
+            assert [blockchain.find_block_by_height(height).header.hash for height in range(3)] == \
+                [block.header.hash for block in blocks]
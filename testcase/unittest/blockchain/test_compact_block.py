@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.baseservice.tx_pool import TxPool
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import Block, v0_1a, v0_3
+from loopchain.blockchain.exception import BlockError
+from loopchain.blockchain.transactions import TransactionSerializer
+from loopchain.peer import block_manager as block_manager_module
+from loopchain.peer.block_manager import BlockManager
+from loopchain.protos import message_code, loopchain_pb2
+from testcase.unittest.blockchain.conftest import BlockFactory
+
+
+REP_ID, REP_TARGET = "hx" + "00" * 20, "127.0.0.1:7100"
+
+
+def _txs_dumped(blockchain: BlockChain, block: Block, tx_hashes) -> list:
+    txs = []
+    for tx_hash in tx_hashes:
+        tx = block.body.transactions[tx_hash]
+        ts = TransactionSerializer.new(tx.version, tx.type(), blockchain.tx_versioner)
+        txs.append(json.dumps(ts.to_full_data(tx)).encode())
+    return txs
+
+
+@pytest.fixture
+def block(block_factory: BlockFactory) -> Block:
+    return block_factory(height=1, tx_count=10, block_version=v0_3.version)
+
+
+@pytest.fixture
+def block_manager(blockchain: BlockChain, mocker) -> BlockManager:
+    """BlockManager with the tx queue and the blockchain only"""
+    block_manager = object.__new__(BlockManager)
+    block_manager.blockchain = blockchain
+    block_manager._BlockManager__channel_name = conf.LOOPCHAIN_DEFAULT_CHANNEL
+    block_manager._BlockManager__txQueue = TxPool(max_age_seconds=conf.MAX_TX_QUEUE_AGING_SECONDS)
+    mocker.patch.object(block_manager_module, "GRPCHelper")
+    mocker.patch.object(blockchain, "find_preps_targets_by_roothash", return_value={REP_ID: REP_TARGET})
+    return block_manager
+
+
+@pytest.fixture
+def peer_stub(mocker):
+    return mocker.patch.object(block_manager_module.loopchain_pb2_grpc, "PeerServiceStub").return_value
+
+
+class TestCompactBlock:
+    @pytest.mark.parametrize("height, block_version", [(0, v0_1a.version), (1, v0_3.version)])
+    def test_compact_block_is_loaded_with_txs(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                              height, block_version):
+        block = block_factory(height=height, tx_count=20, block_version=block_version)
+
+        compact_dumped = blockchain.block_dumps(block, compact=True)
+        compact_block, tx_hashes = blockchain.compact_block_loads(compact_dumped)
+
+        assert len(compact_dumped) < len(blockchain.block_dumps(block)) / 2
+        assert compact_block.header == block.header
+        assert not compact_block.body.transactions
+        assert tx_hashes == list(block.body.transactions)
+
+        loaded = blockchain.put_transactions(compact_block, block.body.transactions.values())
+        assert blockchain.block_dumps(loaded) == blockchain.block_dumps(block)
+
+    def test_block_is_loaded_from_tx_queue(self, blockchain: BlockChain, block_manager: BlockManager, block: Block,
+                                           peer_stub):
+        for tx in block.body.transactions.values():
+            block_manager.add_tx_obj(tx)
+
+        loaded = block_manager.load_compact_block(blockchain.block_dumps(block, compact=True), REP_TARGET)
+
+        assert blockchain.block_dumps(loaded) == blockchain.block_dumps(block)
+        assert not peer_stub.GetUnconfirmedBlock.called
+
+    def test_missing_txs_are_requested_at_once(self, blockchain: BlockChain, block_manager: BlockManager,
+                                               block: Block, peer_stub):
+        tx_hashes = list(block.body.transactions)
+        for tx_hash in tx_hashes[::2]:
+            block_manager.add_tx_obj(block.body.transactions[tx_hash])
+        peer_stub.GetUnconfirmedBlock.return_value = loopchain_pb2.UnconfirmedBlockReply(
+            response_code=message_code.Response.success, txs=_txs_dumped(blockchain, block, tx_hashes[1::2]))
+
+        loaded = block_manager.load_compact_block(blockchain.block_dumps(block, compact=True), REP_TARGET)
+
+        assert blockchain.block_dumps(loaded) == blockchain.block_dumps(block)
+        assert peer_stub.GetUnconfirmedBlock.call_count == 1
+        request = peer_stub.GetUnconfirmedBlock.call_args[0][0]
+        assert request.block_hash == block.header.hash.hex()
+        assert list(request.tx_hashes) == [tx_hash.hex() for tx_hash in tx_hashes[1::2]]
+
+    @pytest.mark.parametrize("response_code", [message_code.Response.success,
+                                               message_code.Response.fail_wrong_block_hash])
+    def test_whole_block_is_requested_on_mismatch(self, blockchain: BlockChain, block_manager: BlockManager,
+                                                  block: Block, peer_stub, response_code):
+        tx_hashes = list(block.body.transactions)
+        wrong_txs = _txs_dumped(blockchain, block, reversed(tx_hashes))
+        peer_stub.GetUnconfirmedBlock.side_effect = [
+            loopchain_pb2.UnconfirmedBlockReply(response_code=response_code, txs=wrong_txs),
+            loopchain_pb2.UnconfirmedBlockReply(response_code=message_code.Response.success,
+                                                block=blockchain.block_dumps(block))
+        ]
+
+        loaded = block_manager.load_compact_block(blockchain.block_dumps(block, compact=True), REP_TARGET)
+
+        assert blockchain.block_dumps(loaded) == blockchain.block_dumps(block)
+        assert not peer_stub.GetUnconfirmedBlock.call_args[0][0].tx_hashes
+
+    def test_channel_to_peer_is_closed(self, blockchain: BlockChain, block_manager: BlockManager, block: Block,
+                                       peer_stub):
+        peer_stub.GetUnconfirmedBlock.return_value = loopchain_pb2.UnconfirmedBlockReply(
+            response_code=message_code.Response.success,
+            txs=_txs_dumped(blockchain, block, list(block.body.transactions)))
+
+        block_manager.load_compact_block(blockchain.block_dumps(block, compact=True), REP_TARGET)
+
+        create_client_channel = block_manager_module.GRPCHelper.return_value.create_client_channel
+        create_client_channel.assert_called_once_with(REP_TARGET)
+        assert create_client_channel.return_value.close.called
+
+    def test_leader_is_requested_instead_of_unknown_sender(self, blockchain: BlockChain,
+                                                           block_manager: BlockManager, block: Block, peer_stub):
+        leader_target = "127.0.0.1:7200"
+        blockchain.find_preps_targets_by_roothash.return_value = {
+            REP_ID: REP_TARGET, block.header.peer_id.hex_hx(): leader_target}
+        peer_stub.GetUnconfirmedBlock.return_value = loopchain_pb2.UnconfirmedBlockReply(
+            response_code=message_code.Response.success,
+            txs=_txs_dumped(blockchain, block, list(block.body.transactions)))
+
+        block_manager.load_compact_block(blockchain.block_dumps(block, compact=True), "10.0.0.1:7100")
+
+        create_client_channel = block_manager_module.GRPCHelper.return_value.create_client_channel
+        create_client_channel.assert_called_once_with(leader_target)
+
+    def test_block_of_unknown_leader_is_not_requested(self, blockchain: BlockChain, block_manager: BlockManager,
+                                                      block: Block, peer_stub):
+        with pytest.raises(BlockError):
+            block_manager.load_compact_block(blockchain.block_dumps(block, compact=True), "10.0.0.1:7100")
+
+        assert not block_manager_module.GRPCHelper.return_value.create_client_channel.called
+        assert not peer_stub.GetUnconfirmedBlock.called
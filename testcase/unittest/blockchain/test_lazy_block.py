@@ -0,0 +1,89 @@
+import pytest
+
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import BlockSerializer, LazyBlock, v0_1a, v0_3
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+class TestLazyBlock:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int, tx_count=3):
+        blocks = []
+        prev_hash = None
+        for height in range(count):
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=tx_count, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+            prev_hash = block.header.hash
+        blockchain._BlockChain__block_cache.clear()
+        return blocks
+
+    def test_header_is_found_without_body(self, blockchain: BlockChain, block_factory: BlockFactory, mocker):
+        blocks = self._add_blocks(blockchain, block_factory, 3)
+        deserialize_body = mocker.spy(BlockSerializer, "deserialize_body")
+
+        for block in blocks:
+            assert blockchain.find_block_header_by_height(block.header.height) == block.header
+            assert blockchain.find_block_header_by_hash(block.header.hash) == block.header
+        assert blockchain.find_block_header_by_height(3) is None
+
+        assert deserialize_body.call_count == 0
+
+    def test_body_is_loaded_on_first_access(self, blockchain: BlockChain, block_factory: BlockFactory, mocker):
+        block = self._add_blocks(blockchain, block_factory, 2)[-1]
+        deserialize_body = mocker.spy(BlockSerializer, "deserialize_body")
+
+        lazy_block = blockchain.find_block_by_height(1)
+        assert isinstance(lazy_block, LazyBlock)
+        assert not lazy_block.is_body_loaded
+
+        assert lazy_block.body == block.body
+        assert lazy_block.body is lazy_block.body
+        assert deserialize_body.call_count == 1
+        assert blockchain.find_block_by_hash32(block.header.hash) is lazy_block
+        assert blockchain.block_cache_status["serialized"]["count"] == 1
+
+    def test_header_of_block_without_header_record(self, blockchain: BlockChain, block_factory: BlockFactory):
+        block = self._add_blocks(blockchain, block_factory, 2)[-1]
+        blockchain._blockchain_store.delete(BlockChain.BLOCK_HEADER_KEY + block.header.hash.hex().encode())
+
+        lazy_block = blockchain.find_block_by_hash(block.header.hash)
+
+        assert lazy_block.header == block.header
+        assert lazy_block.body == block.body
+
+    def test_rollback_check_reads_headers(self, blockchain: BlockChain, block_factory: BlockFactory, mocker):
+        blocks = self._add_blocks(blockchain, block_factory, 4)
+        deserialize_body = mocker.spy(BlockSerializer, "deserialize_body")
+
+        assert blockchain.check_rollback_possible(blocks[0])
+        assert not blockchain.check_rollback_possible(block_factory(height=1, prev_hash=blocks[0].header.hash))
+        assert deserialize_body.call_count == 0
+
+    def test_rebuild_made_block_count_reads_headers(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                                    mocker):
+        self._add_blocks(blockchain, block_factory, 4)
+        deserialize_body = mocker.spy(BlockSerializer, "deserialize_body")
+
+        blockchain.rebuild_made_block_count()
+
+        assert blockchain.leader_made_block_count > 0
+        assert deserialize_body.call_count == 0
+
+
+class TestLazyBlockBenchmark:
+    @pytest.mark.parametrize("header_only", [False, True])
+    def test_benchmark_find_block_by_height(self, benchmark, blockchain: BlockChain, block_factory: BlockFactory,
+                                            header_only):
+        genesis_block = block_factory(height=0, tx_count=0, block_version=v0_1a.version)
+        add_block(blockchain, genesis_block)
+        add_block(blockchain, block_factory(height=1, prev_hash=genesis_block.header.hash, tx_count=500))
+        block_cache = blockchain._BlockChain__block_cache
+
+        def _find():
+            block_cache.clear()
+            if header_only:
+                return blockchain.find_block_header_by_height(1)
+            return blockchain.find_block_by_height(1).body
+
+        assert benchmark(_find)
@@ -0,0 +1,277 @@
+import os
+import random
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from loopchain.blockchain.logs_bloom_index import LogsBloomIndex, EventLogFilter
+from loopchain.store.key_value_store_dict import KeyValueStoreDict
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block, make_receipt
+
+TRANSFER = "Transfer(Address,Address,int)"
+
+
+def _score_address() -> str:
+    return "cx" + os.urandom(20).hex()
+
+
+def _address() -> str:
+    return "hx" + os.urandom(20).hex()
+
+
+def _event_log(score_address: str, from_: str, to: str, value: int) -> dict:
+    return {"scoreAddress": score_address, "indexed": [TRANSFER, from_, to, hex(value)], "data": []}
+
+
+def _random_bloom() -> bytes:
+    return EventLogFilter.logs_bloom([_event_log(_score_address(), _address(), _address(), random.randrange(100))])
+
+
+class TestEventLogFilter:
+    def test_match(self):
+        score_address, from_, to = _score_address(), _address(), _address()
+        event_log = _event_log(score_address, from_, to, 16)
+
+        assert EventLogFilter().match(event_log)
+        assert EventLogFilter(score_address, [TRANSFER, None, to]).match(event_log)
+        assert EventLogFilter(score_address, [TRANSFER, from_, to, "0x10"]).match(event_log)
+        assert not EventLogFilter(_score_address()).match(event_log)
+        assert not EventLogFilter(score_address, [TRANSFER, to]).match(event_log)
+        assert not EventLogFilter(score_address, [TRANSFER, from_, to, "0x10", "0x1"]).match(event_log)
+
+    def test_match_bloom(self):
+        score_address, from_, to = _score_address(), _address(), _address()
+        logs_bloom = int.from_bytes(EventLogFilter.logs_bloom([_event_log(score_address, from_, to, 16)]), 'big')
+
+        assert EventLogFilter().match_bloom(logs_bloom)
+        assert EventLogFilter(score_address, [TRANSFER, None, to]).match_bloom(logs_bloom)
+        assert EventLogFilter(score_address, [TRANSFER, from_, to, "0x10"]).match_bloom(logs_bloom)
+        assert not EventLogFilter(score_address, [TRANSFER, to]).match_bloom(logs_bloom)
+
+
+class TestLogsBloomIndex:
+    def _add_blooms(self, index: LogsBloomIndex, blooms: dict):
+        for height in sorted(blooms):
+            index.add(height, blooms[height])
+
+    def test_find_heights(self):
+        store = KeyValueStoreDict()
+        index = LogsBloomIndex(store, section_size=4, levels=3)
+        blooms = {height: _random_bloom() for height in range(0, 300, 3)}
+        event_filter = EventLogFilter(_score_address(), [TRANSFER])
+        matched_heights = [5, 6, 70, 71, 255, 256]
+        for height in matched_heights:
+            blooms[height] = EventLogFilter.logs_bloom([{"scoreAddress": event_filter.score_address,
+                                                         "indexed": [TRANSFER, _address(), _address(), "0x1"]}])
+        self._add_blooms(index, blooms)
+
+        assert list(index.find_heights(0, 299, event_filter.bloom_bits)) == matched_heights
+        assert list(index.find_heights(6, 255, event_filter.bloom_bits)) == [6, 70, 71, 255]
+        assert list(index.find_heights(0, 299, 0)) == sorted(blooms)
+
+    @pytest.mark.parametrize("height", [0, 1, 4, 17, 64, 65, 130])
+    def test_remove_from_height(self, height):
+        blooms = {height: _random_bloom() for height in range(150) if height % 5}
+        new_bloom = _random_bloom()
+
+        store = KeyValueStoreDict()
+        index = LogsBloomIndex(store, section_size=4, levels=3)
+        self._add_blooms(index, blooms)
+        index.remove_from_height(height, 149)
+        index.add(height, new_bloom)
+
+        expected_store = KeyValueStoreDict()
+        expected_index = LogsBloomIndex(expected_store, section_size=4, levels=3)
+        self._add_blooms(expected_index, {h: bloom for h, bloom in blooms.items() if h < height})
+        expected_index.add(height, new_bloom)
+
+        assert dict(store.Iterator()) == dict(expected_store.Iterator())
+
+    def test_add_before_start(self):
+        blooms = {height: _random_bloom() for height in range(150) if height % 5}
+
+        store = KeyValueStoreDict()
+        index = LogsBloomIndex(store, section_size=4, levels=3)
+        index.set_start_height(100)
+        self._add_blooms(index, {h: bloom for h, bloom in blooms.items() if h >= 100})
+        count = 0
+        while index.start_height:
+            start_height = max(index.start_height - 7, 0)
+            chunk = [(height, blooms.get(height)) for height in range(index.start_height - 1, start_height - 1, -1)]
+            count += index.add_before_start(chunk, start_height)
+
+        expected_store = KeyValueStoreDict()
+        expected_index = LogsBloomIndex(expected_store, section_size=4, levels=3)
+        expected_index.set_start_height(0)
+        self._add_blooms(expected_index, blooms)
+
+        assert count == len([h for h in blooms if h < 100])
+        assert index.start_height == 0
+        assert dict(store.Iterator()) == dict(expected_store.Iterator())
+
+    def test_add_before_start_resumes(self):
+        blooms = {height: _random_bloom() for height in range(40)}
+
+        store = KeyValueStoreDict()
+        index = LogsBloomIndex(store, section_size=4, levels=3)
+        index.set_start_height(40)
+        index.add_before_start([(height, blooms[height]) for height in range(39, 23, -1)], 24)
+        assert LogsBloomIndex(store, section_size=4, levels=3).start_height == 24
+
+        index = LogsBloomIndex(store, section_size=4, levels=3)
+        index.add_before_start([(height, blooms[height]) for height in range(23, -1, -1)], 0)
+
+        assert index.start_height == 0
+        assert list(index.find_heights(0, 39, 0)) == sorted(blooms)
+
+
+class TestBlockChainEventLogs:
+    @pytest.fixture
+    def score_address(self) -> str:
+        return _score_address()
+
+    def _add_block(self, blockchain: BlockChain, block_factory: BlockFactory, event_logs_by_tx: list):
+        """add a block of txs with receipts of the event logs"""
+        height = blockchain.block_height + 1
+        prev_hash = blockchain.last_block.header.hash if blockchain.last_block else None
+        block_version = v0_1a.version if height == 0 else v0_3.version
+
+        receipts = {}
+        event_logs_iter = iter(event_logs_by_tx)
+
+        def _make_receipt(tx):
+            event_logs = next(event_logs_iter)
+            receipt = make_receipt(tx)
+            receipt["eventLogs"] = event_logs
+            receipt["logsBloom"] = "0x" + EventLogFilter.logs_bloom(event_logs).hex()
+            receipts[tx.hash.hex()] = receipt
+            return receipt
+
+        block = block_factory(height=height, prev_hash=prev_hash, tx_count=len(event_logs_by_tx),
+                              block_version=block_version, receipt_factory=_make_receipt)
+        add_block(blockchain, block, confirm_info=b"[]", receipts=receipts)
+        return block
+
+    def test_find_event_logs(self, blockchain: BlockChain, block_factory: BlockFactory, score_address):
+        sender, receiver = _address(), _address()
+        self._add_block(blockchain, block_factory, [[]])
+        self._add_block(blockchain, block_factory, [[], [_event_log(score_address, sender, receiver, 1)]])
+        self._add_block(blockchain, block_factory, [[_event_log(_score_address(), sender, receiver, 2)]])
+        block = self._add_block(blockchain, block_factory, [[_event_log(score_address, _address(), receiver, 3),
+                                                             _event_log(score_address, sender, receiver, 4)]])
+
+        event_logs = blockchain.find_event_logs(0, 10, score_address, [TRANSFER, sender])
+
+        assert [event_log["eventLog"]["indexed"][3] for event_log in event_logs] == ["0x1", "0x4"]
+        assert event_logs[1]["blockHeight"] == "0x3"
+        assert event_logs[1]["txHash"] == next(iter(block.body.transactions)).hex_0x()
+        assert event_logs[1]["logIndex"] == "0x1"
+        assert len(blockchain.find_event_logs(0, 10, indexed=[TRANSFER, None, receiver])) == 4
+        assert len(blockchain.find_event_logs(0, 10, indexed=[TRANSFER, None, receiver], limit=2)) == 2
+        assert blockchain.find_event_logs(3, 10, score_address, [TRANSFER, None, sender]) == []
+
+    def test_blocks_before_index_are_found_by_headers(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                                      score_address):
+        self._add_block(blockchain, block_factory, [[]])
+        self._add_block(blockchain, block_factory, [[_event_log(score_address, _address(), _address(), 1)]])
+        self._add_block(blockchain, block_factory, [[_event_log(score_address, _address(), _address(), 2)]])
+        blockchain._BlockChain__logs_bloom_index.start_height = 2
+
+        event_logs = blockchain.find_event_logs(0, 2, score_address)
+
+        assert [event_log["blockHeight"] for event_log in event_logs] == ["0x1", "0x2"]
+
+    def test_blocks_before_index_are_migrated(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                              score_address, mocker):
+        self._add_block(blockchain, block_factory, [[]])
+        self._add_block(blockchain, block_factory, [[_event_log(score_address, _address(), _address(), 1)]])
+        self._add_block(blockchain, block_factory, [[_event_log(score_address, _address(), _address(), 2)]])
+
+        # the block DB of a node before the logs bloom index
+        store = blockchain._blockchain_store
+        for key, _ in list(store.Iterator(start_key=LogsBloomIndex.KEY, stop_key=LogsBloomIndex.KEY + b'\xff')):
+            store.delete(bytes(key))
+        store.delete(LogsBloomIndex.START_HEIGHT_KEY)
+        blockchain._BlockChain__logs_bloom_index = LogsBloomIndex(store)
+        blockchain._BlockChain__logs_bloom_index.set_start_height(blockchain.block_height + 1)
+
+        mocker.patch.object(conf, "LOGS_BLOOM_MIGRATION_BATCH_SIZE", 2)
+        blockchain.start_migrations()
+        blockchain._BlockChain__migration_thread.join()
+        find_header = mocker.spy(blockchain, "find_block_header_by_height")
+        event_logs = blockchain.find_event_logs(0, 2, score_address)
+
+        assert blockchain._BlockChain__logs_bloom_index.start_height == 0
+        assert [event_log["blockHeight"] for event_log in event_logs] == ["0x1", "0x2"]
+        assert not find_header.called
+
+    def test_stopped_migration_resumes(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                           score_address, mocker):
+        self._add_block(blockchain, block_factory, [[]])
+        self._add_block(blockchain, block_factory, [[_event_log(score_address, _address(), _address(), 1)]])
+        blockchain._BlockChain__logs_bloom_index.start_height = 2
+        mocker.patch.object(conf, "LOGS_BLOOM_MIGRATION_BATCH_SIZE", 1)
+
+        # the migration is stopped after the first chunk of blocks.
+        find_logs_bloom = blockchain._BlockChain__find_logs_bloom_by_height
+
+        def _find_logs_bloom_by_height(height):
+            blockchain._BlockChain__migration_stop.set()
+            return find_logs_bloom(height)
+
+        mocker.patch.object(blockchain, "_BlockChain__find_logs_bloom_by_height", _find_logs_bloom_by_height)
+        blockchain.start_migrations()
+        blockchain._BlockChain__migration_thread.join()
+
+        assert blockchain._BlockChain__logs_bloom_index.start_height == 1
+        assert [event_log["blockHeight"] for event_log in blockchain.find_event_logs(0, 1, score_address)] == ["0x1"]
+
+        mocker.stopall()
+        blockchain.start_migrations()
+        blockchain._BlockChain__migration_thread.join()
+        assert blockchain._BlockChain__logs_bloom_index.start_height == 0
+
+    def test_rollback_removes_blooms(self, blockchain: BlockChain, block_factory: BlockFactory, score_address):
+        blocks = [self._add_block(blockchain, block_factory, [[]])]
+        for value in range(3):
+            blocks.append(self._add_block(blockchain, block_factory,
+                                          [[_event_log(score_address, _address(), _address(), value)]]))
+
+        blockchain.roll_back(blocks[1])
+
+        assert [event_log["blockHeight"] for event_log in blockchain.find_event_logs(0, 3, score_address)] == ["0x1"]
+
+
+class TestLogsBloomIndexBenchmark:
+    BLOCK_COUNT = 1_000_000
+    EVENT_HEIGHTS = [1_234, 250_000, 250_001, 777_777, 999_999]
+
+    @pytest.fixture(scope="class")
+    def store(self) -> KeyValueStoreDict:
+        """1M blocks. one of 10 blocks has event logs of other SCOREs."""
+        random.seed(0)
+        other_blooms = [_random_bloom() for _ in range(1000)]
+        store = KeyValueStoreDict()
+        index = LogsBloomIndex(store)
+        event_bloom = EventLogFilter.logs_bloom([_event_log(self._score_address, _address(), _address(), 1)])
+        event_heights = set(self.EVENT_HEIGHTS)
+        for height in range(self.BLOCK_COUNT):
+            if height in event_heights:
+                index.add(height, event_bloom)
+            elif height % 10 == 0:
+                index.add(height, random.choice(other_blooms))
+        return store
+
+    _score_address = _score_address()
+
+    @pytest.mark.parametrize("levels", [0, 3])
+    def test_benchmark_find_heights(self, benchmark, store, levels):
+        index = LogsBloomIndex(store, levels=levels)
+        bloom_bits = EventLogFilter(self._score_address, [TRANSFER]).bloom_bits
+
+        heights = benchmark.pedantic(lambda: list(index.find_heights(0, self.BLOCK_COUNT - 1, bloom_bits)),
+                                     rounds=3)
+
+        assert heights == self.EVENT_HEIGHTS
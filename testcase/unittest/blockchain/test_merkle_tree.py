@@ -0,0 +1,111 @@
+import hashlib
+import os
+
+import pytest
+
+from loopchain.blockchain.merkle import MerkleTree
+
+
+def _leaves(count: int):
+    return [os.urandom(32) for _ in range(count)]
+
+
+def _expected_root(leaves):
+    level = list(leaves)
+    while len(level) > 1:
+        next_level = [hashlib.sha3_256(l + r).digest() for l, r in zip(level[0::2], level[1::2])]
+        if len(level) % 2 == 1:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def _merkle_tree(leaves) -> MerkleTree:
+    merkle_tree = MerkleTree()
+    merkle_tree.add_leaf(leaves)
+    merkle_tree.make_tree()
+    return merkle_tree
+
+
+class TestMerkleTree:
+    def test_empty_tree_has_no_root(self):
+        merkle_tree = _merkle_tree([])
+
+        assert merkle_tree.get_merkle_root() is None
+        assert merkle_tree.get_proof(0) is None
+
+    @pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13, 100])
+    def test_root_and_proofs(self, count):
+        leaves = _leaves(count)
+        merkle_tree = _merkle_tree(leaves)
+
+        root = merkle_tree.get_merkle_root()
+        assert root == _expected_root(leaves)
+        assert merkle_tree.leaves == leaves
+        for index, leaf in enumerate(leaves):
+            assert MerkleTree.validate_proof(merkle_tree.get_proof(index), leaf, root)
+
+    def test_root_is_not_ready_until_make_tree(self):
+        merkle_tree = _merkle_tree(_leaves(3))
+        merkle_tree.add_leaf(_leaves(1))
+
+        assert merkle_tree.get_merkle_root() is None
+
+    @pytest.mark.parametrize("count, appended", [(1, 1), (4, 1), (5, 3), (7, 10), (100, 1)])
+    def test_incremental_append_equals_new_tree(self, count, appended):
+        leaves = _leaves(count + appended)
+        merkle_tree = _merkle_tree(leaves[:count])
+
+        for leaf in leaves[count:]:
+            # proof nodes of the tree before the append are not reused.
+            merkle_tree.get_proof(0)
+            merkle_tree.add_leaf(leaf)
+            merkle_tree.make_tree()
+
+        assert merkle_tree.get_merkle_root() == _merkle_tree(leaves).get_merkle_root()
+        assert merkle_tree.get_proof(0) == _merkle_tree(leaves).get_proof(0)
+        assert merkle_tree.get_proof(count) == _merkle_tree(leaves).get_proof(count)
+
+    def test_invalid_leaf_size(self):
+        with pytest.raises(ValueError):
+            MerkleTree().add_leaf(b"short leaf")
+
+    def test_invalid_leaf_is_not_added_with_others(self):
+        merkle_tree = _merkle_tree(_leaves(3))
+
+        with pytest.raises(ValueError):
+            merkle_tree.add_leaf(_leaves(2) + [b"short leaf"])
+
+        assert merkle_tree.get_leaf_count() == 3
+        assert merkle_tree.get_tree_ready_state()
+
+    def test_leaf_of_any_size_is_hashed(self):
+        values = [b"short leaf", os.urandom(100)]
+        merkle_tree = MerkleTree()
+        merkle_tree.add_leaf(values, do_hash=True)
+        merkle_tree.make_tree()
+
+        assert merkle_tree.leaves == [hashlib.sha3_256(value).digest() for value in values]
+
+class TestMerkleTreeBenchmark:
+    leaves = _leaves(10_000)
+
+    def test_benchmark_root(self, benchmark):
+        root = benchmark(lambda: _merkle_tree(self.leaves).get_merkle_root())
+
+        assert root == _expected_root(self.leaves)
+
+    def test_benchmark_append(self, benchmark):
+        merkle_tree = _merkle_tree(self.leaves)
+
+        def _append():
+            merkle_tree.add_leaf(self.leaves[0])
+            merkle_tree.make_tree()
+
+        benchmark(_append)
+
+    def test_benchmark_proofs(self, benchmark):
+        merkle_tree = _merkle_tree(self.leaves)
+
+        benchmark(lambda: [merkle_tree.get_proof(index) for index in range(0, 10_000, 10)])
+
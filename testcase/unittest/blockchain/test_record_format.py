@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from loopchain.blockchain.blocks import BlockSerializer, v0_3
+from loopchain.blockchain.record_format import RecordFormat, record_dumps, record_loads, is_binary_record
+from loopchain.blockchain.transactions import TransactionVersioner
+from loopchain.store.key_value_store_dict import KeyValueStoreDict
+from loopchain.tools.record_migration import migrate
+from testcase.unittest.blockchain.conftest import BlockFactory
+
+tx_versioner = TransactionVersioner()
+
+
+class TestRecordFormat:
+    @pytest.mark.parametrize("value", [
+        None, True, False, 0, 1, -1, 2 ** 80, -(2 ** 80), 0.5, "", "text", "가나다",
+        "0x0", "0x1a", "0x01", "0x00ff", "0xABCD", "0x", "0x" + "ab" * 32, "ab" * 32, "AB" * 32,
+        "hx" + "12" * 20, "cx" + "34" * 20, "hx" + "12" * 19,
+        "abcdefghijklmnopqrstuvwxyz012345", "YWJjZGVmZ2hpamtsbW5vcA==", "YWJjZGVmZ2hpamtsbW5vcA=",
+        [], {}, [1, "0x1", None], {"version": "0x3", "unknown_key": {"nested": [True]}},
+    ])
+    def test_binary_record_keeps_value(self, value):
+        record = record_dumps(value, RecordFormat.binary)
+
+        assert is_binary_record(record)
+        assert record_loads(record) == value
+
+    def test_legacy_json_record_is_readable(self):
+        value = {"block_hash": "ab" * 32, "tx_index": "0x0"}
+        record = json.dumps(value).encode()
+
+        assert not is_binary_record(record)
+        assert record_loads(record) == value
+
+    def test_block_record_is_smaller_than_json(self, block_factory: BlockFactory):
+        block = block_factory(tx_count=100)
+        block_serialized = BlockSerializer.new(v0_3.version, tx_versioner).serialize(block)
+
+        json_record = record_dumps(block_serialized, RecordFormat.json)
+        binary_record = record_dumps(block_serialized, RecordFormat.binary)
+
+        assert record_loads(binary_record) == block_serialized
+        assert len(binary_record) < len(json_record) * 0.7
+
+    @pytest.mark.parametrize("record_format", [RecordFormat.json, RecordFormat.binary])
+    def test_benchmark_block_record_loads(self, benchmark, block_factory: BlockFactory, record_format):
+        block = block_factory(tx_count=100)
+        record = record_dumps(BlockSerializer.new(v0_3.version, tx_versioner).serialize(block), record_format)
+
+        benchmark(record_loads, record)
+
+
+class TestRecordMigration:
+    def test_migrate_records(self, block_factory: BlockFactory):
+        store = KeyValueStoreDict()
+        block = block_factory(tx_count=10)
+        block_serialized = BlockSerializer.new(v0_3.version, tx_versioner).serialize(block)
+        block_key = block.header.hash.hex().encode()
+        store.put(block_key, record_dumps(block_serialized, RecordFormat.json))
+        store.put(b"last_block_key", block_key)
+
+        converted, size_before, size_after = migrate(store, RecordFormat.binary)
+
+        assert converted == 1
+        assert size_after < size_before
+        assert is_binary_record(store.get(block_key))
+        assert record_loads(store.get(block_key)) == block_serialized
+        assert store.get(b"last_block_key") == block_key
+
+        converted, _, _ = migrate(store, RecordFormat.json)
+        assert converted == 1
+        assert json.loads(store.get(block_key)) == block_serialized
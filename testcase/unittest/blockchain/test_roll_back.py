@@ -0,0 +1,101 @@
+import pytest
+
+from loopchain import configure as conf
+from loopchain import utils
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from loopchain.crypto.signature import Signer
+from loopchain.store.key_value_store import KeyValueStore
+from loopchain.store.key_value_store_dict import KeyValueStoreDict
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+@pytest.fixture(autouse=True, params=[KeyValueStore.STORE_TYPE_DICT, KeyValueStore.STORE_TYPE_PLYVEL])
+def store_type(request, mocker) -> str:
+    """type of the block DB of the blockchain fixture"""
+    if request.param == KeyValueStore.STORE_TYPE_DICT:
+        mocker.patch.object(utils, "init_default_key_value_store", return_value=(KeyValueStoreDict(), ""))
+    return request.param
+
+
+@pytest.fixture
+def signer(mocker) -> Signer:
+    """Signer of all txs made by the block factory, to make blocks fast"""
+    signer = Signer.new()
+    mocker.patch.object(Signer, "new", return_value=signer)
+    return signer
+
+
+def _store_items(blockchain: BlockChain) -> dict:
+    return {bytes(key): bytes(value) for key, value in blockchain._blockchain_store.Iterator()}
+
+
+class TestRollBack:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int, tx_count=2):
+        blocks = []
+        for _ in range(count):
+            height = blockchain.block_height + 1
+            prev_hash = blockchain.last_block.header.hash if blockchain.last_block else None
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=tx_count, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+        return blocks
+
+    def test_block_data_are_removed(self, blockchain: BlockChain, block_factory: BlockFactory, signer):
+        blocks = self._add_blocks(blockchain, block_factory, 3)
+        items = _store_items(blockchain)
+        self._add_blocks(blockchain, block_factory, 3)
+
+        blockchain.roll_back(blocks[-1])
+
+        items_after = _store_items(blockchain)
+        assert items_after.keys() == items.keys()
+        # confirm infos of the last two blocks are restored from votes in the next blocks.
+        for key in (BlockChain.INVOKE_RESULT_BLOCK_HEIGHT_KEY,
+                    BlockChain.CONFIRM_INFO_KEY + blocks[-1].header.hash.hex().encode(),
+                    BlockChain.CONFIRM_INFO_KEY + blocks[-2].header.hash.hex().encode()):
+            del items[key], items_after[key]
+        assert items_after == items
+
+        assert blockchain.last_block.header.hash == blocks[-1].header.hash
+        assert blockchain.find_block_by_height(3) is None
+        assert blockchain.total_tx == 4
+        assert blockchain.find_confirm_info_by_hash(blocks[-1].header.hash)
+
+    def test_blocks_are_removed_in_a_batch(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                           mocker):
+        blocks = self._add_blocks(blockchain, block_factory, 5)
+        store = blockchain._blockchain_store
+        write_batch = mocker.spy(store, "WriteBatch")
+        store_put = mocker.spy(store, "put")
+        store_delete = mocker.spy(store, "delete")
+
+        blockchain.roll_back(blocks[1])
+
+        assert write_batch.call_count == 1
+        assert store_put.call_count == 0
+        assert store_delete.call_count == 0
+
+    def test_target_out_of_chain(self, blockchain: BlockChain, block_factory: BlockFactory, signer):
+        blocks = self._add_blocks(blockchain, block_factory, 3)
+        other_block = block_factory(height=1, prev_hash=blocks[0].header.hash)
+
+        assert not blockchain.check_rollback_possible(other_block)
+        with pytest.raises(RuntimeError):
+            blockchain.roll_back(other_block)
+        assert blockchain.last_block.header.hash == blocks[-1].header.hash
+
+    def test_roll_back_10k_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, signer, monkeypatch):
+        monkeypatch.setattr(conf, "ROLL_BACK_PROGRESS_INTERVAL", 2000)
+        blocks = self._add_blocks(blockchain, block_factory, 10_001, tx_count=1)
+        progress = []
+
+        assert blockchain.check_rollback_possible(blocks[0])
+        blockchain.roll_back(blocks[0], lambda removed, total: progress.append((removed, total)))
+
+        assert progress == [(removed, 10_000) for removed in range(2000, 10_001, 2000)]
+        assert blockchain.block_height == 0
+        assert blockchain.total_tx == 0
+        assert blockchain.find_block_by_height(1) is None
+        assert not blockchain.has_tx(next(iter(blocks[-1].body.transactions)))
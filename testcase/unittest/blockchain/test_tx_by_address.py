@@ -0,0 +1,135 @@
+import pickle
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.blockchain import BlockChain, AddressTx
+from loopchain.blockchain.blocks import v0_1a, v0_3
+from loopchain.crypto.signature import Signer
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+@pytest.fixture
+def signer(mocker) -> Signer:
+    """Signer of all txs made by the block factory"""
+    signer = Signer.new()
+    mocker.patch.object(Signer, "new", return_value=signer)
+    return signer
+
+
+class TestTxByAddress:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int, tx_count=3):
+        blocks = []
+        prev_hash = None
+        for height in range(count):
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=tx_count, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+            prev_hash = block.header.hash
+        return blocks
+
+    def _address_txs(self, blocks):
+        """txs of blocks except the genesis block, newest first"""
+        return [AddressTx(block.header.height, index, tx_hash)
+                for block in reversed(blocks[1:])
+                for index, tx_hash in reversed(list(enumerate(block.body.transactions)))]
+
+    def test_txs_are_found_newest_first(self, blockchain: BlockChain, block_factory: BlockFactory, signer):
+        blocks = self._add_blocks(blockchain, block_factory, 4)
+        address_txs = self._address_txs(blocks)
+
+        assert blockchain.find_txs_by_address(signer.address) == address_txs
+        assert blockchain.find_txs_by_address(signer.address, limit=4) == address_txs[:4]
+        assert blockchain.find_txs_by_address(signer.address, from_height=2) == address_txs[3:]
+        assert blockchain.find_txs_by_address(signer.address, from_height=2, from_tx_index=1) == address_txs[4:]
+        assert blockchain.find_txs_by_address(signer.address[:-1] + "0") == []
+
+    def test_pages(self, blockchain: BlockChain, block_factory: BlockFactory, signer):
+        address_txs = self._address_txs(self._add_blocks(blockchain, block_factory, 5))
+
+        found = []
+        page = blockchain.find_txs_by_address(signer.address, limit=5)
+        while page:
+            found += page
+            last = page[-1]
+            if last.tx_index:
+                page = blockchain.find_txs_by_address(signer.address, last.height, last.tx_index - 1, limit=5)
+            else:
+                page = blockchain.find_txs_by_address(signer.address, last.height - 1, limit=5)
+
+        assert found == address_txs
+
+    def test_legacy_tx_list(self, blockchain: BlockChain, block_factory: BlockFactory, signer, monkeypatch):
+        monkeypatch.setattr(conf, "MAX_TX_LIST_SIZE_BY_ADDRESS", 4)
+        tx_hashes = [address_tx.tx_hash.hex()
+                     for address_tx in self._address_txs(self._add_blocks(blockchain, block_factory, 4))]
+
+        assert blockchain.get_tx_list_by_address(signer.address, 0) == (tx_hashes[:4] + [1], 1)
+        assert blockchain.get_tx_list_by_address(signer.address, 1) == (tx_hashes[4:8] + [2], 2)
+        assert blockchain.get_tx_list_by_address(signer.address, 2) == (tx_hashes[8:] + [0], 0)
+
+    def test_index_is_written_in_block_batch(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                             mocker):
+        store_put = mocker.spy(blockchain._blockchain_store, "put")
+
+        self._add_blocks(blockchain, block_factory, 3)
+
+        assert not [args for args, _ in store_put.call_args_list if args[0].startswith(BlockChain.TX_BY_ADDRESS_KEY)]
+        assert len(blockchain.find_txs_by_address(signer.address)) == 6
+
+    def test_rollback_removes_index(self, blockchain: BlockChain, block_factory: BlockFactory, signer):
+        blocks = self._add_blocks(blockchain, block_factory, 4)
+
+        blockchain.roll_back(blocks[1])
+
+        assert blockchain.find_txs_by_address(signer.address) == self._address_txs(blocks[:2])
+
+    def _put_legacy_tx_list(self, blockchain: BlockChain, address: str, address_txs):
+        """replace the tx index by address with pages of the legacy form.
+        page 0 has the newest txs and the index of the last full page.
+        """
+        store = blockchain._blockchain_store
+        for key, _ in list(store.Iterator(start_key=BlockChain.TX_BY_ADDRESS_KEY,
+                                          stop_key=BlockChain.TX_BY_ADDRESS_KEY + b'\xff')):
+            store.delete(bytes(key))
+
+        tx_hashes = [address_tx.tx_hash.hex() for address_tx in address_txs]
+        legacy_key = conf.TX_LIST_ADDRESS_PREFIX + address.encode()
+        store.put(legacy_key + b'0', pickle.dumps(tx_hashes[:2] + [2]))
+        store.put(legacy_key + b'2', pickle.dumps(tx_hashes[2:6] + [1]))
+        store.put(legacy_key + b'1', pickle.dumps(tx_hashes[6:] + [0]))
+        return tx_hashes
+
+    def test_migrate_legacy_tx_list(self, blockchain: BlockChain, block_factory: BlockFactory, signer):
+        address_txs = self._address_txs(self._add_blocks(blockchain, block_factory, 4))
+        self._put_legacy_tx_list(blockchain, signer.address, address_txs)
+        assert blockchain.find_txs_by_address(signer.address) == []
+
+        blockchain.start_migrations()
+        blockchain._BlockChain__migration_thread.join()
+
+        store = blockchain._blockchain_store
+        assert blockchain.find_txs_by_address(signer.address) == address_txs
+        assert list(store.Iterator(start_key=conf.TX_LIST_ADDRESS_PREFIX,
+                                   stop_key=conf.TX_LIST_ADDRESS_PREFIX + b'\xff')) == []
+
+    def test_legacy_tx_list_during_migration(self, blockchain: BlockChain, block_factory: BlockFactory, signer,
+                                             monkeypatch):
+        monkeypatch.setattr(conf, "MAX_TX_LIST_SIZE_BY_ADDRESS", 4)
+        address_txs = self._address_txs(self._add_blocks(blockchain, block_factory, 4))
+        tx_hashes = self._put_legacy_tx_list(blockchain, signer.address, address_txs)
+        pages = [(tx_hashes[:4] + [1], 1), (tx_hashes[4:8] + [2], 2), (tx_hashes[8:] + [0], 0)]
+
+        migrate_page = blockchain._BlockChain__migrate_legacy_tx_list_page
+        migrated_count = 0
+        while True:
+            assert [blockchain.get_tx_list_by_address(signer.address, index) for index in range(3)] == pages
+            assert blockchain.find_txs_by_address(signer.address, limit=100) == address_txs[:migrated_count]
+
+            tx_count = migrate_page(signer.address)
+            if tx_count is None:
+                break
+            migrated_count += tx_count
+
+        assert migrated_count == len(address_txs)
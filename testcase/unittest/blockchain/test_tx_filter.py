@@ -0,0 +1,169 @@
+import os
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.blockchain import BlockChain
+from loopchain.blockchain.blocks import BlockSerializer, v0_1a, v0_3
+from loopchain.blockchain.tx_filter import TxBloomFilter
+from loopchain.blockchain.types import Hash32
+from testcase.unittest.blockchain.conftest import BlockFactory, add_block
+
+
+def _hashes(count: int):
+    return [Hash32(os.urandom(32)) for _ in range(count)]
+
+
+class TestTxBloomFilter:
+    def test_added_hashes_are_in_filter(self):
+        tx_filter = TxBloomFilter(capacity=1000, error_rate=0.001)
+        hashes = _hashes(5000)
+        for tx_hash in hashes:
+            tx_filter.add(tx_hash)
+
+        assert all(tx_hash in tx_filter for tx_hash in hashes)
+        assert tx_filter.count == 5000
+        assert tx_filter.filter_count == 3
+
+    def test_false_positive_rate(self):
+        tx_filter = TxBloomFilter(capacity=10_000, error_rate=0.01)
+        for tx_hash in _hashes(10_000):
+            tx_filter.add(tx_hash)
+
+        false_positives = sum(tx_hash in tx_filter for tx_hash in _hashes(10_000))
+        assert false_positives < 200
+
+    def test_dumps_and_loads(self):
+        tx_filter = TxBloomFilter(capacity=100, error_rate=0.001, height=7)
+        hashes = _hashes(300)
+        for tx_hash in hashes:
+            tx_filter.add(tx_hash)
+
+        loaded = TxBloomFilter.loads(tx_filter.dumps(), error_rate=0.001)
+
+        assert loaded.height == 7
+        assert loaded.count == tx_filter.count
+        assert all(tx_hash in loaded for tx_hash in hashes)
+        with pytest.raises(ValueError):
+            TxBloomFilter.loads(tx_filter.dumps()[:-1], error_rate=0.001)
+
+
+class TestBlockChainHasTx:
+    def _add_blocks(self, blockchain: BlockChain, block_factory: BlockFactory, count: int, start_height=0):
+        blocks = []
+        prev_hash = blockchain.last_block.header.hash if start_height else None
+        for height in range(start_height, start_height + count):
+            block_version = v0_1a.version if height == 0 else v0_3.version
+            block = block_factory(height=height, prev_hash=prev_hash, tx_count=3, block_version=block_version)
+            add_block(blockchain, block, confirm_info=b"[]")
+            blocks.append(block)
+            prev_hash = block.header.hash
+        return blocks
+
+    def _tx_hashes(self, blocks):
+        return [tx_hash for block in blocks for tx_hash in block.body.transactions]
+
+    def test_has_tx(self, blockchain: BlockChain, block_factory: BlockFactory, mocker):
+        tx_hashes = self._tx_hashes(self._add_blocks(blockchain, block_factory, 3))
+        unknown_hashes = _hashes(100)
+        store_get = mocker.spy(blockchain._blockchain_store, "get")
+
+        assert all(blockchain.has_txs(tx_hashes))
+        assert blockchain.has_tx(tx_hashes[0].hex())
+        assert not any(blockchain.has_txs(unknown_hashes))
+        assert store_get.call_count < len(tx_hashes) + 1 + 10
+
+    def test_tx_without_tx_info(self, blockchain: BlockChain, block_factory: BlockFactory):
+        tx_hash = self._tx_hashes(self._add_blocks(blockchain, block_factory, 2))[0]
+        blockchain._blockchain_store.delete(tx_hash.hex().encode())
+
+        assert not blockchain.has_tx(tx_hash)
+
+    def test_saved_filter_is_updated_by_blocks_added_after_saved(self, blockchain: BlockChain,
+                                                                 block_factory: BlockFactory):
+        blocks = self._add_blocks(blockchain, block_factory, 2)
+        saved_filter = blockchain._BlockChain__tx_filter.dumps()
+        blocks += self._add_blocks(blockchain, block_factory, 2, start_height=2)
+
+        blockchain._blockchain_store.put(BlockChain.TX_FILTER_KEY, saved_filter)
+        blockchain._BlockChain__tx_filter = blockchain._BlockChain__load_tx_filter()
+
+        assert blockchain._BlockChain__tx_filter.height == 3
+        assert all(blockchain.has_txs(self._tx_hashes(blocks)))
+
+    def test_saved_filter_is_updated_from_block_records(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                                        mocker):
+        self._add_blocks(blockchain, block_factory, 2)
+        saved_filter = blockchain._BlockChain__tx_filter.dumps()
+        blocks = self._add_blocks(blockchain, block_factory, 2, start_height=2)
+        blockchain._blockchain_store.put(BlockChain.TX_FILTER_KEY, saved_filter)
+        blockchain._BlockChain__block_cache.clear()
+        find_blocks = mocker.spy(blockchain, "find_blocks_by_height_range")
+        deserialize = mocker.spy(BlockSerializer, "deserialize")
+        deserialize_body = mocker.spy(BlockSerializer, "deserialize_body")
+
+        blockchain._BlockChain__tx_filter = blockchain._BlockChain__load_tx_filter()
+
+        assert all(tx_hash in blockchain._BlockChain__tx_filter for tx_hash in self._tx_hashes(blocks))
+        assert not find_blocks.called
+        assert not deserialize.called
+        assert not deserialize_body.called
+
+    def test_filter_is_made_from_block_db(self, blockchain: BlockChain, block_factory: BlockFactory):
+        tx_hashes = self._tx_hashes(self._add_blocks(blockchain, block_factory, 2))
+        blockchain._blockchain_store.delete(BlockChain.TX_FILTER_KEY)
+
+        blockchain._BlockChain__tx_filter = blockchain._BlockChain__load_tx_filter()
+        assert not blockchain._BlockChain__tx_filter_complete
+        # txs are found by the block DB while the filter is being made.
+        assert all(blockchain.has_txs(tx_hashes))
+
+        blockchain.start_migrations()
+        blockchain._BlockChain__migration_thread.join()
+
+        assert blockchain._BlockChain__tx_filter_complete
+        assert all(tx_hash in blockchain._BlockChain__tx_filter for tx_hash in tx_hashes)
+        assert TxBloomFilter.loads(blockchain._blockchain_store.get(BlockChain.TX_FILTER_KEY),
+                                   error_rate=blockchain._BlockChain__tx_filter.error_rate).height == 1
+
+    def test_filter_is_checkpointed_in_block_batch(self, blockchain: BlockChain, block_factory: BlockFactory,
+                                                   mocker):
+        mocker.patch.object(conf, "TX_FILTER_CHECKPOINT_BLOCKS", 2)
+        store_put = mocker.spy(blockchain._blockchain_store, "put")
+        tx_hashes = self._tx_hashes(self._add_blocks(blockchain, block_factory, 3))
+
+        tx_filter = TxBloomFilter.loads(blockchain._blockchain_store.get(BlockChain.TX_FILTER_KEY),
+                                        error_rate=blockchain._BlockChain__tx_filter.error_rate)
+
+        assert tx_filter.height == 2
+        assert all(tx_hash in tx_filter for tx_hash in tx_hashes)
+        assert not [args for args, _ in store_put.call_args_list if args[0] == BlockChain.TX_FILTER_KEY]
+
+    def test_filter_is_saved_on_close(self, blockchain: BlockChain, block_factory: BlockFactory):
+        tx_hashes = self._tx_hashes(self._add_blocks(blockchain, block_factory, 2))
+        block_manager = blockchain._BlockChain__block_manager
+        blockchain.close_blockchain_store()
+
+        reopened = BlockChain(blockchain._BlockChain__channel_name, "test_blockchain", block_manager)
+        try:
+            tx_filter = TxBloomFilter.loads(reopened._blockchain_store.get(BlockChain.TX_FILTER_KEY),
+                                            error_rate=reopened._BlockChain__tx_filter.error_rate)
+            assert tx_filter.height == 1
+            assert all(reopened.has_txs(tx_hashes))
+        finally:
+            reopened.close_blockchain_store()
+            blockchain._blockchain_store = reopened._blockchain_store
+
+
+@pytest.mark.parametrize("known", [False, True])
+def test_benchmark_has_tx(benchmark, blockchain: BlockChain, block_factory: BlockFactory, known):
+    genesis_block = block_factory(height=0, tx_count=0, block_version=v0_1a.version)
+    add_block(blockchain, genesis_block)
+    block = block_factory(height=1, prev_hash=genesis_block.header.hash, tx_count=100)
+    add_block(blockchain, block)
+    tx_hashes = list(block.body.transactions) if known else _hashes(100)
+
+    def _has_txs():
+        return [blockchain.has_tx(tx_hash) for tx_hash in tx_hashes]
+
+    assert all(benchmark(_has_txs)) is known
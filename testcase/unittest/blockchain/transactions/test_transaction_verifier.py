@@ -34,7 +34,7 @@ class TestTransactionVerifierBase:
         tv = TransactionVerifier.new(version=tx.version, type_=tx.type(), versioner=tx_versioner)
 
         mock_blockchain: BlockChain = mocker.MagicMock(spec=BlockChain)
-        mock_blockchain.find_tx_by_key.return_value = None  # Not found in db, which means the tx is unique.
+        mock_blockchain.has_tx.return_value = False  # Not found in db, which means the tx is unique.
 
         tv.verify_tx_hash_unique(tx, mock_blockchain)
 
@@ -44,7 +44,7 @@ class TestTransactionVerifierBase:
         tv = TransactionVerifier.new(version=tx.version, type_=tx.type(), versioner=tx_versioner, raise_exceptions=raise_exc)
 
         mock_blockchain: BlockChain = mocker.MagicMock(spec=BlockChain)
-        mock_blockchain.find_tx_by_key.return_value = "tx_info_found!"
+        mock_blockchain.has_tx.return_value = True
 
         if raise_exc:
             with pytest.raises(TransactionDuplicatedHashError):
@@ -1,11 +1,13 @@
 import pytest
 
+from loopchain import configure as conf
 from loopchain.blockchain.exception import TransactionInvalidHashError
 from loopchain.blockchain.exception import TransactionInvalidSignatureError
 from loopchain.blockchain.transactions import TransactionVerifier, TransactionVersioner
 from loopchain.blockchain.transactions import v2, v3
 from loopchain.blockchain.types import Hash32
 from loopchain.blockchain.types import Signature
+from loopchain.crypto.signature import SignVerifier
 from testcase.unittest.blockchain.conftest import TxFactory
 
 tx_versioner = TransactionVersioner()
@@ -113,3 +115,56 @@ class TestTxCache:
         else:
             verify_func(tx)
             benchmark(verify_func, tx)
+
+    def test_verify_many_caches_results(self, tx_version, tx_factory: TxFactory, monkeypatch):
+        """Check that results verified by worker processes are cached to each tx"""
+        monkeypatch.setattr(conf, "TX_VERIFY_WORKER_COUNT", 2)
+        monkeypatch.setattr(conf, "TX_VERIFY_PARALLEL_MIN_COUNT", 1)
+
+        txs = [tx_factory(tx_version) for _ in range(4)]
+        object.__setattr__(txs[1], "hash", Hash32.new())
+        object.__setattr__(txs[2], "signature", Signature.new())
+
+        TransactionVerifier.verify_many(txs, tx_versioner)
+
+        assert txs[0]._cache_verify_hash is True
+        assert txs[0]._cache_verify_signature is True
+        assert isinstance(txs[1]._cache_verify_hash, TransactionInvalidHashError)
+        assert isinstance(txs[2]._cache_verify_signature, TransactionInvalidSignatureError)
+
+        tv = TransactionVerifier.new(tx_version, txs[2].type(), tx_versioner)
+        with pytest.raises(TransactionInvalidSignatureError):
+            tv.verify_signature(txs[2])
+
+    def test_verify_many_caches_recovered_pubkeys(self, tx_version, tx_factory: TxFactory, monkeypatch):
+        """Check that public keys recovered by worker processes are not recovered again"""
+        monkeypatch.setattr(conf, "TX_VERIFY_WORKER_COUNT", 2)
+        monkeypatch.setattr(conf, "TX_VERIFY_PARALLEL_MIN_COUNT", 1)
+        SignVerifier.recovered_pubkey_cache().clear()
+
+        txs = [tx_factory(tx_version) for _ in range(4)]
+        TransactionVerifier.verify_many(txs, tx_versioner)
+
+        for tx in txs:
+            SignVerifier.from_address(tx.signer_address.hex_xx()).verify_hash(tx.hash, tx.signature)
+        assert SignVerifier.recovered_pubkey_cache().status()["hits"] == len(txs)
+        assert SignVerifier.recovered_pubkey_cache().status()["misses"] == 0
+
+    def test_workers_are_spawned_again_after_shutdown(self, tx_version, tx_factory: TxFactory, monkeypatch):
+        monkeypatch.setattr(conf, "TX_VERIFY_WORKER_COUNT", 2)
+        monkeypatch.setattr(conf, "TX_VERIFY_PARALLEL_MIN_COUNT", 1)
+
+        TransactionVerifier.verify_many([tx_factory(tx_version) for _ in range(2)], tx_versioner)
+        TransactionVerifier.shutdown_workers()
+
+        txs = [tx_factory(tx_version) for _ in range(2)]
+        TransactionVerifier.verify_many(txs, tx_versioner)
+        assert all(tx._cache_verify_signature is True for tx in txs)
+
+    def test_verify_many_skips_small_batch(self, tx_version, tx_factory: TxFactory, monkeypatch):
+        monkeypatch.setattr(conf, "TX_VERIFY_PARALLEL_MIN_COUNT", 10)
+
+        tx = tx_factory(tx_version)
+        TransactionVerifier.verify_many([tx], tx_versioner)
+
+        assert not hasattr(tx, "_cache_verify_hash")
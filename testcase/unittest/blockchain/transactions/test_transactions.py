@@ -231,7 +231,7 @@ class TestTransaction(unittest.TestCase):
         self.assertRaises(TransactionInvalidSignatureError, lambda: tv.pre_verify(tx, nid=3))
 
     def test_transaction_v3_invalid_nid(self):
-        MockBlockchain = namedtuple("MockBlockchain", "find_nid find_tx_by_key")
+        MockBlockchain = namedtuple("MockBlockchain", "find_nid has_tx")
         nids = list(range(0, 1000))
         random.shuffle(nids)
 
@@ -248,14 +248,14 @@ class TestTransaction(unittest.TestCase):
 
         expected_nid = nids[1]
         mock_blockchain = MockBlockchain(find_nid=lambda: hex(expected_nid),
-                                         find_tx_by_key=lambda _: False)
+                                         has_tx=lambda _: False)
 
         tv = TransactionVerifier.new(tx.version, tx.type(), self.tx_versioner)
         self.assertRaises(TransactionInvalidNidError, lambda: tv.verify(tx, mock_blockchain))
         self.assertRaises(TransactionInvalidNidError, lambda: tv.pre_verify(tx, nid=expected_nid))
 
     def test_transaction_v2_duplicate_hash(self):
-        MockBlockchain = namedtuple("MockBlockchain", "find_nid find_tx_by_key")
+        MockBlockchain = namedtuple("MockBlockchain", "find_nid has_tx")
 
         tb = TransactionBuilder.new("0x2", None, self.tx_versioner)
         tb.fee = 1000000
@@ -266,13 +266,13 @@ class TestTransaction(unittest.TestCase):
         tx = tb.build()
 
         mock_blockchain = MockBlockchain(find_nid=lambda: hex(3),
-                                         find_tx_by_key=lambda _: True)
+                                         has_tx=lambda _: True)
 
         tv = TransactionVerifier.new(tx.version, tx.type(), self.tx_versioner)
         self.assertRaises(TransactionDuplicatedHashError, lambda: tv.verify(tx, mock_blockchain))
 
     def test_transaction_v3_duplicate_hash(self):
-        MockBlockchain = namedtuple("MockBlockchain", "find_nid find_tx_by_key")
+        MockBlockchain = namedtuple("MockBlockchain", "find_nid has_tx")
 
         tb = TransactionBuilder.new("0x3", None, self.tx_versioner)
         tb.step_limit = 1000000
@@ -286,7 +286,7 @@ class TestTransaction(unittest.TestCase):
         tx = tb.build()
 
         mock_blockchain = MockBlockchain(find_nid=lambda: hex(3),
-                                         find_tx_by_key=lambda _: True)
+                                         has_tx=lambda _: True)
 
         tv = TransactionVerifier.new(tx.version, tx.type(), self.tx_versioner)
         self.assertRaises(TransactionDuplicatedHashError, lambda: tv.verify(tx, mock_blockchain))
@@ -2,7 +2,7 @@ import os
 
 from loopchain import configure as conf
 from loopchain.baseservice import ScoreResponse, ObjectManager
-from loopchain.baseservice.aging_cache import AgingCache
+from loopchain.baseservice.tx_pool import TxPool
 from loopchain.blockchain.blocks import Block
 from loopchain.crypto.signature import Signer
 
@@ -23,7 +23,7 @@ class ChannelServiceMock:
     def block_manager(self):
         class BlockManagerMock:
             def get_tx_queue(self):
-                return AgingCache(max_age_seconds=10)
+                return TxPool(max_age_seconds=10)
 
         return BlockManagerMock()
 
@@ -0,0 +1,72 @@
+"""Test BlockAnnouncements shared by citizens"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from loopchain.channel import block_announcements as block_announcements_module
+from loopchain.channel.block_announcements import BlockAnnouncements
+
+
+def _block(height: int):
+    return SimpleNamespace(header=SimpleNamespace(hash=os.urandom(32), height=height, version="0.3"))
+
+
+@pytest.fixture
+def blockchain(mocker):
+    blockchain = mocker.MagicMock()
+    blockchain.find_confirm_info_by_hash.return_value = b"[]"
+    return blockchain
+
+
+@pytest.fixture
+def block_serializer(mocker):
+    block_serializer = mocker.patch.object(block_announcements_module, "BlockSerializer").new.return_value
+    block_serializer.serialize.side_effect = lambda block: {"height": hex(block.header.height)}
+    return block_serializer
+
+
+class TestBlockAnnouncements:
+    def test_block_is_serialized_once(self, blockchain, block_serializer):
+        block = _block(1)
+        announcements = BlockAnnouncements(max_count=2)
+
+        announcements.prepare(blockchain, block)
+        results = [announcements.get(blockchain, block) for _ in range(10)]
+
+        assert block_serializer.serialize.call_count == 1
+        assert blockchain.find_confirm_info_by_hash.call_count == 1
+        assert all(result is results[0] for result in results)
+        block_json, confirm_info = results[0]
+        assert json.loads(block_json) == {"height": "0x1"}
+        assert confirm_info == b"[]"
+
+    def test_block_json_put_before_add_block_is_used(self, blockchain, block_serializer):
+        block = _block(1)
+        announcements = BlockAnnouncements(max_count=2)
+
+        announcements.put_block_json(block, json.dumps({"height": "0x1"}))
+        block_json, _ = announcements.get(blockchain, block)
+
+        assert not block_serializer.serialize.called
+        assert json.loads(block_json) == {"height": "0x1"}
+
+    def test_retention_is_bounded(self, blockchain, block_serializer):
+        announcements = BlockAnnouncements(max_count=2)
+
+        for height in range(4):
+            block = _block(height)
+            announcements.put_block_json(block, "{}")
+            announcements.get(blockchain, block)
+
+        assert len(announcements) == 2
+
+    def test_block_without_confirm_info_is_not_kept(self, blockchain, block_serializer):
+        blockchain.find_confirm_info_by_hash.return_value = b""
+        announcements = BlockAnnouncements(max_count=2)
+
+        announcements.get(blockchain, _block(1))
+
+        assert len(announcements) == 0
@@ -0,0 +1,81 @@
+"""Test BlockSyncPeers used by the pipelined block height sync"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from loopchain import configure as conf
+from loopchain.peer.block_sync_peers import BlockSyncPeers, take_block_range
+
+
+@pytest.fixture
+def sync_peers():
+    return BlockSyncPeers([("peer0", "stub0"), ("peer1", "stub1"), ("peer2", "stub2")])
+
+
+class TestBlockSyncPeers:
+    def test_select_spreads_requests_over_unsampled_peers(self, sync_peers):
+        targets = [sync_peers.select(1).target for _ in range(3)]
+
+        assert sorted(targets) == ["peer0", "peer1", "peer2"]
+
+    def test_select_prefers_faster_peer(self, sync_peers):
+        for target, elapsed in (("peer0", 1.0), ("peer1", 0.1), ("peer2", 0.5)):
+            sync_peers.select(1)
+            sync_peers.record_success(target, elapsed, max_block_height=100)
+
+        assert sync_peers.select(2).target == "peer1"
+
+    def test_select_skips_peer_behind_height(self, sync_peers):
+        sync_peers.select(1)
+        sync_peers.record_success("peer0", 0.01, max_block_height=1)
+        for _ in range(2):
+            sync_peers.select(1)
+        sync_peers.record_success("peer1", 1.0, max_block_height=10)
+        sync_peers.record_success("peer2", 1.0, max_block_height=10)
+
+        assert sync_peers.select(5).target != "peer0"
+
+    def test_demote_by_consecutive_failures(self, sync_peers):
+        demoted = False
+        for _ in range(conf.BLOCK_SYNC_PEER_MAX_FAILURES):
+            sync_peers.select(1)
+            demoted = sync_peers.record_failure("peer0") or demoted
+
+        assert demoted
+        assert sync_peers.demoted == ["peer0"]
+        assert len(sync_peers) == 2
+
+    def test_find_slow_peers(self, sync_peers):
+        for _ in range(conf.BLOCK_SYNC_SLOW_PEER_MIN_SAMPLES):
+            sync_peers.record_success("peer0", 0.1, max_block_height=100)
+            sync_peers.record_success("peer1", 0.1 * conf.BLOCK_SYNC_SLOW_PEER_RATIO * 2, max_block_height=100)
+
+        assert sync_peers.find_slow_peers() == ["peer1"]
+
+    def test_last_peer_is_never_slow(self):
+        sync_peers = BlockSyncPeers([("peer0", "stub0")])
+        for _ in range(conf.BLOCK_SYNC_SLOW_PEER_MIN_SAMPLES):
+            sync_peers.record_success("peer0", 10.0, max_block_height=100)
+
+        assert not sync_peers.find_slow_peers()
+
+
+def _blocks(*heights):
+    return [(SimpleNamespace(header=SimpleNamespace(height=height)), b"") for height in heights]
+
+
+class TestTakeBlockRange:
+    def test_consecutive_blocks_are_taken(self):
+        blocks = _blocks(5, 6, 7)
+
+        assert take_block_range(blocks, 5, 3) == blocks
+
+    def test_blocks_over_count_are_dropped(self):
+        blocks = _blocks(5, 6, 7, 8)
+
+        assert take_block_range(blocks, 5, 2) == blocks[:2]
+
+    @pytest.mark.parametrize("heights", [(6, 7), (5, 7), (5, 5)])
+    def test_not_consecutive_blocks_are_rejected(self, heights):
+        assert take_block_range(_blocks(*heights), 5, 3) is None
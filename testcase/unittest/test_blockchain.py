@@ -26,6 +26,7 @@ import testcase.unittest.test_util as test_util
 from loopchain import configure as conf
 from loopchain.baseservice import ObjectManager, ScoreResponse
 from loopchain.blockchain.blocks import Block
+from loopchain.blockchain.types import Hash32
 from loopchain.crypto.signature import Signer
 from loopchain.utils import loggers
 from testcase.unittest.mock_peer import set_mock
@@ -113,27 +114,28 @@ class TestBlockChain(unittest.TestCase):
         self.assertEqual(hex(int(new_nonce, 16) + 1), next_new_nonce)
 
     def test_tx_list_by_address(self):
-        """test add tx_hash to tx_list by address
+        """test add tx_hash to tx index by address
 
         :return:
         """
         # GIVEN
         for i in range(201):
-            self.chain.add_tx_to_list_by_address("ABC", "112233_" + str(i))
+            self.chain.add_tx_to_index_by_address("ABC", i // 10 + 1, i % 10, Hash32(os.urandom(Hash32.size)))
 
         # WHEN
         current_tx_list, last_list_index = self.chain.get_tx_list_by_address("ABC")
         util.logger.spam(f"test_get_current_tx_list_by_address "
                          f"length of tx_list({len(current_tx_list)}) next_index({last_list_index})")
 
-        oldest_tx_list, first_index = self.chain.get_tx_list_by_address("ABC", 1)
+        oldest_tx_list, first_index = self.chain.get_tx_list_by_address("ABC", 2)
         util.logger.spam(f"test_get_oldest_tx_list_by_address "
                          f"length of tx_list({len(oldest_tx_list)}) next_index({first_index})")
 
         # THEN
         self.assertEqual(first_index, 0)
-        self.assertEqual(last_list_index, 2)
-        self.assertEqual(len(oldest_tx_list), conf.MAX_TX_LIST_SIZE_BY_ADDRESS + 1)
+        self.assertEqual(last_list_index, 1)
+        self.assertEqual(len(current_tx_list), conf.MAX_TX_LIST_SIZE_BY_ADDRESS + 1)
+        self.assertEqual(len(oldest_tx_list), 2)
 
     def test_find_block_by_height(self):
         # GIVEN
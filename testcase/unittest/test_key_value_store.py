@@ -76,16 +76,11 @@ class TestKeyValueStore(unittest.TestCase):
 
             self.assertEqual(store.get(b'unknown_key', default=b'test_default_value'), b'test_default_value')
 
-            kwargs = {}
-
-            if store_type is 'dict':
-                container = tuple(test_items.keys())
-            else:
-                kwargs.update({
-                    'start_key': b'test_key_2',
-                    'stop_key': b'test_key_4'
-                })
-                container = (b'test_key_2', b'test_key_3', b'test_key_4')
+            kwargs = {
+                'start_key': b'test_key_2',
+                'stop_key': b'test_key_4'
+            }
+            container = (b'test_key_2', b'test_key_3', b'test_key_4')
             expect_count = len(container)
 
             count = 0
@@ -114,6 +109,12 @@ class TestKeyValueStore(unittest.TestCase):
                 count += 1
             self.assertEqual(count, expect_count)
 
+            if store_type == 'plyvel':
+                kwargs.update({'include_stop': True})
+            kwargs.update({'reverse': True})
+            keys = [bytes(key) for key, value in store.Iterator(**kwargs)]
+            self.assertEqual(keys, [b'test_key_4', b'test_key_3', b'test_key_2'])
+
             #
             # delete
             #
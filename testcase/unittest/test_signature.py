@@ -6,6 +6,7 @@ from asn1crypto import keys
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
+from loopchain import configure as conf
 from loopchain.utils import loggers
 from loopchain.crypto.cert_serializers import DerSerializer, PemSerializer
 from loopchain.crypto.signature import Signer, SignVerifier, long_to_bytes
@@ -268,3 +269,48 @@ class TestSignature(unittest.TestCase):
         self.assertRaises(TypeError, lambda: Signer.from_pubkey(self.public_key_bytes))
         self.assertRaises(TypeError, lambda: Signer.from_pubkey_file(self.public_der_path))
         self.assertRaises(TypeError, lambda: Signer.from_pubkey_file(self.public_pem_path))
+
+    def test_recovered_pubkey_is_cached(self):
+        cache = SignVerifier.recovered_pubkey_cache()
+        cache.clear()
+
+        hash_data = os.urandom(32)
+        signature = self.signer_private_key_bytes.sign_hash(hash_data)
+        self.sign_verifier_private_key_bytes.verify_hash(hash_data, signature)
+        self.sign_verifier_private_key_bytes.verify_hash(hash_data, signature)
+
+        status = cache.status()
+        self.assertEqual(status["count"], 1)
+        self.assertEqual(status["hits"], 1)
+        self.assertEqual(status["misses"], 1)
+
+        # A cached public key must not pass a verifier of another address.
+        other_verifier = SignVerifier.from_prikey(os.urandom(32))
+        self.assertRaises(RuntimeError, lambda: other_verifier.verify_hash(hash_data, signature))
+
+    def test_recovered_pubkey_cache_is_sized_by_loaded_configure(self):
+        cache = SignVerifier._recovered_pubkey_cache
+        cache_size = conf.SIGNATURE_CACHE_SIZE
+        SignVerifier._recovered_pubkey_cache = None
+        conf.SIGNATURE_CACHE_SIZE = 3
+        try:
+            self.assertEqual(SignVerifier.recovered_pubkey_cache().max_size, 3)
+        finally:
+            conf.SIGNATURE_CACHE_SIZE = cache_size
+            SignVerifier._recovered_pubkey_cache = cache
+
+    def test_recovered_pubkey_cache_size(self):
+        cache = SignVerifier.recovered_pubkey_cache()
+        max_size = cache.max_size
+        cache.clear()
+        cache.max_size = 2
+        try:
+            for _ in range(3):
+                hash_data = os.urandom(32)
+                signature = self.signer_private_key_bytes.sign_hash(hash_data)
+                self.sign_verifier_private_key_bytes.verify_hash(hash_data, signature)
+
+            self.assertEqual(cache.status()["count"], 2)
+        finally:
+            cache.max_size = max_size
+            cache.clear()
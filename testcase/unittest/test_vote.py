@@ -15,16 +15,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Test Vote Object"""
+import asyncio
 import hashlib
 import logging
 import os
+import threading
 import unittest
+from unittest import mock
 
 import testcase.unittest.test_util as test_util
+from loopchain import configure as conf
 from loopchain.blockchain.types import ExternalAddress, Hash32, Signature
 from loopchain.blockchain.votes import vote, votes
 from loopchain.blockchain.votes.v0_1a import BlockVote, BlockVotes, LeaderVote, LeaderVotes
-from loopchain.crypto.signature import Signer
+from loopchain.crypto.signature import Signer, SignVerifier
 from loopchain.utils import loggers
 
 loggers.set_preset_type(loggers.PresetType.develop)
@@ -158,6 +162,61 @@ class TestVote(unittest.TestCase):
         self.assertEqual(block_votes.is_completed(), True)
         self.assertEqual(block_votes.get_result(), False)
 
+    def test_block_votes_wait_completed(self):
+        ratio = 0.67
+        block_hash = Hash32(os.urandom(Hash32.size))
+        block_votes = BlockVotes(self.reps[:4], ratio, 0, 0, block_hash)
+        block_votes.add_vote(BlockVote.new(self.signers[0], 0, 0, 0, block_hash))
+
+        def _add_votes():
+            for signer in self.signers[1:3]:
+                block_votes.add_vote(BlockVote.new(signer, 0, 0, 0, block_hash))
+
+        async def _wait():
+            waiting = asyncio.ensure_future(block_votes.wait_completed())
+            await asyncio.sleep(0)
+            self.assertFalse(waiting.done())
+
+            thread = threading.Thread(target=_add_votes)
+            thread.start()
+            result = await asyncio.wait_for(waiting, timeout=5)
+            thread.join()
+            return result
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertIs(loop.run_until_complete(_wait()), block_votes)
+            self.assertEqual(block_votes.get_result(), True)
+            self.assertEqual(block_votes._completion_waiters, [])
+
+            # completed votes don't wait.
+            loop.run_until_complete(asyncio.wait_for(block_votes.wait_completed(), timeout=0.1))
+        finally:
+            loop.close()
+
+    def test_block_votes_wait_failure_with_timeout(self):
+        ratio = 0.67
+        block_hash = Hash32(os.urandom(Hash32.size))
+        block_votes = BlockVotes(self.reps[:4], ratio, 0, 0, block_hash)
+
+        loop = asyncio.new_event_loop()
+        try:
+            with self.assertRaises(asyncio.TimeoutError):
+                loop.run_until_complete(asyncio.wait_for(block_votes.wait_completed(), timeout=0.01))
+            self.assertEqual(block_votes._completion_waiters, [])
+
+            async def _wait():
+                waiting = asyncio.ensure_future(block_votes.wait_completed())
+                await asyncio.sleep(0)
+                for signer in self.signers[:2]:
+                    block_votes.add_vote(BlockVote.new(signer, 0, 0, 0, Hash32.empty()))
+                return await asyncio.wait_for(waiting, timeout=5)
+
+            loop.run_until_complete(_wait())
+            self.assertEqual(block_votes.get_result(), False)
+        finally:
+            loop.close()
+
     def test_block_invalid_vote(self):
         ratio = 0.67
         block_hash = Hash32(os.urandom(Hash32.size))
@@ -181,6 +240,46 @@ class TestVote(unittest.TestCase):
         duplicate_block_vote = BlockVote.new(self.signers[0], 0, 0, 0, Hash32.empty())
         self.assertRaises(votes.VoteDuplicateError, block_votes.add_vote, duplicate_block_vote)
 
+    def test_verified_vote_cache(self):
+        block_hash = Hash32(os.urandom(Hash32.size))
+        block_vote = BlockVote.new(self.signers[0], 0, 0, 0, block_hash)
+        BlockVote.verified_cache().clear()
+
+        with mock.patch.object(SignVerifier, "verify_hash", autospec=True) as verify_hash:
+            block_vote.verify()
+            BlockVote.deserialize(block_vote.serialize()).verify()
+            self.assertEqual(verify_hash.call_count, 1)
+        self.assertIn((block_vote.hash(), block_vote.signature), BlockVote.verified_cache())
+        self.assertEqual(block_vote.origin_args().keys(), {"rep", "timestamp", "block_height", "round_", "block_hash"})
+
+        # a vote with another signature is verified again.
+        forged_vote = BlockVote(rep=block_vote.rep, timestamp=block_vote.timestamp,
+                                signature=Signature(os.urandom(65)), block_height=0, round_=0, block_hash=block_hash)
+        self.assertRaises(RuntimeError, forged_vote.verify)
+        self.assertRaises(RuntimeError, forged_vote.verify)
+        self.assertEqual(len(BlockVote.verified_cache()), 1)
+
+    def test_verified_vote_cache_size(self):
+        cache = vote.VerifiedVoteCache(max_size=2)
+        for i in range(3):
+            cache.add((Hash32(bytes([i]) * 32), Signature.empty()))
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn((Hash32(bytes([0]) * 32), Signature.empty()), cache)
+        self.assertIn((Hash32(bytes([2]) * 32), Signature.empty()), cache)
+
+        disabled_cache = vote.VerifiedVoteCache(max_size=0)
+        disabled_cache.add((Hash32(bytes(32)), Signature.empty()))
+        self.assertEqual(len(disabled_cache), 0)
+
+    def test_vote_caches_are_sized_by_loaded_configure(self):
+        with mock.patch.object(conf, "VERIFIED_VOTE_CACHE_SIZE", 3), \
+                mock.patch.object(vote.Vote, "_verified_cache", None), \
+                mock.patch.object(vote, "_to_hash_cache", None):
+            BlockVote.new(self.signers[0], 0, 0, 0, Hash32.empty()).hash()
+
+            self.assertEqual(vote.Vote.verified_cache().max_size, 3)
+            self.assertEqual(vote._to_hash_cache.cache_info().maxsize, 3)
+
     def test_leader_vote(self):
         signer = self.signers[0]
         leader_vote = LeaderVote.new(signer, 0, 0, 0, self.reps[0], self.reps[1])
@@ -293,6 +392,44 @@ class TestVote(unittest.TestCase):
         self.assertEqual(leader_votes.is_completed(), True)
         self.assertEqual(leader_votes.get_result(), next_leader)
 
+    def test_votes_counted_from_votes_list(self):
+        ratio = 0.67
+        block_hash = Hash32(os.urandom(Hash32.size))
+        vote_list = [BlockVote.new(signer, 0, 0, 0, block_hash) if i % 3 else None
+                     for i, signer in enumerate(self.signers)]
+        vote_list[1] = BlockVote.new(self.signers[1], 0, 0, 0, Hash32.empty())
+        block_votes = BlockVotes(self.reps, ratio, 0, 0, block_hash, vote_list)
+
+        self.assertEqual(block_votes.empty_count, 34)
+        self.assertEqual(block_votes.get_majority(), [(True, 65), (False, 1)])
+        self.assertEqual(block_votes.get_result(), None)
+
+        block_votes.add_vote(BlockVote.new(self.signers[0], 0, 0, 0, block_hash))
+        self.assertEqual(block_votes.empty_count, 33)
+        self.assertEqual(block_votes.get_result(), None)
+        block_votes.add_vote(BlockVote.new(self.signers[3], 0, 0, 0, block_hash))
+        self.assertEqual(block_votes.get_result(), True)
+
+        old_leader, new_leader = self.reps[0], self.reps[1]
+        leader_votes_data = [LeaderVote.new(signer, 0, 0, 0, old_leader, new_leader).serialize()
+                             for signer in self.signers[:3]]
+        leader_votes = LeaderVotes.deserialize(leader_votes_data, ratio)
+        self.assertEqual(leader_votes.get_majority(), [(new_leader, 3)])
+        self.assertEqual(leader_votes.get_result(), new_leader)
+
+    def test_majority_of_block_votes_is_counted_by_vote_results(self):
+        ratio = 0.67
+        block_hash = Hash32(os.urandom(Hash32.size))
+        vote_list = [BlockVote.new(signer, 0, 0, 0, block_hash) for signer in self.signers[:60]]
+        vote_list += [BlockVote.new(signer, 0, 0, 0, Hash32(os.urandom(Hash32.size))) for signer in self.signers[60:70]]
+        vote_list += [None] * (len(self.reps) - len(vote_list))
+        block_votes = BlockVotes(self.reps, ratio, 0, 0, block_hash, vote_list)
+
+        # votes of other block hashes are true votes in the majority, but not in the result.
+        self.assertEqual(block_votes.get_majority(), [(True, 70)])
+        self.assertIn(f"True {' ' * 5}: 70/{len(self.reps)}", block_votes.get_summary())
+        self.assertEqual(block_votes.get_result(), None)
+
     def test_leader_invalid_vote(self):
         ratio = 0.67
 